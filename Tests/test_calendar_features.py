@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from simulator_data_generation.calendar_features import CalendarFeatures
+
+
+class TestCalendarFeatures(unittest.TestCase):
+    """
+    A class to test the integer arithmetic calendar features against the DatetimeIndex accessors.
+
+    methods:
+        test_features_match_datetime_index
+        test_window_features_match_datetime_index
+    """
+    def setUp(self):
+        self.fields = ['hour', 'dayofweek', 'dayofyear', 'quarter', 'year', 'month', 'day', 'days_in_month']
+
+    def assert_matches(self, features, date_rng):
+        for field in self.fields:
+            np.testing.assert_array_equal(getattr(features, field), np.asarray(getattr(date_rng, field)), err_msg=field)
+
+    def test_features_match_datetime_index(self):
+        """
+        This function tests every field over ranges crossing leap years, century years and the epoch.
+        """
+        for start, freq, periods in [('1899-12-25 07:00', '6H', 50000), ('2020-02-27 23:50', '10T', 20000),
+                                     ('1969-12-30', '1D', 400), ('2023-01-01', '7H', 5)]:
+            date_rng = pd.date_range(start, periods=periods, freq=freq)
+            self.assert_matches(CalendarFeatures.from_index(date_rng), date_rng)
+
+    def test_window_features_match_datetime_index(self):
+        """
+        This function tests that the features of a window of an index equal the fields of that window.
+        """
+        date_rng = pd.date_range('2023-01-01', periods=10000, freq='10T')
+        features = CalendarFeatures.from_range('2023-01-01', '10T', 3000, offset=4321)
+        self.assert_matches(features, date_rng[4321:7321])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+from django.test import TestCase
+
+from configuration_manager_creator import ConfigurationManagerCreator
+from configuration_manager_reader.configuration_snapshot import ConfigurationSnapshot
+from simulator_api.models import Simulator, Configuration, SeasonalityComponentDetails
+
+
+class TestConfigurationSnapshot(TestCase):
+    """
+    A class to test the configuration snapshot of a run. It sets up a simulator with configurations
+    and seasonality components in the database.
+
+    methods:
+        create_simulator
+        test_constant_number_of_queries
+        test_routes
+        test_read_only
+        test_simulator_data
+        test_harmonic_seasonality
+        test_missing_simulator
+    """
+
+    def setUp(self):
+        self.simulator = self.create_simulator("snapshot simulator", 3)
+
+    @staticmethod
+    def create_simulator(name, configurations):
+        simulator = Simulator.objects.create(name=name, start_date="2023-01-01T00:00:00Z",
+                                             end_date="2023-01-02T00:00:00Z", use_case_name=name,
+                                             time_series_type="Additive", sink_name="Kafka")
+        for position in range(configurations):
+            configuration = Configuration(frequency="1H", noise_level=position, trend_coefficients=[0, 1],
+                                          cycle_component_frequency=0, generator_id=f"asset{position // 2}",
+                                          attribute_id=f"attribute{position}", simulator=simulator)
+            configuration.save()
+            SeasonalityComponentDetails.objects.create(amplitude=2, phase_shift=0.5, frequency_type="Daily",
+                                                       frequency_multiplier=1.0, config=configuration)
+            SeasonalityComponentDetails.objects.create(amplitude=1, phase_shift=0.0, frequency_type="Weekly",
+                                                       frequency_multiplier=1.0, config=configuration)
+        return simulator
+
+    def test_constant_number_of_queries(self):
+        """
+        This function tests that loading a snapshot takes three queries whatever the number of
+        configurations, and that the configuration manager built from it makes none.
+        """
+        self.create_simulator("larger simulator", 12)
+        for name in ("snapshot simulator", "larger simulator"):
+            with self.assertNumQueries(3):
+                snapshot = ConfigurationSnapshot.load(name)
+            with self.assertNumQueries(0):
+                configuration_manager = ConfigurationManagerCreator.create("db", name, snapshot)
+                configuration_manager.frequencies
+                for route in snapshot.routes:
+                    pass
+
+    def test_routes(self):
+        """
+        This function tests the attribute_id/asset_id routing tables of the snapshot.
+        """
+        snapshot = ConfigurationSnapshot.load("snapshot simulator")
+        self.assertEqual(snapshot.routes, (("attribute0", "asset0"), ("attribute1", "asset0"), ("attribute2", "asset1")))
+        self.assertEqual(dict(snapshot.assets), {"asset0": ("attribute0", "attribute1"), "asset1": ("attribute2",)})
+
+    def test_read_only(self):
+        """
+        This function tests that the snapshot and the configurations it holds cannot be modified.
+        """
+        snapshot = ConfigurationSnapshot.load("snapshot simulator")
+        with self.assertRaises(AttributeError):
+            snapshot.routes = ()
+        with self.assertRaises(TypeError):
+            snapshot.configurations[0]['noise_level'] = 5
+        with self.assertRaises(TypeError):
+            snapshot.simulator['name'] = "other"
+
+    def test_simulator_data(self):
+        """
+        This function tests the configuration read by the configuration manager from the snapshot,
+        and that modifying it leaves the snapshot unchanged.
+        """
+        snapshot = ConfigurationSnapshot.load("snapshot simulator")
+        configuration_manager = ConfigurationManagerCreator.create("db", "snapshot simulator", snapshot)
+        self.assertIs(configuration_manager.snapshot, snapshot)
+        self.assertEqual(configuration_manager.configs['name'], "snapshot simulator")
+        self.assertEqual(configuration_manager.frequencies, ["1H", "1H", "1H"])
+        self.assertEqual(configuration_manager.noise_levels, [0, 1, 2])
+        self.assertEqual(configuration_manager.trend_levels, [[0, 1], [0, 1], [0, 1]])
+        self.assertEqual(configuration_manager.daily_seasonality_options, ["exist", "none"] * 3)
+        self.assertEqual(configuration_manager.weekly_seasonality_options, ["none", "exist"] * 3)
+        self.assertEqual(configuration_manager.seasonality_components, [])
+
+        configuration_manager.trend_levels[0].append(2)
+        self.assertEqual(snapshot.configurations[0]['trend_coefficients'], (0, 1))
+
+    def test_harmonic_seasonality(self):
+        """
+        This function tests that the seasons of every configuration are read as one set of harmonic
+        components, without the fixed daily and weekly seasonality options, when asked for.
+        """
+        snapshot = ConfigurationSnapshot.load("snapshot simulator")
+        configuration_manager = ConfigurationManagerCreator.create("db", "snapshot simulator", snapshot,
+                                                                   harmonic_seasonality=True)
+        self.assertEqual(configuration_manager.daily_seasonality_options, ["none"])
+        self.assertEqual(configuration_manager.weekly_seasonality_options, ["none"])
+        self.assertEqual(len(configuration_manager.seasonality_components), 3)
+        self.assertEqual(configuration_manager.seasonality_components[0][0],
+                         {'amplitude': 2, 'phase_shift': 0.5, 'frequency_type': "Daily", 'frequency_multiplier': 1.0})
+
+    def test_missing_simulator(self):
+        """
+        This function tests that there is no snapshot or configuration for a missing simulator.
+        """
+        self.assertIsNone(ConfigurationSnapshot.load("missing simulator"))
+        self.assertIsNone(ConfigurationManagerCreator.create("db", "missing simulator").configs)
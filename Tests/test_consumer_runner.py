@@ -0,0 +1,177 @@
+import json
+import multiprocessing.dummy
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import pandas as pd
+
+from kafka.consumer_runner import ConsumerRunner
+from Tests.test_rolling_writer import InMemoryMessage
+
+
+class InMemoryTopicPartition:
+    def __init__(self, topic, partition, offset=-1):
+        self.topic = topic
+        self.partition = partition
+        self.offset = offset
+
+
+class InMemoryBroker:
+    """
+    A broker holding one topic in memory, spreading its partitions over the members of one consumer group.
+
+    Like the eager rebalance protocol, a new assignment is only handed out once every member has revoked its
+    partitions of the previous generation.
+    """
+    def __init__(self, topic, partitions):
+        self.topic = topic
+        self.partitions = [[] for _ in range(partitions)]
+        self.committed = [0] * partitions
+        self.fetched = [0] * partitions
+        self.members = []
+        self.synced = {}
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def publish(self, partition, value):
+        with self.lock:
+            self.partitions[partition].append(InMemoryMessage(len(self.partitions[partition]), value,
+                                                              partition=partition, topic=self.topic))
+
+    def join(self, member):
+        with self.lock:
+            self.members.append(member)
+            self.generation += 1
+
+    def leave(self, member):
+        with self.lock:
+            self.members.remove(member)
+            self.synced.pop(member, None)
+            self.generation += 1
+
+    def sync(self, member, generation):
+        with self.lock:
+            self.synced[member] = generation
+
+    def assignment(self, member, generation):
+        with self.lock:
+            if generation != self.generation or any(self.synced.get(other) != generation for other in self.members):
+                return None
+            position = self.members.index(member)
+            return [partition for partition in range(len(self.partitions)) if partition % len(self.members) == position]
+
+
+class InMemoryConsumer:
+    """
+    A consumer of the in-memory broker, revoking and assigning partitions on rebalances like the Kafka client.
+    """
+    def __init__(self, broker):
+        self.broker = broker
+        self.generation = None
+        self.assigned = None
+        self.positions = {}
+        self.on_revoke = None
+
+    def subscribe(self, topics, on_revoke=None):
+        self.on_revoke = on_revoke
+        self.broker.join(self)
+
+    def consume(self, num_messages=1, timeout=-1):
+        generation = self.broker.generation
+        if generation != self.generation:
+            if self.assigned and self.on_revoke is not None:
+                self.on_revoke(self, [InMemoryTopicPartition(self.broker.topic, partition) for partition in self.assigned])
+            self.generation, self.assigned = generation, None
+            self.broker.sync(self, generation)
+        if self.assigned is None:
+            self.assigned = self.broker.assignment(self, generation)
+            self.positions = {partition: self.broker.committed[partition] for partition in self.assigned or []}
+
+        messages = []
+        for partition in self.assigned or []:
+            position = self.positions[partition]
+            batch = self.broker.partitions[partition][position:position + num_messages - len(messages)]
+            messages.extend(batch)
+            self.positions[partition] += len(batch)
+            self.broker.fetched[partition] = max(self.broker.fetched[partition], self.positions[partition])
+        if not messages:
+            time.sleep(min(timeout, 0.01))
+        return messages
+
+    def commit(self, offsets=None, asynchronous=True):
+        with self.broker.lock:
+            for offset in offsets:
+                self.broker.committed[offset.partition] = max(self.broker.committed[offset.partition], offset.offset)
+
+    def close(self):
+        if self.assigned and self.on_revoke is not None:
+            self.on_revoke(self, [InMemoryTopicPartition(self.broker.topic, partition) for partition in self.assigned])
+        self.broker.leave(self)
+
+
+class TestConsumerRunner(unittest.TestCase):
+    """
+    A class to test the consumer worker pool against an in-memory broker. It sets up a topic with four partitions.
+
+    methods:
+        test_stop_drains_and_commits_every_partition
+        test_workers_failing_before_reporting
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.broker = InMemoryBroker('kafka_simulated_data', partitions=4)
+        for position in range(200):
+            point = {'attribute_id': 'temperature', 'value': float(position), 'timestamp': str(position),
+                     'asset_id': f'pump-{position % 4}'}
+            self.broker.publish(position % 4, json.dumps(point).encode('utf-8'))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_stop_drains_and_commits_every_partition(self):
+        """
+        This function tests that workers joining the group rebalance the partitions, that stopping the pool
+        writes every buffered row and commits every offset, and that the throughput covers every partition.
+        """
+        runner = ConsumerRunner('kafka_simulated_data', workers=2,
+                                consumer_factory=lambda index: InMemoryConsumer(self.broker), context=multiprocessing.dummy, directory=self.directory.name, max_rows=10 ** 6,
+                                max_seconds=3600, batch_size=7, timeout=0.01)
+        runner.start()
+        deadline = time.monotonic() + 10
+        while sum(self.broker.fetched) < 200 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        throughput = runner.stop()
+
+        self.assertEqual(self.broker.committed, [50] * 4)
+        self.assertEqual(self.broker.members, [])
+        self.assertEqual(sorted(throughput), [('kafka_simulated_data', partition) for partition in range(4)])
+        self.assertEqual(runner.counts['valid'], sum(runner.partition_counts.values()))
+
+        rows = pd.concat([pd.read_csv(os.path.join(root, name)) for root, _, names in os.walk(self.directory.name)
+                          for name in names if name.endswith('.csv')])
+        self.assertEqual(sorted(rows['value']), [float(position) for position in range(200)])
+
+    def test_workers_failing_before_reporting(self):
+        """
+        This function tests that joining the pool returns when a worker fails to create its consumer or
+        exits before reporting, keeping the statistics of the workers that did report.
+        """
+        def consumer_factory(index):
+            raise RuntimeError("broker unavailable")
+
+        runner = ConsumerRunner('kafka_simulated_data', workers=2, consumer_factory=consumer_factory,
+                                context=multiprocessing.dummy, directory=self.directory.name)
+        runner.start()
+        self.assertEqual(runner.join(poll_interval=0.05), {})
+
+        runner = ConsumerRunner('kafka_simulated_data', workers=1, consumer_factory=lambda index: os._exit(3),
+                                context=multiprocessing.get_context('fork'), directory=self.directory.name)
+        runner.start()
+        started = time.monotonic()
+        self.assertEqual(runner.stop(), {})
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertEqual(runner.counts, {})
@@ -0,0 +1,79 @@
+import csv
+import gzip
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from data_producer import CsvDataProducer, open_sink
+from data_producer_file_creator import DataProducerFileCreation
+
+
+class TestCsvDataProducer(unittest.TestCase):
+    """
+    A class to test the CSV sink and its streaming compression. It sets up a series with missing values.
+
+    methods:
+        test_compressed_sinks_round_trip
+        test_chunks_are_compressed_as_one_stream
+        test_compression_level_is_applied
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        values = np.round(np.sin(np.linspace(0, 20, 5000)), 6)
+        values[::100] = np.nan
+        self.data = {
+            'timestamp': pd.date_range(start='2023-01-01', periods=5000, freq='10T'),
+            'value': pd.Series(values),
+            'anomaly': np.arange(5000) % 97 == 0,
+        }
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_compressed_sinks_round_trip(self):
+        """
+        This function tests that plain, gzip and zstandard sinks hold the same rows, that the compressed
+        ones are smaller and that open_sink reads them all transparently.
+        """
+        sizes = {}
+        for name in ('series.csv', 'series.csv.gz', 'series.csv.zst'):
+            producer = DataProducerFileCreation.create(self.path(name))
+            self.assertIsInstance(producer, CsvDataProducer)
+            producer.produce(self.data)
+            sizes[name] = os.path.getsize(self.path(name))
+
+            with open_sink(self.path(name)) as csv_file:
+                rows = list(csv.DictReader(csv_file))
+            self.assertEqual(len(rows), 5000)
+            self.assertEqual(rows[1]['value'], str(self.data['value'][1]))
+
+            np.testing.assert_array_equal(pd.read_csv(self.path(name))['value'].values, self.data['value'].values)
+
+        self.assertLess(sizes['series.csv.gz'], sizes['series.csv'] / 2)
+        self.assertLess(sizes['series.csv.zst'], sizes['series.csv'] / 2)
+
+    def test_chunks_are_compressed_as_one_stream(self):
+        """
+        This function tests that a series written in slices is one compressed stream with a single header.
+        """
+        CsvDataProducer(self.path('chunks.csv.gz')).produce_chunks(
+            {key: column[start:start + 1000] for key, column in self.data.items()} for start in range(0, 5000, 1000))
+
+        with gzip.open(self.path('chunks.csv.gz'), 'rt') as csv_file:
+            lines = csv_file.read().splitlines()
+        self.assertEqual(len(lines), 5001)
+        self.assertEqual(lines[0], 'timestamp,value,anomaly')
+
+    def test_compression_level_is_applied(self):
+        """
+        This function tests that a higher compression level gives a smaller file.
+        """
+        for level in (1, 19):
+            DataProducerFileCreation.create(self.path(f'{level}.csv.zst'), compression_level=level).produce(self.data)
+        self.assertLess(os.path.getsize(self.path('19.csv.zst')), os.path.getsize(self.path('1.csv.zst')))
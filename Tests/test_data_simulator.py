@@ -0,0 +1,258 @@
+import datetime
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from configuration_manager_reader.configuration_manager_abstract import ConfigurationManager
+from data_producer import CsvDataProducer
+from data_simulator import DataGenerator
+from simulator_data_generation.component_cache import ComponentCache
+from simulator_data_generation.outliers_creation import Outliers
+from simulator_data_generation.seasonality_creation import FourierSeasonality
+
+
+class InMemoryConfigurationManager(ConfigurationManager):
+    """
+    A configuration manager that reads its configuration from a dictionary.
+    """
+    def __init__(self, configs):
+        self.source = 'memory'
+        self.configs = configs
+
+    def read(self):
+        return self.configs
+
+
+class TestDataGenerator(unittest.TestCase):
+    """
+    A class to test the data generator. It sets up the environment with a small sweep configuration.
+
+    methods:
+        test_batched_generation_covers_sweep
+        test_batched_generation_matches_serial
+        test_component_cache_is_shared_across_series
+        test_seeded_generation_is_independent_of_workers
+        test_chunked_generation_matches_serial
+        test_compact_dtype_and_packed_masks
+        test_harmonic_seasonality_components
+        test_generation_stages_are_timed
+    """
+    def setUp(self):
+        self.configs = {
+            'start_date': datetime.datetime(2023, 1, 1),
+            'frequencies': ['1H'],
+            'daily_seasonality_options': ['exist', 'none'],
+            'weekly_seasonality_options': ['exist'],
+            'noise_levels': ['none'],
+            'trend_levels': ['none'],
+            'cyclic_periods': ['exist'],
+            'time_series_type': 'additive',
+            'percentage_outliers_options': [0],
+            'data_size': 30
+        }
+
+    def generator(self, **configs):
+        return DataGenerator(InMemoryConfigurationManager({**self.configs, **configs}))
+
+    def test_batched_generation_covers_sweep(self):
+        """
+        This function tests that the batched mode yields every series of the sweep once.
+        """
+        generator = self.generator(frequencies=['1H', '1D'], noise_levels=['small', 'large'])
+        series = list(generator.generate(batched=True, batch_size=10))
+
+        self.assertEqual(len(series), 2 * 2 * 16)
+        self.assertEqual(sorted(int(meta_data['id'][:-4]) for _, meta_data in series), list(range(1, 65)))
+        for data, meta_data in series:
+            self.assertEqual(len(data['value']), len(data['timestamp']))
+            self.assertEqual(len(data['anomaly']), len(data['timestamp']))
+
+    def test_batched_generation_matches_serial(self):
+        """
+        This function tests that without noise and outliers the batched series equal the serial ones
+        everywhere except at the missing values.
+        """
+        generator = self.generator()
+        serial = list(generator.generate())
+        batched = list(generator.generate(batched=True))
+
+        for (serial_data, serial_meta), (batched_data, batched_meta) in zip(serial, batched):
+            self.assertEqual(serial_meta, batched_meta)
+            present = ~np.isnan(serial_data['value'].values) & ~np.isnan(batched_data['value'].values)
+            np.testing.assert_allclose(serial_data['value'].values[present], batched_data['value'].values[present],
+                                       atol=1e-12)
+
+    def test_component_cache_is_shared_across_series(self):
+        """
+        This function tests that the time index and deterministic components are built once per
+        distinct key and served read-only from the cache afterwards.
+        """
+        generator = self.generator()
+        series = list(generator.generate())
+
+        cache_info = generator.cache_info()
+        # one time index, its calendar features, two daily options, one weekly option, no harmonic
+        # components and one cycle
+        self.assertEqual(cache_info['misses'], 7)
+        self.assertGreater(cache_info['hits'], len(series))
+        self.assertIs(series[0][0]['timestamp'], series[-1][0]['timestamp'])
+
+        component = generator._cyclic_component('1H', 'exist')
+        with self.assertRaises(ValueError):
+            component[0] = 1
+
+    def test_seeded_generation_is_independent_of_workers(self):
+        """
+        This function tests that a seeded sweep gives bit-identical series in this process and in
+        a pool of worker processes, and that another seed gives different series.
+        """
+        generator = self.generator(frequencies=['1H', '1D'], noise_levels=['small'], percentage_outliers_options=[0.1])
+        in_process = list(generator.generate(seed=11))
+        in_workers = list(generator.generate(workers=2, seed=11))
+        other_seed = list(generator.generate(seed=12))
+
+        for (data, meta_data), (worker_data, worker_meta_data) in zip(in_process, in_workers):
+            self.assertEqual(meta_data, worker_meta_data)
+            np.testing.assert_array_equal(data['value'].values, worker_data['value'].values)
+            np.testing.assert_array_equal(data['anomaly'], worker_data['anomaly'])
+
+        self.assertFalse(all(np.array_equal(data['value'].values, other_data['value'].values, equal_nan=True)
+                             for (data, _), (other_data, _) in zip(in_process, other_seed)))
+
+    def test_chunked_generation_matches_serial(self):
+        """
+        This function tests that the slices of a chunked series are bounded by the chunk size and that
+        without noise and outliers they join into the serial series everywhere except at the missing values.
+        """
+        generator = self.generator(trend_levels=['exist'], time_series_type='multiplicative')
+        random.seed(3)
+        serial = list(generator.generate())
+
+        random.seed(3)
+        for (serial_data, serial_meta), (chunks, chunked_meta) in zip(serial, generator.generate_chunked(100)):
+            chunks = list(chunks)
+            self.assertEqual(serial_meta, chunked_meta)
+            self.assertTrue(all(len(chunk['value']) <= 100 for chunk in chunks))
+
+            values = np.concatenate([chunk['value'] for chunk in chunks])
+            timestamps = np.concatenate([chunk['timestamp'] for chunk in chunks])
+            np.testing.assert_array_equal(timestamps, serial_data['timestamp'])
+
+            present = ~np.isnan(serial_data['value'].values) & ~np.isnan(values)
+            np.testing.assert_allclose(serial_data['value'].values[present], values[present], atol=1e-12)
+
+    def test_compact_dtype_and_packed_masks(self):
+        """
+        This function tests that float32 values and bit-packed masks are carried through every generation mode
+        and that the CSV sink expands the packed masks again.
+        """
+        generator = DataGenerator(InMemoryConfigurationManager({**self.configs, 'noise_levels': ['small'],
+                                                                'percentage_outliers_options': [0.1]}),
+                                  dtype='float32', pack_masks=True)
+        generated = [next(generator.generate()), next(generator.generate(batched=True)),
+                     next(generator.generate(seed=1))]
+        chunks, meta_data = next(generator.generate_chunked(100))
+        generated.append((next(chunks), meta_data))
+
+        for data, _ in generated:
+            self.assertEqual(data['value'].dtype, np.float32)
+            self.assertEqual(data['anomaly'].dtype, np.uint8)
+            self.assertEqual(len(data['anomaly']), (len(data['value']) + 7) // 8)
+
+        with tempfile.TemporaryDirectory() as directory:
+            sink = os.path.join(directory, 'series.csv')
+            data = generated[0][0]
+            CsvDataProducer(sink).produce(data)
+            written = pd.read_csv(sink)
+
+        np.testing.assert_array_equal(written['anomaly'].values,
+                                      Outliers.unpack_mask(data['anomaly'], len(data['value'])))
+
+
+    def test_harmonic_seasonality_components(self):
+        """
+        This function tests that the configured harmonic components are evaluated as a sum of sine
+        waves, and that each set of components adds one dimension to the sweep.
+        """
+        components = [{'frequency_type': 'Daily', 'amplitude': 2, 'phase_shift': 0, 'frequency_multiplier': 1},
+                      {'frequency_type': 'Weekly', 'amplitude': 1, 'phase_shift': np.pi / 2, 'frequency_multiplier': 2}]
+        date_rng = pd.date_range(start=self.configs['start_date'], periods=48, freq='1H')
+        harmonic = FourierSeasonality().add_seasonality(date_rng, components, season_type='additive')
+
+        hours = np.arange(48)
+        week_fraction = (6 * 24 + hours) / (7 * 24)  # 2023-01-01 is a Sunday
+        expected = 2 * np.sin(2 * np.pi * hours / 24) + np.sin(4 * np.pi * week_fraction + np.pi / 2)
+        np.testing.assert_allclose(harmonic.values, expected, atol=1e-12)
+
+        generator = self.generator(seasonality_components=[components[:1], components])
+        series = list(generator.generate(batched=True))
+
+        self.assertEqual(len(series), 2 * 2 * 16)
+        self.assertEqual(sum(meta_data['seasonality_components'] == components for _, meta_data in series), 32)
+
+        configs = ('exist', 'exist', 'none', 'none', 'exist', 0)
+        self.assertNotEqual(generator._file_name(configs + (components[:1],), '1H'),
+                            generator._file_name(configs + (components,), '1H'))
+        self.assertIn("_harmonics_Daily1x2@0-Weekly2x1@1.5708_", generator._file_name(configs + (components,), '1H'))
+        self.assertNotIn("harmonics", generator._file_name(configs + (None,), '1H'))
+        self.assertNotIn('seasonality_components', self.generator()._metadata(1, configs + (None,), '1H'))
+
+    def test_generation_stages_are_timed(self):
+        """
+        This function tests that every generation stage is timed in every generation mode, including the
+        stages timed in worker processes.
+        """
+        stages = ['time_index', 'seasonality', 'trend', 'cycles', 'combine', 'scaling', 'noise', 'outliers',
+                  'missing_values']
+        generator = self.generator()
+        series = list(generator.generate())
+        summary = generator.timer.summary()
+        self.assertEqual(sorted(summary), sorted(stages))
+        self.assertTrue(all(stage['count'] == len(series) for stage in summary.values()))
+
+        generator = self.generator()
+        list(generator.generate(batched=True, batch_size=10))
+        self.assertEqual(generator.timer.summary()['noise']['count'], 4)
+        self.assertEqual(generator.timer.summary()['time_index']['count'], 1)
+
+        generator = self.generator()
+        chunks = [list(chunks) for chunks, _ in generator.generate_chunked(chunk_size=200)]
+        summary = generator.timer.summary()
+        self.assertEqual(sorted(summary), sorted(stages))
+        self.assertEqual(summary['noise']['count'], sum(len(series_chunks) for series_chunks in chunks))
+        # the deterministic components of every slice are built twice, once to find the bounds
+        self.assertEqual(summary['seasonality']['count'], 2 * summary['noise']['count'])
+
+        generator = self.generator()
+        list(generator.generate(workers=2, seed=3))
+        self.assertEqual(generator.timer.summary()['noise']['count'], len(series))
+
+
+class TestComponentCache(unittest.TestCase):
+    """
+    A class to test the bounded component cache.
+
+    methods:
+        test_least_recently_used_entry_is_evicted
+    """
+    def test_least_recently_used_entry_is_evicted(self):
+        """
+        This function tests that the cache keeps at most maxsize entries and evicts the least recently used one.
+        """
+        cache = ComponentCache(maxsize=2)
+        cache.get('a', lambda: np.zeros(3))
+        cache.get('b', lambda: np.zeros(3))
+        cache.get('a', lambda: np.ones(3))
+        cache.get('c', lambda: np.zeros(3))
+
+        self.assertEqual(cache.cache_info(), {'hits': 1, 'misses': 3, 'size': 2, 'maxsize': 2})
+        np.testing.assert_array_equal(cache.get('a', lambda: np.ones(3)), np.zeros(3))
+        np.testing.assert_array_equal(cache.get('b', lambda: np.ones(3)), np.ones(3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from data_producer_file_creator import DataProducerFileCreation
+from dataset_store import DatasetStoreProducer, DatasetStoreReader
+
+
+class TestDatasetStore(unittest.TestCase):
+    """
+    A class to test the single file dataset store. It sets up a store holding three series.
+
+    methods:
+        test_series_are_read_back_without_copies
+        test_time_range_is_read_by_binary_search
+        test_unclosed_store_is_rejected
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'run.store')
+        self.series = {}
+        producer = DataProducerFileCreation.create(self.path)
+        self.assertIsInstance(producer, DatasetStoreProducer)
+        for series_id, (size, dtype) in enumerate([(1000, np.float64), (333, np.float32), (0, np.float64)]):
+            values = np.random.uniform(-1, 1, size).astype(dtype)
+            values[::50] = np.nan
+            data = {'timestamp': pd.date_range(start='2023-01-01', periods=size, freq='10T'),
+                    'value': pd.Series(values), 'anomaly': np.random.random(size) < 0.1}
+            self.series[str(series_id)] = data
+            if size > 500:
+                producer.produce_chunks(({key: column[start:start + 300] for key, column in data.items()}
+                                         for start in range(0, size, 300)), series_id, {'id': f'{series_id}.csv'})
+            else:
+                producer.produce(data, series_id, {'id': f'{series_id}.csv'})
+        producer.close()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_series_are_read_back_without_copies(self):
+        """
+        This function tests that every series is read back exactly, as read-only views of the store file.
+        """
+        reader = DatasetStoreReader(self.path)
+        self.assertEqual(reader.ids, ['0', '1', '2'])
+        self.assertEqual(reader.metadata('1'), {'id': '1.csv'})
+
+        for series_id, data in self.series.items():
+            series = reader.read(series_id)
+            self.assertEqual(series['value'].dtype, data['value'].dtype)
+            np.testing.assert_array_equal(series['value'], data['value'].values)
+            np.testing.assert_array_equal(series['timestamp'], data['timestamp'].values)
+            np.testing.assert_array_equal(series['anomaly'], data['anomaly'])
+
+        window = reader.read('0', 100, 200)
+        self.assertFalse(window['value'].flags.owndata)
+        self.assertFalse(window['value'].flags.writeable)
+        np.testing.assert_array_equal(window['value'], self.series['0']['value'].values[100:200])
+        with self.assertRaises(KeyError):
+            reader.read('3')
+
+    def test_time_range_is_read_by_binary_search(self):
+        """
+        This function tests that a time range gives the points from its start included to its end excluded.
+        """
+        reader = DatasetStoreReader(self.path)
+        window = reader.read_range('1', '2023-01-01 01:00', pd.Timestamp('2023-01-02'))
+        timestamps = self.series['1']['timestamp']
+        expected = (timestamps >= '2023-01-01 01:00') & (timestamps < '2023-01-02')
+
+        np.testing.assert_array_equal(window['timestamp'], timestamps.values[expected])
+        np.testing.assert_array_equal(window['value'], self.series['1']['value'].values[expected])
+        self.assertEqual(len(reader.read_range('2', '2023-01-01')['value']), 0)
+
+    def test_unclosed_store_is_rejected(self):
+        """
+        This function tests that a store whose producer was not closed cannot be opened.
+        """
+        path = os.path.join(self.directory.name, 'unclosed.store')
+        producer = DatasetStoreProducer(path)
+        producer.produce(self.series['0'])
+        producer._file.flush()
+
+        with self.assertRaises(ValueError):
+            DatasetStoreReader(path)
+        producer.close()
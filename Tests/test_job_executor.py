@@ -0,0 +1,275 @@
+import importlib
+import threading
+import unittest
+from unittest import mock
+
+from django.db import OperationalError, connection
+from django.db.models import QuerySet
+from django.test import TransactionTestCase
+
+from simulator_api import views
+from simulator_api.job_executor import AlreadyQueued, JobExecutor, QueueFull
+from simulator_api.models import Simulator, SimulatorJob
+
+
+class RecordingRun:
+    """
+    A run function recording the runs and holding each of them until it is released or stopped.
+    """
+
+    def __init__(self):
+        self.started = []
+        self.finished = []
+        self.options = {}
+        self.running = 0
+        self.max_running = 0
+        self.release = threading.Event()
+        self.changed = threading.Condition()
+
+    def __call__(self, simulator, options, stop_event):
+        with self.changed:
+            self.started.append(simulator.name)
+            self.options[simulator.name] = options
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            self.changed.notify_all()
+        while not self.release.wait(0.01) and not stop_event.is_set():
+            pass
+        with self.changed:
+            self.running -= 1
+            self.finished.append((simulator.name, "Failed" if stop_event.is_set() else "Succeeded"))
+            self.changed.notify_all()
+
+    def wait_started(self, count, timeout=10):
+        with self.changed:
+            return self.changed.wait_for(lambda: len(self.started) >= count, timeout)
+
+    def wait_finished(self, count, timeout=10):
+        with self.changed:
+            return self.changed.wait_for(lambda: len(self.finished) >= count, timeout)
+
+
+class TestJobExecutor(TransactionTestCase):
+    """
+    A class to test the executor running the queued simulators on a bounded number of workers. It sets up
+    simulators and a run function holding every run until it is released.
+
+    methods:
+        executor
+        simulator
+        test_runs_are_bounded
+        test_priority_order
+        test_overload_is_rejected
+        test_cancel
+        test_failed_claim_is_retried
+        test_jobs_left_in_the_queue_run
+        test_workers_start_with_the_server
+        test_concurrent_submissions
+    """
+
+    def setUp(self):
+        self.run = RecordingRun()
+        self.executors = []
+
+    def tearDown(self):
+        self.run.release.set()
+        for executor in self.executors:
+            executor.shutdown()
+
+    def executor(self, **options):
+        executor = JobExecutor(self.run, poll_interval=0.05, **options)
+        self.executors.append(executor)
+        return executor
+
+    @staticmethod
+    def simulator(name):
+        return Simulator.objects.create(name=name, start_date="2020-01-01 00:00:00", end_date="2020-01-02 00:00:00",
+                                        use_case_name=name, time_series_type="Additive", sink_name="CSV")
+
+    def test_runs_are_bounded(self):
+        """
+        This function tests that no more simulators than workers run at once, that the others wait in the
+        Queued status and that every queued simulator runs in the end.
+        """
+        executor = self.executor(workers=2, queue_size=10)
+        for position in range(5):
+            executor.submit(self.simulator(f"simulator{position}"), {'mode': 'batch'})
+
+        # both workers are held in their runs, so no other job can be taken
+        self.assertTrue(self.run.wait_started(2))
+        self.assertEqual(len(self.run.started), 2)
+        self.assertEqual(SimulatorJob.objects.count(), 3)
+        self.assertEqual(Simulator.objects.get(name="simulator4").status, "Queued")
+
+        self.run.release.set()
+        self.assertTrue(self.run.wait_finished(5))
+        self.assertEqual(self.run.max_running, 2)
+        self.assertEqual(sorted(self.run.started), [f"simulator{position}" for position in range(5)])
+        self.assertEqual(self.run.options["simulator3"], {'mode': 'batch'})
+        self.assertFalse(SimulatorJob.objects.exists())
+
+    def test_priority_order(self):
+        """
+        This function tests that the queued jobs of higher priority run first, and the jobs of the same
+        priority in the order they were submitted.
+        """
+        executor = self.executor(workers=1)
+        executor.submit(self.simulator("first"))
+        self.assertTrue(self.run.wait_started(1))
+        self.assertEqual(executor.submit(self.simulator("low1")), 0)
+        self.assertEqual(executor.submit(self.simulator("high"), priority=5), 0)
+        self.assertEqual(executor.submit(self.simulator("low2")), 2)
+
+        self.run.release.set()
+        self.assertTrue(self.run.wait_started(4))
+        self.assertEqual(self.run.started, ["first", "high", "low1", "low2"])
+
+    def test_overload_is_rejected(self):
+        """
+        This function tests that a submission is rejected while the queue is full, and while the simulator
+        is already queued or running.
+        """
+        executor = self.executor(workers=1, queue_size=1)
+        running = self.simulator("running")
+        executor.submit(running)
+        self.assertTrue(self.run.wait_started(1))
+        queued = self.simulator("queued")
+        executor.submit(queued)
+
+        with self.assertRaises(QueueFull):
+            executor.submit(self.simulator("rejected"))
+        with self.assertRaises(AlreadyQueued):
+            executor.submit(running)
+        with self.assertRaises(AlreadyQueued):
+            executor.submit(queued)
+        self.assertEqual(Simulator.objects.get(name="rejected").status, "Submitted")
+
+        self.run.release.set()
+        self.assertTrue(self.run.wait_finished(2))
+        executor.submit(Simulator.objects.get(name="rejected"))
+        self.assertTrue(self.run.wait_finished(3))
+        self.assertEqual(self.run.finished[-1], ("rejected", "Succeeded"))
+
+    def test_cancel(self):
+        """
+        This function tests that cancelling removes a queued job, stops a running one, reports a run that
+        does not stop in time as stopping, and does nothing for a simulator that is neither.
+        """
+        executor = self.executor(workers=1)
+        running = self.simulator("running")
+        queued = self.simulator("queued")
+        executor.submit(running)
+        self.assertTrue(self.run.wait_started(1))
+        executor.submit(queued)
+
+        self.assertEqual(executor.cancel(queued), 'queued')
+        self.assertFalse(SimulatorJob.objects.exists())
+        self.assertEqual(executor.cancel(running, timeout=10), 'stopped')
+        self.assertEqual(self.run.finished, [("running", "Failed")])
+        self.assertIsNone(executor.cancel(running))
+        self.assertEqual(self.run.started, ["running"])
+        executor.shutdown()
+
+        started, ended = threading.Event(), threading.Event()
+
+        def ignore_stop(simulator, options, stop_event):
+            started.set()
+            ended.wait(10)
+
+        executor = self.executor(workers=1)
+        executor.run = ignore_stop
+        stubborn = self.simulator("stubborn")
+        executor.submit(stubborn)
+        self.assertTrue(started.wait(10))
+        self.assertEqual(executor.cancel(stubborn, timeout=0), 'stopping')
+        ended.set()
+
+    def test_failed_claim_is_retried(self):
+        """
+        This function tests that a job whose removal from the queue fails is taken again by the next
+        attempt instead of being skipped forever.
+        """
+        delete = QuerySet.delete
+        failures = []
+
+        def delete_failing_once(queryset):
+            if queryset.model is SimulatorJob and not failures:
+                failures.append(queryset)
+                raise OperationalError("database table is locked")
+            return delete(queryset)
+
+        executor = self.executor(workers=1)
+        with mock.patch.object(QuerySet, 'delete', autospec=True, side_effect=delete_failing_once):
+            executor.submit(self.simulator("retried"))
+            self.assertTrue(self.run.wait_started(1))
+
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(self.run.started, ["retried"])
+        self.assertFalse(SimulatorJob.objects.exists())
+
+    def test_jobs_left_in_the_queue_run(self):
+        """
+        This function tests that the jobs left in the database by another executor are run once the
+        workers of a new one start.
+        """
+        for slot, name in enumerate(("left1", "left2")):
+            SimulatorJob.objects.create(simulator=self.simulator(name), slot=slot, options={'mode': 'batch'})
+
+        self.executor(workers=1).start()
+        self.run.release.set()
+        self.assertTrue(self.run.wait_finished(2))
+        self.assertEqual(self.run.started, ["left1", "left2"])
+
+    def test_workers_start_with_the_server(self):
+        """
+        This function tests that loading the server starts the workers of the job executor, which run the
+        jobs left in the queue without any new submission.
+        """
+        SimulatorJob.objects.create(simulator=self.simulator("left"), slot=0, options={'mode': 'batch'})
+        executor = self.executor(workers=1)
+
+        with mock.patch.object(views, 'job_executor', executor):
+            importlib.reload(importlib.import_module('simulator.wsgi'))
+        self.run.release.set()
+        self.assertTrue(self.run.wait_finished(1))
+        self.assertEqual(self.run.finished, [("left", "Succeeded")])
+
+    def test_concurrent_submissions(self):
+        """
+        This function tests that concurrent submissions never queue more than queue_size jobs, nor the same
+        simulator twice.
+        """
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("shared in-memory sqlite databases fail concurrent writes instead of waiting for them")
+        executor = self.executor(workers=1, queue_size=3)
+        simulators = [self.simulator(f"concurrent{position}") for position in range(6)]
+        outcomes = []
+        ready = threading.Barrier(9)
+
+        def submit(simulator):
+            try:
+                ready.wait()
+                executor.submit(simulator)
+                outcomes.append('queued')
+            except (QueueFull, AlreadyQueued) as e:
+                outcomes.append(type(e).__name__)
+            finally:
+                connection.close()
+
+        # the workers are not woken up, so the submitted jobs stay in the queue
+        with mock.patch.object(executor, '_wake'):
+            threads = [threading.Thread(target=submit, args=(simulator,)) for simulator in simulators + simulators[:1] * 3]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(outcomes.count('queued'), 3)
+        self.assertEqual(SimulatorJob.objects.count(), 3)
+        self.assertEqual(sorted(SimulatorJob.objects.values_list('slot', flat=True)), [0, 1, 2])
+        self.assertLessEqual(SimulatorJob.objects.filter(simulator=simulators[0]).count(), 1)
+        self.assertEqual(outcomes.count('QueueFull') + outcomes.count('AlreadyQueued'), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
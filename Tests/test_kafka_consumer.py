@@ -0,0 +1,118 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from jsonschema import ValidationError, validate
+
+from kafka.dead_letter import DeadLetterWriter
+from kafka.kafka_consumer import KafkaConsumer, Validator
+from kafka.rolling_writer import RollingFileWriter
+from Tests.test_consumer_runner import InMemoryBroker, InMemoryConsumer
+from Tests.test_rolling_writer import InMemoryMessage
+
+
+class TestValidator(unittest.TestCase):
+    """
+    A class to test the batch validation of the consumer. It sets up records covering the types of the schema.
+
+    methods:
+        test_fast_path_agrees_with_jsonschema
+        test_invalid_records_go_to_dead_letter
+        test_failed_batch_is_dead_lettered
+    """
+    def setUp(self):
+        point = {'attribute_id': 'temperature', 'value': 1.5, 'timestamp': '2023-01-01', 'asset_id': 'pump-1'}
+        self.records = [point, {**point, 'value': 2}, {'value': 3.0}, {**point, 'extra': [1]},
+                        {**point, 'value': '1.5'}, {**point, 'value': True}, {**point, 'asset_id': 7},
+                        {**point, 'timestamp': None}, [point], 'point', 1.5]
+
+    def test_fast_path_agrees_with_jsonschema(self):
+        """
+        This function tests that the compiled validator, with and without the fast path, accepts
+        exactly the records accepted by jsonschema.validate.
+        """
+        expected = []
+        for position, record in enumerate(self.records):
+            try:
+                validate(instance=record, schema=Validator.schema)
+                expected.append(position)
+            except ValidationError:
+                pass
+
+        for fast_path in (True, False):
+            valid, invalid = Validator.validate_batch(self.records, fast_path)
+            self.assertEqual(valid, expected)
+            self.assertEqual([position for position, _ in invalid],
+                             [position for position in range(len(self.records)) if position not in expected])
+        self.assertIs(Validator.compiled(), Validator.compiled())
+
+    def test_invalid_records_go_to_dead_letter(self):
+        """
+        This function tests that undecodable and invalid messages are written to the dead-letter file
+        with counters, and still advance the offset of their partition.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            dead_letter = DeadLetterWriter(os.path.join(directory, 'dead', 'dead_letter.jsonl'))
+            writer = RollingFileWriter(os.path.join(directory, 'data'))
+            consumer = KafkaConsumer('kafka_simulated_data', writer=writer, dead_letter=dead_letter)
+
+            payloads = [json.dumps(record).encode('utf-8') for record in self.records] + [b'\xff{', b'{"value":']
+            consumer.handle_batch([InMemoryMessage(offset, payload) for offset, payload in enumerate(payloads)])
+            dead_letter.close()
+
+            with open(dead_letter.path, encoding='utf-8') as dead_letter_file:
+                lines = [json.loads(line) for line in dead_letter_file]
+
+            self.assertEqual(consumer.counts['received'], len(payloads))
+            self.assertEqual(consumer.counts['valid'], 4)
+            self.assertEqual(consumer.counts['invalid'], len(payloads) - 4)
+            self.assertEqual(dead_letter.counts, {'schema': len(self.records) - 4, 'decode': 2})
+            self.assertEqual([line['offset'] for line in lines], [11, 12, 4, 5, 6, 7, 8, 9, 10])
+            self.assertEqual(lines[0]['encoding'], 'base64')
+            self.assertEqual(writer.flush(), {('kafka_simulated_data', 0): len(payloads)})
+
+    def test_failed_batch_is_dead_lettered(self):
+        """
+        This function tests that when handling a batch fails partway through, only the messages not yet
+        handled go to the dead-letter file, and that the consumer goes on consuming and commits the
+        offsets of every partition.
+        """
+        broker = InMemoryBroker('kafka_simulated_data', partitions=1)
+        for _ in range(20):
+            broker.publish(0, json.dumps(self.records[0]).encode('utf-8'))
+
+        with tempfile.TemporaryDirectory() as directory:
+            dead_letter = DeadLetterWriter(os.path.join(directory, 'dead_letter.jsonl'))
+            writer = RollingFileWriter(os.path.join(directory, 'data'), max_seconds=3600)
+            consumer = KafkaConsumer('kafka_simulated_data', batch_size=5, timeout=0.01, dead_letter=dead_letter,
+                                     writer=writer)
+            add = writer.add
+            failures = []
+
+            def fail_third_message(topic, partition, offset, *args, **kwargs):
+                if offset == 2 and not failures:
+                    failures.append(offset)
+                    raise RuntimeError("batch failed")
+                add(topic, partition, offset, *args, **kwargs)
+
+            writer.add = fail_third_message
+            thread = threading.Thread(target=consumer.run, args=(InMemoryConsumer(broker),))
+            thread.start()
+            deadline = time.monotonic() + 10
+            while broker.fetched[0] < 20 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            consumer.stop_event.set()
+            thread.join()
+
+            with open(dead_letter.path, encoding='utf-8') as dead_letter_file:
+                lines = [json.loads(line) for line in dead_letter_file]
+
+        self.assertEqual([line['offset'] for line in lines], [2, 3, 4])
+        self.assertEqual({line['reason'] for line in lines}, {'error'})
+        self.assertEqual(consumer.counts['failed'], 1)
+        self.assertEqual(consumer.counts['valid'], 17)
+        self.assertEqual(consumer.counts['invalid'], 3)
+        self.assertEqual(broker.committed, [20])
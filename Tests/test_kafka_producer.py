@@ -0,0 +1,97 @@
+import json
+import unittest
+
+from kafka.broker import Broker
+from kafka.kafka_producer import KafkaProducer
+
+
+class InMemoryClient:
+    """
+    A Kafka client that keeps a bounded local queue and delivers the queued messages when polled.
+    """
+    def __init__(self, queue_size):
+        self.queue_size = queue_size
+        self.queue = []
+        self.delivered = []
+        self.polls = 0
+        self.flushes = 0
+
+    def produce(self, topic, key=None, value=None, headers=None, callback=None):
+        if len(self.queue) >= self.queue_size:
+            raise BufferError('Local: Queue full')
+        self.queue.append((topic, value, callback))
+
+    def poll(self, timeout=None):
+        self.polls += 1
+        queue, self.queue = self.queue, []
+        for topic, value, callback in queue:
+            self.delivered.append((topic, json.loads(value)))
+            callback(None, None)
+        return len(queue)
+
+    def flush(self, timeout=None):
+        self.flushes += 1
+        self.poll(timeout)
+        return 0
+
+
+class InMemoryBroker(Broker):
+    """
+    A broker handing out a given producer client.
+    """
+    def __init__(self, client):
+        self.client = client
+
+    def create_producer(self, config):
+        return self.client
+
+    def create_consumer(self, config):
+        raise NotImplementedError
+
+    def topic_partition(self, topic, partition, offset):
+        raise NotImplementedError
+
+
+class TestKafkaProducer(unittest.TestCase):
+    """
+    A class to test the batched Kafka producer against an in-memory client.
+
+    methods:
+        test_messages_are_batched_until_flush
+        test_full_queue_is_retried
+    """
+    def setUp(self):
+        self.client = InMemoryClient(queue_size=100)
+        self.producer = KafkaProducer('Kafka', topic='test_topic', poll_interval=10,
+                                      broker=InMemoryBroker(self.client))
+
+    def test_messages_are_batched_until_flush(self):
+        """
+        This function tests that producing only polls every poll_interval messages, and that a single
+        flush delivers every message and updates the delivered counter.
+        """
+        for value in range(25):
+            self.producer.produce({'value': value})
+
+        self.assertEqual(self.client.polls, 2)
+        self.assertEqual(self.client.flushes, 0)
+
+        self.assertEqual(self.producer.flush(), 0)
+        self.assertEqual(self.client.flushes, 1)
+        self.assertEqual(self.producer.delivered, 25)
+        self.assertEqual(self.producer.failed, 0)
+        self.assertEqual([data['value'] for _, data in self.client.delivered], list(range(25)))
+        self.assertTrue(all(topic == 'test_topic' for topic, _ in self.client.delivered))
+
+    def test_full_queue_is_retried(self):
+        """
+        This function tests that a message rejected by a full local queue is produced again after polling.
+        """
+        self.client.queue_size = 3
+        self.producer.poll_interval = 1000
+        for value in range(10):
+            self.producer.produce({'value': value})
+        self.producer.flush()
+
+        self.assertEqual([data['value'] for _, data in self.client.delivered], list(range(10)))
+        self.assertEqual(self.producer.delivered, 10)
@@ -0,0 +1,273 @@
+import glob
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from kafka.broker import ConfluentBroker, create_broker
+from kafka.dead_letter import DeadLetterWriter
+from kafka.kafka_consumer import KafkaConsumer
+from kafka.kafka_producer import KafkaProducer
+from kafka.local_broker import LocalBroker
+from kafka.message_format import SeriesChunkMessage
+from kafka.rolling_writer import RollingFileWriter
+
+
+def _produce_from_process(directory, worker, count):
+    producer = LocalBroker(directory, partitions=1).create_producer({'batch.size': 100})
+    for position in range(count):
+        producer.produce('shared', value=f'{worker}:{position}')
+    producer.flush()
+
+
+class TestLocalBroker(unittest.TestCase):
+    """
+    A class to test the broker keeping its topics in logs on the local disk. It sets up a broker on a
+    temporary directory.
+
+    methods:
+        consume_all
+        test_round_trip
+        test_segments_roll
+        test_committed_offsets_resume
+        test_torn_record_is_truncated
+        test_group_spreads_partitions
+        test_producers_in_several_processes
+        test_kafka_producer_and_consumer
+        test_create_broker
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.broker = LocalBroker(self.directory.name, partitions=3)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def consume_all(self, consumer, expected, timeout=0.1):
+        messages = []
+        for _ in range(100):
+            messages += consumer.consume(num_messages=1000, timeout=timeout)
+            if len(messages) >= expected:
+                break
+        return messages
+
+    def test_round_trip(self):
+        """
+        This function tests that produced messages are consumed with their keys, values and headers, that
+        messages with the same key land on the same partition, and that offsets count up per partition.
+        """
+        producer = self.broker.create_producer({'linger.ms': 1000})
+        delivered = []
+        for position in range(30):
+            producer.produce('topic', key=f'asset{position % 4}', value=f'value{position}',
+                             headers=[('format', b'test')], callback=lambda err, msg: delivered.append(msg))
+        self.assertEqual(delivered, [])
+        self.assertEqual(len(producer), 30)
+        self.assertEqual(producer.flush(), 0)
+        self.assertEqual(len(delivered), 30)
+
+        consumer = self.broker.create_consumer({'group.id': 'g', 'auto.offset.reset': 'earliest'})
+        consumer.subscribe(['topic'])
+        messages = self.consume_all(consumer, 30)
+        consumer.close()
+
+        self.assertEqual(sorted(message.value() for message in messages),
+                         sorted(f'value{position}'.encode() for position in range(30)))
+        self.assertTrue(all(message.headers() == [('format', b'test')] and message.error() is None
+                            for message in messages))
+        partitions = {}
+        for message in messages:
+            partitions.setdefault(message.key(), set()).add(message.partition())
+        self.assertTrue(all(len(keys) == 1 for keys in partitions.values()))
+        for partition in range(3):
+            offsets = [message.offset() for message in messages if message.partition() == partition]
+            self.assertEqual(offsets, list(range(len(offsets))))
+
+    def test_segments_roll(self):
+        """
+        This function tests that a partition starts a new segment once the active one is full, and that
+        a consumer reads across the segments.
+        """
+        broker = LocalBroker(self.directory.name, partitions=1, segment_bytes=1000)
+        producer = broker.create_producer({'batch.size': 200})
+        for position in range(200):
+            producer.produce('topic', value=b'%05d' % position)
+        producer.flush()
+
+        segments = broker.log('topic', 0).segments()
+        self.assertGreater(len(segments), 3)
+        self.assertEqual(segments[0], 0)
+
+        consumer = broker.create_consumer({'group.id': 'g', 'auto.offset.reset': 'earliest'})
+        consumer.subscribe(['topic'])
+        messages = self.consume_all(consumer, 200)
+        self.assertEqual([int(message.value()) for message in messages], list(range(200)))
+        self.assertEqual([message.offset() for message in messages], list(range(200)))
+
+    def test_committed_offsets_resume(self):
+        """
+        This function tests that a consumer resumes from the offsets committed by its group, and that a
+        new group starts from the end of the log by default.
+        """
+        producer = self.broker.create_producer({})
+        for position in range(20):
+            producer.produce('topic', value=str(position), partition=0)
+        producer.flush()
+
+        consumer = self.broker.create_consumer({'group.id': 'g', 'auto.offset.reset': 'earliest',
+                                                'enable.auto.commit': False})
+        consumer.subscribe(['topic'])
+        first = consumer.consume(num_messages=8, timeout=1)
+        consumer.commit(offsets=[self.broker.topic_partition('topic', 0, first[-1].offset() + 1)])
+        consumer.close()
+
+        consumer = self.broker.create_consumer({'group.id': 'g', 'auto.offset.reset': 'earliest'})
+        consumer.subscribe(['topic'])
+        rest = self.consume_all(consumer, 12)
+        consumer.close()
+        self.assertEqual([message.offset() for message in first + rest], list(range(20)))
+
+        latest = self.broker.create_consumer({'group.id': 'other'})
+        latest.subscribe(['topic'])
+        self.assertEqual(latest.consume(num_messages=10, timeout=0.1), [])
+        producer.produce('topic', value='new', partition=0)
+        producer.flush()
+        self.assertEqual([message.value() for message in self.consume_all(latest, 1)], [b'new'])
+
+    def test_torn_record_is_truncated(self):
+        """
+        This function tests that a record cut short by a crashed writer is never consumed and is replaced
+        by the next append.
+        """
+        log = self.broker.log('topic', 0)
+        log.append([(None, b'first', None)])
+        with open(log.segment_path(0), 'ab') as segment:
+            segment.write(b'\x40\x00\x00\x00\x00\x00')
+
+        consumer = self.broker.create_consumer({'group.id': 'g', 'auto.offset.reset': 'earliest'})
+        consumer.subscribe(['topic'])
+        self.assertEqual([message.value() for message in self.consume_all(consumer, 1)], [b'first'])
+
+        self.assertEqual(LocalBroker(self.directory.name).log('topic', 0).append([(None, b'second', None)]), 1)
+        self.assertEqual([message.value() for message in self.consume_all(consumer, 1)], [b'second'])
+        self.assertEqual(consumer.consume(num_messages=10, timeout=0.1), [])
+        self.assertEqual(log.segments(), [0, 1])
+        consumer.close()
+
+        log = self.broker.log('other', 0)
+        with open(log.segment_path(0), 'wb') as segment:
+            segment.write(b'\x40\x00\x00')
+        consumer = self.broker.create_consumer({'group.id': 'h', 'auto.offset.reset': 'earliest'})
+        consumer.subscribe(['other'])
+        self.assertEqual(consumer.consume(num_messages=10, timeout=0.1), [])
+        self.assertEqual(LocalBroker(self.directory.name).log('other', 0).append([(None, b'first', None)]), 0)
+        self.assertEqual([message.value() for message in self.consume_all(consumer, 1)], [b'first'])
+
+    def test_group_spreads_partitions(self):
+        """
+        This function tests that the partitions of a topic are spread over the members of a group, and
+        that the partitions of a member that leaves are revoked and handed to the others.
+        """
+        consumers = [self.broker.create_consumer({'group.id': 'g'}) for _ in range(2)]
+        revoked = []
+        for consumer in consumers:
+            consumer.subscribe(['topic'], on_revoke=lambda consumer, partitions: revoked.extend(partitions))
+        for consumer in consumers:
+            consumer._checked = 0
+            consumer.consume(timeout=0)
+
+        assignments = [{partition.partition for partition in consumer.assignment()} for consumer in consumers]
+        self.assertEqual(assignments[0] | assignments[1], {0, 1, 2})
+        self.assertEqual(assignments[0] & assignments[1], set())
+        # the first member held every partition until the second joined
+        self.assertEqual({partition.partition for partition in revoked}, assignments[1])
+
+        consumers[1].close()
+        consumers[0]._checked = 0
+        consumers[0].consume(timeout=0)
+        self.assertEqual({partition.partition for partition in consumers[0].assignment()}, {0, 1, 2})
+
+    def test_producers_in_several_processes(self):
+        """
+        This function tests that producers in several processes append to the same partition without
+        losing or duplicating records.
+        """
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=_produce_from_process, args=(self.directory.name, worker, 300))
+                     for worker in range(3)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        consumer = LocalBroker(self.directory.name).create_consumer({'group.id': 'g', 'auto.offset.reset': 'earliest'})
+        consumer.subscribe(['shared'])
+        messages = self.consume_all(consumer, 900)
+        self.assertEqual([message.offset() for message in messages], list(range(900)))
+        self.assertEqual(sorted(message.value() for message in messages),
+                         sorted(f'{worker}:{position}'.encode() for worker in range(3) for position in range(300)))
+        for worker in range(3):
+            values = [int(message.value().split(b':')[1]) for message in messages
+                      if message.value().startswith(f'{worker}:'.encode())]
+            self.assertEqual(values, list(range(300)))
+
+    def test_kafka_producer_and_consumer(self):
+        """
+        This function tests the sink and consumer paths end to end on a local broker: series chunks
+        produced by KafkaProducer are consumed by KafkaConsumer into rolling files, and the offsets of
+        every partition are committed.
+        """
+        data = {'timestamp': pd.date_range('2023-01-01', periods=1000, freq='1H'), 'value': np.arange(1000.0),
+                'anomaly': np.zeros(1000, dtype=bool)}
+        producer = KafkaProducer('Kafka', topic='series', broker=self.broker)
+        for asset in range(4):
+            for message in SeriesChunkMessage.chunks('attribute', f'asset{asset}', data, chunk_size=100):
+                producer.produce_message(message)
+        producer.flush()
+        self.assertEqual(producer.delivered, 40)
+
+        output = os.path.join(self.directory.name, 'output')
+        consumer = KafkaConsumer('series', writer=RollingFileWriter(output, max_rows=10 ** 6),
+                                 dead_letter=DeadLetterWriter(os.path.join(output, 'dead_letter.jsonl')),
+                                 broker=self.broker)
+        client = self.broker.create_consumer({'group.id': 'g1', 'auto.offset.reset': 'earliest',
+                                              'enable.auto.commit': False})
+        thread = threading.Thread(target=consumer.run, args=(client,))
+        thread.start()
+        deadline = time.monotonic() + 30
+        while consumer.counts['received'] < 40 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        consumer.stop_event.set()
+        thread.join()
+
+        self.assertEqual(consumer.counts['valid'], 40)
+        rows = sum(len(pd.read_csv(path)) for path in glob.glob(os.path.join(output, '*', '*', '*.csv')))
+        self.assertEqual(rows, 4000)
+        for partition in range(3):
+            self.assertEqual(client.group.committed('series', partition), self.broker.log('series', partition).end_offset()
+                             if self.broker.log('series', partition).end_offset() else None)
+
+    def test_create_broker(self):
+        """
+        This function tests the selection of the broker by name and by the SIMULATOR_BROKER environment variable.
+        """
+        self.assertIsInstance(create_broker('kafka'), ConfluentBroker)
+        broker = create_broker('local', self.directory.name, 2)
+        self.assertIsInstance(broker, LocalBroker)
+        self.assertEqual((broker.directory, broker.partitions), (self.directory.name, 2))
+        previous = os.environ.get('SIMULATOR_BROKER')
+        os.environ['SIMULATOR_BROKER'] = 'local'
+        try:
+            self.assertIsInstance(create_broker(), LocalBroker)
+        finally:
+            if previous is None:
+                del os.environ['SIMULATOR_BROKER']
+            else:
+                os.environ['SIMULATOR_BROKER'] = previous
+        with self.assertRaises(ValueError):
+            create_broker('rabbitmq')
@@ -0,0 +1,69 @@
+import json
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from kafka.message_format import SeriesChunkMessage
+
+
+class TestSeriesChunkMessage(unittest.TestCase):
+    """
+    A class to test the binary series chunk message. It sets up a series with missing values and anomalies.
+
+    methods:
+        test_encoding_round_trip
+        test_series_is_split_into_keyed_chunks
+        test_invalid_payload_is_rejected
+    """
+    def setUp(self):
+        values = np.linspace(-1, 1, 100)
+        values[[3, 50, 99]] = np.nan
+        anomaly = np.zeros(100, dtype=bool)
+        anomaly[[10, 11, 60]] = True
+        self.data = {
+            'timestamp': pd.date_range(start='2023-01-01', periods=100, freq='10T'),
+            'value': pd.Series(values),
+            'anomaly': anomaly,
+        }
+
+    def test_encoding_round_trip(self):
+        """
+        This function tests that decoding an encoded message gives back the timestamps, values,
+        missing values and anomalies of the series, in float64 and float32.
+        """
+        for dtype in (np.float64, np.float32):
+            data = {**self.data, 'value': self.data['value'].astype(dtype)}
+            payload = SeriesChunkMessage.from_data('temperature', 'pump-1', data).encode()
+            message = SeriesChunkMessage.decode(payload)
+
+            self.assertEqual((message.attribute_id, message.asset_id), ('temperature', 'pump-1'))
+            self.assertEqual(message.values.dtype, dtype)
+            np.testing.assert_array_equal(message.values, data['value'].values)
+            np.testing.assert_array_equal(message.anomaly, data['anomaly'])
+            np.testing.assert_array_equal(message.timestamps, data['timestamp'].values)
+
+        point = {"attribute_id": 'temperature', "value": 0.5, "timestamp": str(self.data['timestamp'][0]),
+                 "asset_id": 'pump-1'}
+        self.assertLess(len(payload), 100 * len(json.dumps(point)) / 10)
+
+    def test_series_is_split_into_keyed_chunks(self):
+        """
+        This function tests that a series is split into consecutive chunks sharing the asset and attribute key.
+        """
+        messages = [SeriesChunkMessage.decode(message.encode())
+                    for message in SeriesChunkMessage.chunks('temperature', 'pump-1', self.data, chunk_size=30)]
+
+        self.assertEqual([len(message.values) for message in messages], [30, 30, 30, 10])
+        self.assertEqual({message.key for message in messages}, {b'pump-1:temperature'})
+        np.testing.assert_array_equal(np.concatenate([message.timestamps for message in messages]),
+                                      self.data['timestamp'].values)
+        np.testing.assert_array_equal(np.concatenate([message.values for message in messages]),
+                                      self.data['value'].values)
+
+    def test_invalid_payload_is_rejected(self):
+        """
+        This function tests that decoding a JSON payload raises a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            SeriesChunkMessage.decode(json.dumps({'value': 1}).encode('utf-8'))
@@ -0,0 +1,56 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+from data_producer import open_sink
+from metadata_recorder import MetadataRecorder
+
+
+class TestMetadataRecorder(unittest.TestCase):
+    """
+    A class to test the incremental metadata recorder.
+
+    methods:
+        test_rows_are_appended_in_batches
+        test_metadata_is_built_from_memory
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.rows = [{'id': f'{counter}.csv', 'noise_level': 'small', 'percentage_outliers': 0.05,
+                      'trend': None} for counter in range(1, 26)]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_back(self, path):
+        with open_sink(path) as csv_file:
+            return list(csv.DictReader(csv_file))
+
+    def test_rows_are_appended_in_batches(self):
+        """
+        This function tests that rows are appended to the file every flush_every rows and on close.
+        """
+        path = os.path.join(self.directory.name, 'metadata.csv.gz')
+        recorder = MetadataRecorder(path, flush_every=10, flush_seconds=3600)
+        for row in self.rows[:9]:
+            recorder.append(row)
+        self.assertFalse(os.path.exists(path))
+
+        for row in self.rows[9:]:
+            recorder.append(row)
+        recorder.close()
+
+        self.assertEqual([row['id'] for row in self.read_back(path)], [row['id'] for row in self.rows])
+
+    def test_metadata_is_built_from_memory(self):
+        """
+        This function tests that the final metadata equals the metadata read back from the CSV file.
+        """
+        path = os.path.join(self.directory.name, 'metadata.csv')
+        with MetadataRecorder(path, flush_every=7) as recorder:
+            for row in self.rows:
+                recorder.append(row)
+
+        self.assertEqual(json.loads(recorder.to_json()), self.read_back(path))
@@ -0,0 +1,39 @@
+import unittest
+
+import numpy as np
+
+from simulator_data_generation.min_max_scaling import MinMaxScaling
+
+
+class TestMinMaxScaling(unittest.TestCase):
+    """
+    A class to test the closed-form min max scaling.
+
+    methods:
+        test_scale_to_feature_range
+        test_scale_rows_independently
+        test_scale_constant_series
+    """
+    def test_scale_to_feature_range(self):
+        """
+        This function tests that a series is mapped linearly onto the feature range.
+        """
+        scaled = MinMaxScaling.scale(np.array([2.0, 4.0, 3.0, 6.0]), feature_range=(-1, 1))
+        np.testing.assert_allclose(scaled, [-1.0, 0.0, -0.5, 1.0])
+
+    def test_scale_rows_independently(self):
+        """
+        This function tests that every series of a block is scaled with its own minimum and maximum.
+        """
+        block = np.array([[0.0, 5.0, 10.0], [-3.0, -2.0, -1.0]])
+        np.testing.assert_allclose(MinMaxScaling.scale(block), [[-1.0, 0.0, 1.0], [-1.0, 0.0, 1.0]])
+
+    def test_scale_constant_series(self):
+        """
+        This function tests that a constant series is mapped to the lower bound of the range, like sklearn does.
+        """
+        np.testing.assert_allclose(MinMaxScaling.scale(np.full(4, 7.0)), np.full(4, -1.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
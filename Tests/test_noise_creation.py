@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+
+from simulator_data_generation.noise_creation import Noise
+
+
+class TestNoise(unittest.TestCase):
+    """
+    A class to test the vectorized noise engine.
+
+    methods:
+        test_noise_matches_per_element_draws
+        test_noise_block_shape
+        test_no_noise
+    """
+    def setUp(self):
+        self.data = np.random.uniform(-1, 1, (500, 1))
+
+    def test_noise_matches_per_element_draws(self):
+        """
+        This function tests that the vectorized draw produces the same values as drawing
+        one sample per element with a scale proportional to abs(data).
+        """
+        np.random.seed(7)
+        expected = [value + np.random.normal(0, abs(value) * 0.1) for value in self.data[:, 0]]
+
+        np.random.seed(7)
+        noisy = Noise.add_noise(self.data, "small")
+
+        np.testing.assert_array_equal(noisy.values, expected)
+
+    def test_noise_block_shape(self):
+        """
+        This function tests that a 2-D block of series keeps its shape and gets noise in one pass.
+        """
+        block = np.random.uniform(-1, 1, (8, 100))
+        noisy = Noise.add_noise_block(block, "large")
+
+        self.assertEqual(noisy.shape, block.shape)
+        self.assertFalse(np.array_equal(noisy, block))
+
+    def test_no_noise(self):
+        """
+        This function tests that an unknown noise level leaves the data unchanged.
+        """
+        noisy = Noise.add_noise(self.data, "none")
+        np.testing.assert_array_equal(noisy.values, self.data[:, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from data_producer import ParquetDataProducer
+from data_producer_file_creator import DataProducerFileCreation
+
+
+class TestParquetDataProducer(unittest.TestCase):
+    """
+    A class to test the Parquet sink. It sets up a series with missing values and anomalies.
+
+    methods:
+        test_series_is_written_with_typed_columns
+        test_series_are_added_to_partitioned_dataset
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        values = np.linspace(-1, 1, 1000)
+        values[[5, 500]] = np.nan
+        self.data = {
+            'timestamp': pd.date_range(start='2023-01-01', periods=1000, freq='10T'),
+            'value': pd.Series(values),
+            'anomaly': np.arange(1000) % 97 == 0,
+        }
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_series_is_written_with_typed_columns(self):
+        """
+        This function tests that a series is written with int64 timestamps, float32 values and bool anomalies,
+        in row groups of the configured size.
+        """
+        import pyarrow.parquet as pq
+
+        sink = os.path.join(self.directory.name, 'series.parquet')
+        producer = DataProducerFileCreation.create(sink, row_group_size=300, compression='snappy')
+        self.assertIsInstance(producer, ParquetDataProducer)
+        producer.produce(self.data)
+
+        parquet_file = pq.ParquetFile(sink)
+        self.assertEqual(parquet_file.metadata.num_row_groups, 4)
+        self.assertEqual([str(field.type) for field in parquet_file.schema_arrow], ['int64', 'float', 'bool'])
+
+        table = parquet_file.read().to_pandas()
+        np.testing.assert_array_equal(table['timestamp'].values, self.data['timestamp'].asi8)
+        np.testing.assert_array_equal(table['value'].values, self.data['value'].values.astype(np.float32))
+        np.testing.assert_array_equal(table['anomaly'].values, self.data['anomaly'])
+
+    def test_series_are_added_to_partitioned_dataset(self):
+        """
+        This function tests that series written in slices are added to one dataset keyed by simulator and series id.
+        """
+        sink = os.path.join(self.directory.name, 'dataset.parquet')
+        for series_id in ('1', '2'):
+            producer = DataProducerFileCreation.create(sink, simulator='sim', series_id=series_id)
+            producer.produce_chunks({key: column[start:start + 400] for key, column in self.data.items()}
+                                    for start in range(0, 1000, 400))
+
+        dataset = pd.read_parquet(sink)
+        self.assertEqual(len(dataset), 2000)
+        self.assertEqual(sorted(dataset['series_id'].astype(str).unique()), ['1', '2'])
+        self.assertEqual(list(dataset['simulator'].astype(str).unique()), ['sim'])
+        series = pd.read_parquet(sink, filters=[('series_id', '=', 2)])
+        np.testing.assert_array_equal(series['timestamp'].values, self.data['timestamp'].asi8)
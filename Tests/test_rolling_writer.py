@@ -0,0 +1,124 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from kafka.dead_letter import DeadLetterWriter
+from kafka.kafka_consumer import KafkaConsumer
+from kafka.message_format import SERIES_CHUNK_FORMAT, SeriesChunkMessage
+from kafka.rolling_writer import RollingFileWriter
+
+
+class InMemoryMessage:
+    """
+    A consumed Kafka message held in memory.
+    """
+    def __init__(self, offset, value, headers=None, partition=0, topic='kafka_simulated_data'):
+        self._offset = offset
+        self._value = value
+        self._headers = headers
+        self._partition = partition
+        self._topic = topic
+
+    def error(self):
+        return None
+
+    def value(self):
+        return self._value
+
+    def headers(self):
+        return self._headers
+
+    def topic(self):
+        return self._topic
+
+    def partition(self):
+        return self._partition
+
+    def offset(self):
+        return self._offset
+
+
+class TestRollingFileWriter(unittest.TestCase):
+    """
+    A class to test the buffered consumer writer. It sets up a writer on a temporary directory with a manual clock.
+
+    methods:
+        test_partition_rolls_by_size
+        test_partition_rolls_by_time
+        test_consumer_buffers_chunks_and_points
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.now = 0.0
+        self.writer = RollingFileWriter(self.directory.name, max_rows=10, max_seconds=5, clock=lambda: self.now)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def written_files(self):
+        return sorted(os.path.relpath(os.path.join(root, name), self.directory.name)
+                      for root, _, names in os.walk(self.directory.name) for name in names)
+
+    def test_partition_rolls_by_size(self):
+        """
+        This function tests that nothing is written before an asset buffers max_rows rows, and that
+        the whole partition is then written with one file per asset and its next offset returned.
+        """
+        self.writer.add('t', 0, 0, 'a', columns={'value': np.arange(6.0)})
+        self.writer.add('t', 0, 1, 'b', columns={'value': np.arange(3.0), 'asset_id': 'b'})
+        self.writer.add('t', 1, 0, 'a', columns={'value': np.arange(2.0)})
+        self.assertEqual(self.writer.flush_due(), {})
+
+        self.writer.add('t', 0, 2, 'a', columns={'value': np.arange(6.0, 10.0)})
+        self.assertEqual(self.writer.flush_due(), {('t', 0): 3})
+        self.assertEqual(self.written_files(), [os.path.join('t-0', 'a', f'{0:020d}-{2:020d}.csv'),
+                                                os.path.join('t-0', 'b', f'{1:020d}-{2:020d}.csv')])
+
+        rows = pd.read_csv(os.path.join(self.directory.name, self.written_files()[0]))
+        np.testing.assert_array_equal(rows['value'].values, np.arange(10.0))
+        rows = pd.read_csv(os.path.join(self.directory.name, self.written_files()[1]))
+        self.assertEqual(list(rows['asset_id']), ['b'] * 3)
+
+    def test_partition_rolls_by_time(self):
+        """
+        This function tests that a partition is written once its oldest buffered message reaches max_seconds,
+        and that messages without rows still advance its offset.
+        """
+        self.writer.add('t', 0, 7, 'a', record={'value': 1.0})
+        self.writer.add('t', 0, 8)
+        self.now = 4.9
+        self.assertEqual(self.writer.flush_due(), {})
+
+        self.now = 5.0
+        self.assertEqual(self.writer.flush_due(), {('t', 0): 9})
+        self.assertEqual(len(self.written_files()), 1)
+        self.assertEqual(self.writer.flush(), {})
+
+    def test_consumer_buffers_chunks_and_points(self):
+        """
+        This function tests that the consumer buffers binary chunks and JSON points without writing a file
+        per message, and skips invalid points.
+        """
+        dead_letter = DeadLetterWriter(os.path.join(self.directory.name, 'dead_letter.jsonl'))
+        consumer = KafkaConsumer('kafka_simulated_data', writer=self.writer, dead_letter=dead_letter)
+        data = {'timestamp': pd.date_range(start='2023-01-01', periods=4, freq='1H'),
+                'value': np.arange(4.0), 'anomaly': np.zeros(4, dtype=bool)}
+        chunk = SeriesChunkMessage.from_data('temperature', 'pump-1', data).encode()
+        point = {'attribute_id': 'temperature', 'value': 1.5, 'timestamp': '2023-01-01', 'asset_id': 'pump-2'}
+
+        consumer.handle(InMemoryMessage(0, chunk, headers=[('format', SERIES_CHUNK_FORMAT)]))
+        consumer.handle(InMemoryMessage(1, json.dumps(point).encode('utf-8')))
+        consumer.handle(InMemoryMessage(2, json.dumps({**point, 'value': 'high'}).encode('utf-8')))
+        dead_letter.close()
+        self.assertEqual(self.written_files(), ['dead_letter.jsonl'])
+
+        self.assertEqual(self.writer.flush(), {('kafka_simulated_data', 0): 3})
+        files = self.written_files()[1:]
+        self.assertEqual([os.path.dirname(name) for name in files],
+                         [os.path.join('kafka_simulated_data-0', 'pump-1'), os.path.join('kafka_simulated_data-0', 'pump-2')])
+        rows = pd.read_csv(os.path.join(self.directory.name, files[0]))
+        np.testing.assert_array_equal(rows['value'].values, np.arange(4.0))
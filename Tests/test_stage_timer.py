@@ -0,0 +1,113 @@
+import pickle
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from stage_timer import StageTimer, _bucket, _bucket_midpoint
+
+
+class TestStageTimer(unittest.TestCase):
+    """
+    A class to test the timing of the stages of a run.
+
+    methods:
+        test_stages_are_timed
+        test_percentiles
+        test_buckets
+        test_threads
+        test_merge_and_pickle
+    """
+
+    def test_stages_are_timed(self):
+        """
+        This function tests that the with blocks and the calls of a stage are counted and timed, including
+        the ones raising, and that the stages are listed in the order they were first timed.
+        """
+        timer = StageTimer()
+        for _ in range(3):
+            with timer.stage('generate'):
+                time.sleep(0.01)
+        sink = timer.timed('sink', lambda value: value * 2)
+        self.assertEqual(sink(21), 42)
+        with self.assertRaises(ZeroDivisionError):
+            timer.timed('sink', lambda: 1 / 0)()
+
+        summary = timer.summary()
+        self.assertEqual(timer.stages, ['generate', 'sink'])
+        self.assertEqual(list(summary), ['generate', 'sink'])
+        self.assertEqual(summary['generate']['count'], 3)
+        self.assertEqual(summary['sink']['count'], 2)
+        self.assertGreaterEqual(summary['generate']['total_seconds'], 0.03)
+        self.assertGreaterEqual(summary['generate']['p50_ms'], 10 * 15 / 16)
+        self.assertGreater(summary['generate']['share'], 0.9)
+        self.assertAlmostEqual(sum(stage['share'] for stage in summary.values()), 1.0)
+        self.assertEqual(timer.report().splitlines()[0].split()[0], 'generate')
+
+    def test_percentiles(self):
+        """
+        This function tests that the percentiles read from the histogram are within the precision of a
+        bucket of the exact ones, and never above the maximum.
+        """
+        durations = np.random.RandomState(0).lognormal(13, 1.5, 10000).astype(np.int64)
+        timer = StageTimer()
+        for duration in durations:
+            timer.add('stage', int(duration))
+
+        summary = timer.summary(percentiles=(50, 90, 99, 99.99))
+        for percentile in (50, 90, 99):
+            exact = np.sort(durations)[len(durations) * percentile // 100 - 1] / 1e6
+            self.assertAlmostEqual(summary['stage'][f'p{percentile:g}_ms'], exact, delta=exact / 16)
+        self.assertEqual(summary['stage']['max_ms'], durations.max() / 1e6)
+        self.assertAlmostEqual(summary['stage']['mean_ms'], durations.mean() / 1e6)
+        self.assertLessEqual(summary['stage']['p99.99_ms'], summary['stage']['max_ms'])
+
+    def test_buckets(self):
+        """
+        This function tests that durations fall in ordered buckets whose midpoint is close to them.
+        """
+        previous = -1
+        for nanoseconds in range(0, 5000):
+            bucket = _bucket(nanoseconds)
+            self.assertGreaterEqual(bucket, previous)
+            self.assertLessEqual(abs(_bucket_midpoint(bucket) - nanoseconds), max(0.5, nanoseconds / 16))
+            previous = bucket
+        self.assertLess(_bucket(10 ** 12), 400)
+
+    def test_threads(self):
+        """
+        This function tests that runs timed from several threads are all counted.
+        """
+        timer = StageTimer()
+        write = timer.timed('sink', lambda: None)
+
+        def run():
+            for _ in range(1000):
+                write()
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(timer.summary()['sink']['count'], 4000)
+
+    def test_merge_and_pickle(self):
+        """
+        This function tests that a timer sent to another process and back adds its runs to another timer.
+        """
+        timer = StageTimer()
+        timer.add('noise', 1000)
+        worker = pickle.loads(pickle.dumps(timer))
+        worker.add('noise', 3000)
+        worker.add('outliers', 500)
+        with worker.stage('missing_values'):
+            pass
+
+        timer.merge(worker)
+        summary = timer.summary()
+        self.assertEqual(summary['noise']['count'], 3)
+        self.assertEqual(summary['noise']['max_ms'], 0.003)
+        self.assertEqual(summary['outliers']['count'], 1)
+        self.assertEqual(summary['missing_values']['count'], 1)
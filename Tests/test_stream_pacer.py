@@ -0,0 +1,205 @@
+import threading
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from stream_pacer import StreamPacer, interleave
+
+
+class FakeClock:
+    """
+    A clock advanced by the sleeps of the pacer, and by overshoot seconds more than asked on every sleep.
+    """
+
+    def __init__(self, overshoot=0.0):
+        self.now = 100.0
+        self.overshoot = overshoot
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds + self.overshoot
+
+
+class TestStreamPacer(unittest.TestCase):
+    """
+    A class to test the pacing of a stream.
+
+    methods:
+        pacer
+        test_target_rate
+        test_speed
+        test_rate_and_speed
+        test_catch_up_is_bounded
+        test_lag_and_jitter
+        test_unpaced
+        test_invalid_options
+        test_stopped_wait
+    """
+
+    @staticmethod
+    def pacer(clock, **options):
+        return StreamPacer(clock=clock, sleep=clock.sleep, **options)
+
+    def test_target_rate(self):
+        """
+        This function tests that batches are released at the target rate.
+        """
+        clock = FakeClock()
+        pacer = self.pacer(clock, rate=1000)
+        for _ in range(500):
+            pacer.wait(10)
+        # the last batch is released once the 4990 points before it are sent
+        self.assertAlmostEqual(pacer.elapsed, 4.99)
+        self.assertEqual(pacer.points, 5000)
+        self.assertAlmostEqual(pacer.stats()['achieved_rate'], 5000 / 4.99)
+
+    def test_speed(self):
+        """
+        This function tests that the timestamps of the batches are replayed at a multiple of wall-clock speed.
+        """
+        clock = FakeClock()
+        pacer = self.pacer(clock, speed=60)
+        released = []
+        for timestamp in (3600, 3660, 3720, 3720, 7200):
+            pacer.wait(5, timestamp)
+            released.append(clock.now - 100.0)
+        self.assertEqual(released, [0.0, 1.0, 2.0, 2.0, 60.0])
+
+    def test_rate_and_speed(self):
+        """
+        This function tests that with a rate and a speed a batch waits for the later of its two deadlines.
+        """
+        clock = FakeClock()
+        pacer = self.pacer(clock, rate=10, speed=1)
+        pacer.wait(20, 0)
+        pacer.wait(5, 1)
+        self.assertAlmostEqual(clock.now - 100.0, 2.0)
+        pacer.wait(5, 10)
+        self.assertAlmostEqual(clock.now - 100.0, 10.0)
+
+    def test_catch_up_is_bounded(self):
+        """
+        This function tests that a stream falling behind sends at most burst points ahead of the
+        current one without waiting.
+        """
+        clock = FakeClock()
+        pacer = self.pacer(clock, rate=64, burst=32)
+        pacer.wait(1)
+        clock.now += 10.0
+        sleeps = []
+        pacer.sleep = lambda seconds: (sleeps.append(seconds), clock.sleep(seconds))
+        for _ in range(100):
+            pacer.wait(1)
+        self.assertEqual(len(sleeps), 100 - 33)
+        self.assertAlmostEqual(pacer.elapsed, 10.0 - 0.5 + 99 / 64)
+
+    def test_lag_and_jitter(self):
+        """
+        This function tests the lag and jitter of a stream whose sleeps overshoot.
+        """
+        clock = FakeClock(overshoot=0.002)
+        pacer = self.pacer(clock, rate=100, burst=1)
+        lags = [pacer.wait(1) for _ in range(10)]
+        stats = pacer.stats()
+        self.assertEqual(lags[0], 0.0)
+        self.assertTrue(all(lag > 0 for lag in lags[1:]))
+        self.assertAlmostEqual(stats['max_lag'], max(lags))
+        self.assertAlmostEqual(stats['mean_lag'], np.mean(lags))
+        self.assertAlmostEqual(stats['jitter'], np.std(lags))
+        self.assertEqual(stats['lag'], lags[-1])
+
+    def test_unpaced(self):
+        """
+        This function tests that without a rate or a speed batches are released without waiting or lag.
+        """
+        clock = FakeClock()
+        pacer = self.pacer(clock)
+        for timestamp in range(10):
+            self.assertEqual(pacer.wait(100, timestamp * 3600), 0.0)
+            clock.now += 0.5
+        self.assertEqual(pacer.stats()['max_lag'], 0.0)
+        self.assertAlmostEqual(pacer.stats()['achieved_rate'], 200.0)
+
+    def test_invalid_options(self):
+        """
+        This function tests that a rate or a speed that is not positive is rejected.
+        """
+        with self.assertRaises(ValueError):
+            StreamPacer(rate=0)
+        with self.assertRaises(ValueError):
+            StreamPacer(speed=-1)
+
+    def test_stopped_wait(self):
+        """
+        This function tests that a pacer sleeping on an event stops waiting as soon as the event is set.
+        """
+        stop_event = threading.Event()
+        pacer = StreamPacer(rate=1, sleep=stop_event.wait)
+        pacer.wait(1)
+        threading.Timer(0.05, stop_event.set).start()
+        started = time.monotonic()
+        pacer.wait(3600)
+        pacer.wait(3600)
+        self.assertLess(time.monotonic() - started, 5)
+
+
+class TestInterleave(unittest.TestCase):
+    """
+    A class to test the interleaving of series into time windows.
+
+    methods:
+        chunks
+        test_windows_in_time_order
+        test_one_slice_held_per_series
+    """
+
+    def chunks(self, freq, periods, chunk_size, pulled=None):
+        timestamps = pd.date_range("2023-01-01", periods=periods, freq=freq)
+        values = np.arange(periods, dtype=float)
+        for start in range(0, periods, chunk_size):
+            if pulled is not None:
+                pulled.append(start)
+            yield {'timestamp': timestamps[start:start + chunk_size], 'value': values[start:start + chunk_size],
+                   'anomaly': values[start:start + chunk_size] % 7 == 0}
+
+    def test_windows_in_time_order(self):
+        """
+        This function tests that every point of every series is replayed once, window by window in time order.
+        """
+        windows = list(interleave([self.chunks("1H", 48, 5), self.chunks("6H", 8, 3), self.chunks("1D", 2, 1)],
+                                  window=6 * 3600))
+        starts = [start for start, _ in windows]
+        self.assertEqual(starts, sorted(starts))
+        self.assertEqual(len(windows), 8)
+        self.assertEqual(starts[0], pd.Timestamp("2023-01-01").timestamp())
+
+        for position, (freq, periods) in enumerate((("1H", 48), ("6H", 8), ("1D", 2))):
+            points = [data for _, window_points in windows for series, data in window_points if series == position]
+            values = np.concatenate([data['value'] for data in points])
+            timestamps = np.concatenate([data['timestamp'] for data in points])
+            anomaly = np.concatenate([data['anomaly'] for data in points])
+            np.testing.assert_array_equal(values, np.arange(periods))
+            np.testing.assert_array_equal(timestamps, pd.date_range("2023-01-01", periods=periods, freq=freq).values)
+            np.testing.assert_array_equal(anomaly, np.arange(periods) % 7 == 0)
+
+        for start, window_points in windows:
+            for _, data in window_points:
+                self.assertTrue(len(data['value']))
+                seconds = data['timestamp'].astype('datetime64[ns]').astype(np.int64) / 1e9
+                self.assertTrue(((seconds >= start) & (seconds < start + 6 * 3600)).all())
+
+    def test_one_slice_held_per_series(self):
+        """
+        This function tests that the slices of a series are only pulled when their window comes.
+        """
+        pulled = []
+        windows = interleave([self.chunks("1H", 100, 10, pulled)], window=3600)
+        next(windows)
+        self.assertEqual(pulled, [0])
+        for _ in range(10):
+            next(windows)
+        self.assertEqual(pulled, [0, 10])
@@ -1,10 +1,14 @@
 import unittest
+from unittest import mock
+
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from simulator_api.models import Simulator
+from simulator_api import views
+from simulator_api.job_executor import JobExecutor
+from simulator_api.models import Simulator, SimulatorJob
 
 
 class TestSimulatorListing(TestCase):
@@ -127,13 +131,144 @@ class TestSimulatorRunning(TestCase):
     def test_run_simulator(self):
         """
         This method tests running a simulator. It asserts that
-        the return response code is 200 OK and the response data equals the expected data.
+        the return response code is 202 Accepted and the response data equals the expected data.
         """
         response = self.client.post(self.url)
 
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        self.assertEqual(response.data, {"simulator2": "Queued"})
+
+
+class TestSimulatorStreaming(TestCase):
+    """
+    This class tests the validation of the streaming options of a run.
+    It sets up a Kafka simulator, a CSV simulator and the client that will send the requests.
+
+    methods:
+        test_stream_needs_kafka
+        test_invalid_streaming_options
+        test_unknown_mode
+    """
+    def setUp(self):
+        self.client = APIClient()
+        for name, sink_name in (("kafka simulator", "Kafka"), ("csv simulator", "CSV")):
+            Simulator.objects.create(name=name, start_date="2020-01-01 00:00:00", end_date="2020-01-02 00:00:00",
+                                     use_case_name=name, time_series_type="Additive", sink_name=sink_name)
+
+    def test_stream_needs_kafka(self):
+        """
+        This method tests that a simulator without the Kafka sink cannot run in streaming mode. It asserts
+        that the return response code is 400 Bad Request.
+        """
+        url = reverse('run', kwargs={"simulator_name": "csv simulator"})
+        response = self.client.post(url, {"mode": "stream", "rate": 1000}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_streaming_options(self):
+        """
+        This method tests that a rate or a speed that is not a positive number is rejected. It asserts
+        that the return response code is 400 Bad Request.
+        """
+        url = reverse('run', kwargs={"simulator_name": "kafka simulator"})
+        for options in ({"rate": "fast"}, {"rate": -5}, {"speed": 0}):
+            response = self.client.post(url, {"mode": "stream", **options}, format='json')
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unknown_mode(self):
+        """
+        This method tests that an unknown run mode is rejected. It asserts that the return response
+        code is 400 Bad Request.
+        """
+        url = reverse('run', kwargs={"simulator_name": "kafka simulator"})
+        response = self.client.post(url, {"mode": "replay"}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestSimulatorQueue(TestCase):
+    """
+    This class tests the queueing of the runs of simulators.
+    It sets up simulators, the client that will send the requests and a job executor with a queue of one job,
+    whose workers never start since the transaction of a test is never committed.
+
+    methods:
+        test_run_is_queued
+        test_already_queued
+        test_queue_full
+        test_invalid_priority
+        test_stop_queued_simulator
+    """
+    def setUp(self):
+        self.client = APIClient()
+        for name in ("simulator1", "simulator2"):
+            Simulator.objects.create(name=name, start_date="2020-01-01 00:00:00", end_date="2020-01-02 00:00:00",
+                                     use_case_name=name, time_series_type="Additive", sink_name="CSV")
+        patcher = mock.patch.object(views, 'job_executor', JobExecutor(views.run_simulator, workers=1, queue_size=1))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_run_is_queued(self):
+        """
+        This method tests that a run is queued with its options and priority. It asserts that the return
+        response code is 202 Accepted and that the simulator is Queued.
+        """
+        url = reverse('run', kwargs={"simulator_name": "simulator1"})
+        response = self.client.post(url, {"priority": 3}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data, {"simulator1": "Queued"})
+        self.assertEqual(Simulator.objects.get(name="simulator1").status, "Queued")
+        job = SimulatorJob.objects.get()
+        self.assertEqual((job.simulator.name, job.priority, job.options), ("simulator1", 3, {'mode': 'batch'}))
+
+    def test_already_queued(self):
+        """
+        This method tests that a simulator cannot be queued twice. It asserts that the return response code
+        is 409 Conflict.
+        """
+        url = reverse('run', kwargs={"simulator_name": "simulator1"})
+        self.client.post(url)
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_queue_full(self):
+        """
+        This method tests that a run is rejected while the queue is full. It asserts that the return response
+        code is 503 Service Unavailable with a Retry-After header, and that the simulator stays Submitted.
+        """
+        self.client.post(reverse('run', kwargs={"simulator_name": "simulator1"}))
+        response = self.client.post(reverse('run', kwargs={"simulator_name": "simulator2"}))
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn('Retry-After', response)
+        self.assertIn("queue is full", response.data["error"])
+        self.assertEqual(Simulator.objects.get(name="simulator2").status, "Submitted")
+
+    def test_invalid_priority(self):
+        """
+        This method tests that a priority that is not an integer is rejected. It asserts that the return
+        response code is 400 Bad Request.
+        """
+        url = reverse('run', kwargs={"simulator_name": "simulator1"})
+        response = self.client.post(url, {"priority": "urgent"}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_stop_queued_simulator(self):
+        """
+        This method tests stopping a queued simulator. It asserts that its job is removed from the queue
+        and that it is marked as Failed.
+        """
+        self.client.post(reverse('run', kwargs={"simulator_name": "simulator1"}))
+        response = self.client.post(reverse('stop', kwargs={"simulator_name": "simulator1"}))
 
-        self.assertEqual(response.data, {"simulator2": "Running"})
+        self.assertEqual(response.data, {'message': 'simulator1 stopped.'})
+        self.assertFalse(SimulatorJob.objects.exists())
+        self.assertEqual(Simulator.objects.get(name="simulator1").status, "Failed")
 
 
 class TestSimulatorStopping(TestCase):
@@ -0,0 +1,72 @@
+import threading
+import time
+import unittest
+
+from write_pipeline import WritePipeline
+
+
+class TestWritePipeline(unittest.TestCase):
+    """
+    A class to test the pipeline overlapping generation and writes.
+
+    methods:
+        test_writes_overlap_and_complete
+        test_full_queue_blocks_generation
+        test_writer_error_is_raised
+    """
+    def test_writes_overlap_and_complete(self):
+        """
+        This function tests that every submitted write is done by the writer threads once the pipeline is closed.
+        """
+        written = []
+        threads = set()
+
+        def write(value):
+            time.sleep(0.001)
+            threads.add(threading.current_thread())
+            written.append(value)
+
+        with WritePipeline(writers=3, queue_size=4) as pipeline:
+            for value in range(50):
+                pipeline.submit(write, value)
+
+        self.assertEqual(sorted(written), list(range(50)))
+        self.assertNotIn(threading.current_thread(), threads)
+        self.assertEqual(pipeline.stats()['written'], 50)
+
+    def test_full_queue_blocks_generation(self):
+        """
+        This function tests that submit blocks while the queue is full, and that the stall time and
+        queue depth are reported.
+        """
+        release = threading.Event()
+        pipeline = WritePipeline(writers=1, queue_size=2)
+        for value in range(3):
+            pipeline.submit(release.wait)
+
+        threading.Timer(0.2, release.set).start()
+        started = time.perf_counter()
+        pipeline.submit(release.wait)
+        self.assertGreaterEqual(time.perf_counter() - started, 0.15)
+        pipeline.close()
+
+        stats = pipeline.stats()
+        self.assertEqual(stats['written'], 4)
+        self.assertEqual(stats['max_queue_depth'], 2)
+        self.assertGreaterEqual(stats['stall_seconds'], 0.15)
+
+    def test_writer_error_is_raised(self):
+        """
+        This function tests that an error of a writer stops the submission of new writes and is raised by close.
+        """
+        def fail():
+            raise OSError("disk full")
+
+        pipeline = WritePipeline(writers=1, queue_size=1)
+        pipeline.submit(fail)
+        with self.assertRaises(OSError):
+            for _ in range(100):
+                time.sleep(0.01)
+                pipeline.submit(time.sleep, 0)
+        with self.assertRaises(OSError):
+            pipeline.close()
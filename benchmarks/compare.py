@@ -0,0 +1,83 @@
+"""
+Compare two result files of the benchmark suite, e.g. of two commits, and fail on a regression.
+
+A benchmark regresses when its throughput drops by more than the threshold, or when its peak resident
+memory grows by more than the RSS threshold. Benchmarks found in only one of the files are listed but
+never fail the comparison.
+
+Run from the repository root:
+    python benchmarks/compare.py benchmarks/results/<baseline>.json benchmarks/results/<candidate>.json
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    """
+    Return the metadata and the results of a result file.
+    """
+    with open(path) as file:
+        report = json.load(file)
+    return report.get('metadata', {}), report['results']
+
+
+def compare(baseline, candidate, threshold=0.10, rss_threshold=0.20):
+    """
+    Compare the results of two runs benchmark by benchmark.
+
+    Parameters:
+        baseline (dict): The results of the baseline run.
+        candidate (dict): The results of the candidate run.
+        threshold (float): The relative drop in throughput counted as a regression.
+        rss_threshold (float): The relative growth in peak resident memory counted as a regression.
+
+    Returns:
+        list: A (name, throughput ratio, peak RSS ratio, regressed) tuple per benchmark of both runs,
+        the peak RSS ratio being None for benchmarks that do not measure it.
+    """
+    rows = []
+    for name in sorted(set(baseline) & set(candidate)):
+        ratio = candidate[name]['points_per_sec'] / baseline[name]['points_per_sec']
+        rss_ratio = None
+        if baseline[name].get('peak_rss_mb') and candidate[name].get('peak_rss_mb'):
+            rss_ratio = candidate[name]['peak_rss_mb'] / baseline[name]['peak_rss_mb']
+        regressed = ratio < 1 - threshold or (rss_ratio is not None and rss_ratio > 1 + rss_threshold)
+        rows.append((name, ratio, rss_ratio, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline', help="The result file of the baseline.")
+    parser.add_argument('candidate', help="The result file of the candidate.")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="The relative drop in throughput counted as a regression (default 0.10).")
+    parser.add_argument('--rss-threshold', type=float, default=0.20,
+                        help="The relative growth in peak RSS counted as a regression (default 0.20).")
+    args = parser.parse_args()
+
+    baseline_metadata, baseline = load(args.baseline)
+    candidate_metadata, candidate = load(args.candidate)
+    print(f"baseline  {baseline_metadata.get('commit')}  {baseline_metadata.get('timestamp')}")
+    print(f"candidate {candidate_metadata.get('commit')}  {candidate_metadata.get('timestamp')}")
+    for key in ('python', 'numpy', 'pandas', 'platform', 'cpus'):
+        if baseline_metadata.get(key) != candidate_metadata.get(key):
+            print(f"warning: {key} differs ({baseline_metadata.get(key)} vs {candidate_metadata.get(key)})")
+
+    rows = compare(baseline, candidate, args.threshold, args.rss_threshold)
+    for name, ratio, rss_ratio, regressed in rows:
+        rss = f"{rss_ratio:>6.2f}x" if rss_ratio is not None else f"{'-':>7}"
+        print(f"{name:<42} {baseline[name]['points_per_sec']:>14,.0f} -> {candidate[name]['points_per_sec']:>14,.0f} "
+              f"points/sec {ratio:>6.2f}x  peak RSS {rss}{'  REGRESSION' if regressed else ''}")
+    for name in sorted(set(baseline) ^ set(candidate)):
+        print(f"{name:<42} only in the {'baseline' if name in baseline else 'candidate'}")
+
+    regressions = sum(regressed for *_, regressed in rows)
+    print(f"{regressions} regression(s) in {len(rows)} benchmark(s)")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
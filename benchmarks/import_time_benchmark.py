@@ -0,0 +1,57 @@
+"""
+Measure the cold import time of the generation and sink modules.
+
+Every module is imported in a fresh interpreter, so nothing is shared between measurements.
+The script exits with status 1 when a module takes longer than the budget, so it can guard
+against heavy imports creeping back in.
+
+Run from the repository root:
+    python benchmarks/import_time_benchmark.py --budget-ms 250
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    'data_simulator',
+    'data_producer',
+    'data_producer_file_creator',
+    'kafka.kafka_producer',
+    'kafka.kafka_consumer',
+]
+
+
+def import_time_ms(module):
+    """
+    Import a module in a fresh interpreter and return the time the import took.
+    """
+    code = ("import time; start = time.perf_counter(); "
+            f"import {module}; print((time.perf_counter() - start) * 1000)")
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True, capture_output=True, text=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=250, help='the maximum median import time of a module')
+    parser.add_argument('--repeats', type=int, default=5, help='the number of fresh imports per module')
+    args = parser.parse_args()
+
+    over_budget = []
+    for module in MODULES:
+        median = statistics.median(import_time_ms(module) for _ in range(args.repeats))
+        print(f"{module:<28} {median:>8.1f} ms")
+        if median > args.budget_ms:
+            over_budget.append(module)
+
+    if over_budget:
+        print(f"over the {args.budget_ms:.0f} ms budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark the Parquet sink against the CSV sink: write time, size on disk and read time.
+
+Run from the repository root:
+    python benchmarks/parquet_benchmark.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_producer import CsvDataProducer, ParquetDataProducer
+
+
+def best_time(function, repeats=3):
+    """
+    Return the best duration of function() over a number of repeats.
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    import pandas as pd
+
+    # one year of 10T data
+    size = 365 * 24 * 6
+    values = np.random.uniform(-1, 1, size)
+    values[np.random.choice(size, size // 20, replace=False)] = np.nan
+    data = {
+        'timestamp': pd.date_range(start='2023-01-01', periods=size, freq='10T'),
+        'value': pd.Series(values),
+        'anomaly': np.random.random(size) < 0.01,
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        producers = {
+            'csv': (CsvDataProducer(os.path.join(directory, 'series.csv')), pd.read_csv),
+            'parquet (zstd)': (ParquetDataProducer(os.path.join(directory, 'series.parquet')), pd.read_parquet),
+            'parquet (snappy)': (ParquetDataProducer(os.path.join(directory, 'snappy.parquet'), compression='snappy'),
+                                 pd.read_parquet),
+        }
+        for name, (producer, reader) in producers.items():
+            write = best_time(lambda: producer.produce(data))
+            read = best_time(lambda: reader(producer.sink))
+            megabytes = os.path.getsize(producer.sink) / 2 ** 20
+            print(f"{name:<17} write {size / write:>12,.0f} points/sec  read {size / read:>12,.0f} points/sec  "
+                  f"{megabytes:>6.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
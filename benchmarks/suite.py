@@ -0,0 +1,308 @@
+"""
+Benchmark the generation components over a grid of frequencies and horizons (micro benchmarks) and whole
+sweeps written to every sink (macro benchmarks), and save the results as JSON to compare between commits.
+
+Micro benchmarks report the best throughput of one component over a number of repeats. Every macro
+benchmark runs in a fresh process so that its peak resident memory is its own, and reports its throughput
+and peak RSS.
+
+Run from the repository root:
+    python benchmarks/suite.py [--quick] [--only micro|macro] [--output results.json]
+    python benchmarks/compare.py benchmarks/results/<baseline>.json benchmarks/results/<candidate>.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+START_DATE = datetime.datetime(2023, 1, 1)
+FREQUENCIES = ['10T', '1H', '1D']
+HORIZONS = [30, 365]
+QUICK_FREQUENCIES = ['10T', '1D']
+QUICK_HORIZONS = [30]
+MACRO_CASES = ['generate', 'generate_batched', 'generate_chunked', 'csv', 'csv_gzip', 'parquet', 'store', 'kafka']
+HARMONICS = [{'amplitude': 1.0, 'phase_shift': 0.0, 'frequency_type': 'Daily', 'frequency_multiplier': 2},
+             {'amplitude': 0.5, 'phase_shift': 1.0, 'frequency_type': 'Weekly', 'frequency_multiplier': 1},
+             {'amplitude': 0.2, 'phase_shift': 0.0, 'frequency_type': 'Monthly', 'frequency_multiplier': 1}]
+
+
+def best_time(function, setup=None, repeats=3):
+    """
+    Return the best duration of function(setup()) over a number of repeats, setup not being timed.
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        function(argument)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_rss_mb():
+    """
+    Return the peak resident memory of this process in megabytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def micro_cases(freq, days):
+    """
+    Return the number of points of the time index of a frequency and horizon, and the micro benchmarks
+    over it as {name: (setup, function)}.
+    """
+    from simulator_data_generation.calendar_features import CalendarFeatures
+    from simulator_data_generation.cycles_creation import Cycles
+    from simulator_data_generation.min_max_scaling import MinMaxScaling
+    from simulator_data_generation.missing_values_creation import MissingValues
+    from simulator_data_generation.noise_creation import Noise
+    from simulator_data_generation.outliers_creation import Outliers
+    from simulator_data_generation.seasonality_creation import DailySeasonality, FourierSeasonality, WeeklySeasonality
+    from simulator_data_generation.time_series_generation import TimeSeriesGenerator
+    from simulator_data_generation.trend_creation import Trend
+
+    end_date = START_DATE + datetime.timedelta(days=days)
+    index = TimeSeriesGenerator.generate_time_series(START_DATE, end_date, freq)
+    size = len(index)
+    column = np.random.uniform(-1, 1, (size, 1))
+
+    # the calendar fields are computed once per instance, so every timing gets a fresh one
+    def calendar():
+        return CalendarFeatures.from_range(START_DATE, freq, size)
+
+    def values():
+        return column.copy()
+
+    # outliers and missing values take the series the noise stage returns
+    def series():
+        return column[:, 0].copy()
+
+    return size, {
+        'time_index': (None, lambda _: TimeSeriesGenerator.generate_time_series(START_DATE, end_date, freq)),
+        'calendar_features': (calendar, lambda features: (features.day_fraction, features.dayofweek,
+                                                          features.quarter)),
+        'daily_seasonality': (calendar, lambda features: DailySeasonality().add_seasonality(features, 'exist',
+                                                                                            'additive')),
+        'weekly_seasonality': (calendar, lambda features: WeeklySeasonality().add_seasonality(features, 'exist',
+                                                                                              'additive')),
+        'fourier_seasonality': (calendar, lambda features: FourierSeasonality().add_seasonality(features, HARMONICS,
+                                                                                                'additive')),
+        'trend': (None, lambda _: Trend.add_trend(index, 'exist', days, 'additive')),
+        'cycles': (calendar, lambda features: Cycles.add_cycles(features, 'exist', 'additive')),
+        'min_max_scaling': (values, lambda data: MinMaxScaling.scale(data[:, 0])),
+        'noise': (values, lambda data: Noise.add_noise(data, 'large')),
+        'outliers': (series, lambda data: Outliers.add_outliers(data, 0.05)),
+        'missing_values': (series, lambda data: MissingValues.add_missing_values(data, 0.05)),
+    }
+
+
+def run_micro(frequencies, horizons, repeats):
+    """
+    Run the micro benchmarks over the grid of frequencies and horizons.
+
+    Returns:
+        dict: The results keyed by 'micro/<component>/<frequency>/<horizon>d'.
+    """
+    results = {}
+    for freq in frequencies:
+        for days in horizons:
+            size, cases = micro_cases(freq, days)
+            for name, (setup, function) in cases.items():
+                seconds = best_time(function, setup, repeats)
+                results[f'micro/{name}/{freq}/{days}d'] = {
+                    'kind': 'micro', 'params': {'component': name, 'freq': freq, 'days': days},
+                    'points': size, 'seconds': seconds, 'points_per_sec': size / seconds,
+                }
+                print(f"micro {name:<20} {freq:>4} {days:>4}d {size / seconds:>16,.0f} points/sec")
+    return results
+
+
+def sweep_generator(freq, days):
+    """
+    Return a DataGenerator over a sweep of 16 series of one frequency and horizon.
+    """
+    from configuration_manager_reader.configuration_manager_abstract import ConfigurationManager
+    from data_simulator import DataGenerator
+
+    class SweepConfigurationManager(ConfigurationManager):
+        def read(self):
+            return {
+                'start_date': START_DATE,
+                'frequencies': [freq],
+                'daily_seasonality_options': ['exist', 'none'],
+                'weekly_seasonality_options': ['exist', 'none'],
+                'noise_levels': ['small', 'large'],
+                'trend_levels': ['exist', 'none'],
+                'cyclic_periods': ['exist'],
+                'time_series_type': 'additive',
+                'percentage_outliers_options': [0.05],
+                'data_size': days,
+            }
+
+    return DataGenerator(SweepConfigurationManager('memory'))
+
+
+def run_macro_case(case, freq, days):
+    """
+    Generate a sweep and write it to the sink of a macro benchmark, in this process.
+
+    Returns:
+        dict: The number of points, the duration and the peak resident memory of the run.
+    """
+    from data_producer import CsvDataProducer, ParquetDataProducer
+    from dataset_store import DatasetStoreProducer
+    from kafka.kafka_producer import KafkaProducer
+    from kafka.local_broker import LocalBroker
+    from kafka.message_format import SeriesChunkMessage
+
+    random.seed(0)
+    np.random.seed(0)
+    generator = sweep_generator(freq, days)
+    baseline_rss = peak_rss_mb()
+    points = 0
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        if case == 'generate_chunked':
+            for chunks, _ in generator.generate_chunked(chunk_size=4096):
+                points += sum(len(chunk['value']) for chunk in chunks)
+        else:
+            producer = None
+            if case == 'store':
+                producer = DatasetStoreProducer(os.path.join(directory, 'sweep.store'))
+            elif case == 'kafka':
+                producer = KafkaProducer('Kafka', topic='series', broker=LocalBroker(directory))
+            for position, (data, meta_data) in enumerate(generator.generate(batched=case == 'generate_batched')):
+                points += len(data['value'])
+                if case == 'csv':
+                    CsvDataProducer(os.path.join(directory, f'{position}.csv')).produce(data)
+                elif case == 'csv_gzip':
+                    CsvDataProducer(os.path.join(directory, f'{position}.csv.gz')).produce(data)
+                elif case == 'parquet':
+                    ParquetDataProducer(os.path.join(directory, f'{position}.parquet')).produce(data)
+                elif case == 'store':
+                    producer.produce(data, series_id=meta_data['id'])
+                elif case == 'kafka':
+                    for message in SeriesChunkMessage.chunks('attribute', meta_data['id'], data):
+                        producer.produce_message(message)
+            if case == 'store':
+                producer.close()
+            elif case == 'kafka':
+                producer.flush()
+        seconds = time.perf_counter() - start
+    return {'points': points, 'seconds': seconds, 'peak_rss_mb': peak_rss_mb(), 'baseline_rss_mb': baseline_rss}
+
+
+def run_macro(frequencies, horizons, repeats):
+    """
+    Run every macro benchmark in a fresh process, keeping the fastest of a number of repeats.
+
+    Returns:
+        dict: The results keyed by 'macro/<case>/<frequency>/<horizon>d'.
+    """
+    results = {}
+    for freq in frequencies:
+        for days in horizons:
+            for case in MACRO_CASES:
+                runs = []
+                for _ in range(repeats):
+                    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--case', case,
+                                             '--freq', freq, '--days', str(days)],
+                                            cwd=ROOT, capture_output=True, text=True, check=True).stdout
+                    runs.append(json.loads(output.strip().splitlines()[-1]))
+                run = min(runs, key=lambda run: run['seconds'])
+                results[f'macro/{case}/{freq}/{days}d'] = {
+                    'kind': 'macro', 'params': {'case': case, 'freq': freq, 'days': days, 'series': 16},
+                    'points': run['points'], 'seconds': run['seconds'],
+                    'points_per_sec': run['points'] / run['seconds'], 'peak_rss_mb': run['peak_rss_mb'],
+                    'baseline_rss_mb': run['baseline_rss_mb'],
+                }
+                print(f"macro {case:<20} {freq:>4} {days:>4}d {run['points'] / run['seconds']:>16,.0f} points/sec  "
+                      f"peak RSS {run['peak_rss_mb']:>8.1f} MB")
+    return results
+
+
+def git_revision():
+    """
+    Return the commit of the working tree and whether it has uncommitted changes, None when it is not a git checkout.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+def metadata():
+    """
+    Return what the results depend on besides the code: the commit, the versions and the machine.
+    """
+    import pandas as pd
+
+    commit, dirty = git_revision()
+    return {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', choices=['micro', 'macro'], help="Run only the micro or the macro benchmarks.")
+    parser.add_argument('--quick', action='store_true', help="Run over a smaller grid.")
+    parser.add_argument('--repeats', type=int, default=3, help="The number of repeats of every benchmark.")
+    parser.add_argument('--output', help="The JSON file of the results, benchmarks/results/<commit>.json by default.")
+    parser.add_argument('--case', choices=MACRO_CASES, help=argparse.SUPPRESS)
+    parser.add_argument('--freq', help=argparse.SUPPRESS)
+    parser.add_argument('--days', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        # a single macro benchmark run by run_macro in its own process
+        result = run_macro_case(args.case, args.freq, args.days)
+        sys.stdout.flush()
+        print(json.dumps(result))
+        return
+
+    frequencies = QUICK_FREQUENCIES if args.quick else FREQUENCIES
+    horizons = QUICK_HORIZONS if args.quick else HORIZONS
+    results = {}
+    if args.only != 'macro':
+        np.random.seed(0)
+        results.update(run_micro(frequencies, horizons, args.repeats))
+    if args.only != 'micro':
+        results.update(run_macro(frequencies, horizons, args.repeats))
+
+    report = {'metadata': metadata(), 'results': results}
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results',
+                                         f"{report['metadata']['commit'] or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -13,12 +13,14 @@ class ConfigurationManagerCreator:
         self.simulator_name = simulator_name
 
     @classmethod
-    def create(cls, source: str, simulator_name):
+    def create(cls, source: str, simulator_name, snapshot=None, harmonic_seasonality=False):
         """
         Creates an instance from the chosen source.
 
         Parameters:
             source: The source of the data. Can be yaml file or json file
+            snapshot: The ConfigurationSnapshot of the simulator, read from the database when not given
+            harmonic_seasonality: Evaluate the seasons of the database configurations as harmonic components
 
         """
         if source.endswith('.yml'):
@@ -28,7 +30,8 @@ class ConfigurationManagerCreator:
             return configuration_manager_json_reader.JsonConfigurationManager(source)
 
         else:
-            return configuration_manager_database_reader.DatabaseReader(source, simulator_name)
+            return configuration_manager_database_reader.DatabaseReader(source, simulator_name, snapshot,
+                                                                      harmonic_seasonality)
 
 
 
@@ -123,4 +123,15 @@ class ConfigurationManager(ABC):
         return:
             data_sizes
         """
-        return self.configs['data_size']
\ No newline at end of file
+        return self.configs['data_size']
+
+    @property
+    def seasonality_components(self):
+        """
+        Gets the seasonality_components options from the file, each option being a list of
+        harmonic components (amplitude, phase_shift, frequency_type, frequency_multiplier)
+
+        return:
+            seasonality_components
+        """
+        return self.configs.get('seasonality_components', [])
\ No newline at end of file
@@ -0,0 +1,171 @@
+from types import MappingProxyType
+
+from simulator_api.models import Simulator
+
+SIMULATOR_FIELDS = ('name', 'start_date', 'end_date', 'data_size', 'use_case_name', 'time_series_type', 'sink_name',
+                    'process_id', 'status', 'metadata')
+CONFIGURATION_FIELDS = ('frequency', 'noise_level', 'trend_coefficients', 'missing_percentage', 'outlier_percentage',
+                        'cycle_component_amplitude', 'cycle_component_frequency', 'generator_id', 'attribute_id')
+SEASON_FIELDS = ('amplitude', 'phase_shift', 'frequency_type', 'frequency_multiplier')
+
+
+def _freeze(value):
+    """
+    Get a read-only copy of a value read from the database, turning lists into tuples and dicts into mapping proxies.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """
+    Get a mutable copy of a frozen value, turning tuples into lists and mapping proxies into dicts.
+    """
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class ConfigurationSnapshot:
+    """
+    A read-only copy of a simulator and its configurations, loaded once for a run.
+
+    The simulator, its configurations and their seasonality components are read with three queries
+    (see load), whatever the number of configurations. The generator and the produce loop of a run
+    share the snapshot, so producing the series makes no further query.
+
+    Attributes:
+        simulator (mappingproxy): The fields of the simulator.
+        configurations (tuple): The fields of every configuration, with its 'seasons'.
+        routes (tuple): The (attribute_id, asset_id) pair of every configuration, the asset being its generator_id.
+        assets (mappingproxy): The attribute ids of every asset id.
+    """
+    __slots__ = ('_simulator', '_configurations', '_routes', '_assets')
+
+    def __init__(self, simulator: dict, configurations: list):
+        """
+        Initialize a ConfigurationSnapshot instance.
+
+        Parameters:
+            simulator (dict): The fields of the simulator.
+            configurations (list): The fields of every configuration, each with a 'seasons' list.
+        """
+        configurations = _freeze(configurations)
+        assets = {}
+        for configuration in configurations:
+            assets.setdefault(configuration['generator_id'], []).append(configuration['attribute_id'])
+
+        object.__setattr__(self, '_simulator', _freeze(simulator))
+        object.__setattr__(self, '_configurations', configurations)
+        object.__setattr__(self, '_routes', tuple((configuration['attribute_id'], configuration['generator_id'])
+                                                  for configuration in configurations))
+        object.__setattr__(self, '_assets', MappingProxyType({asset_id: tuple(attribute_ids)
+                                                              for asset_id, attribute_ids in assets.items()}))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    @classmethod
+    def from_simulator(cls, simulator):
+        """
+        Create a snapshot from a simulator whose configurations and seasons are prefetched.
+
+        Parameters:
+            simulator (Simulator): The simulator.
+
+        Returns:
+            ConfigurationSnapshot: The snapshot of the simulator.
+        """
+        configurations = []
+        for configuration in simulator.configurations.all():
+            configuration_data = {field: getattr(configuration, field) for field in CONFIGURATION_FIELDS}
+            configuration_data['seasons'] = [{field: getattr(season, field) for field in SEASON_FIELDS}
+                                             for season in configuration.seasons.all()]
+            configurations.append(configuration_data)
+        return cls({field: getattr(simulator, field) for field in SIMULATOR_FIELDS}, configurations)
+
+    @classmethod
+    def load(cls, simulator_name):
+        """
+        Read a simulator with its configurations and their seasonality components in three queries.
+
+        Parameters:
+            simulator_name (str): The name of the simulator.
+
+        Returns:
+            ConfigurationSnapshot: The snapshot of the simulator, None if there is no such simulator.
+        """
+        try:
+            simulator = Simulator.objects.prefetch_related('configurations__seasons').get(name=simulator_name)
+        except Simulator.DoesNotExist:
+            return None
+        return cls.from_simulator(simulator)
+
+    @property
+    def simulator(self):
+        return self._simulator
+
+    @property
+    def configurations(self):
+        return self._configurations
+
+    @property
+    def routes(self):
+        return self._routes
+
+    @property
+    def assets(self):
+        return self._assets
+
+    def simulator_data(self, harmonic_seasonality=False):
+        """
+        Get the configuration of the simulator in the format read by the configuration manager.
+
+        Parameters:
+            harmonic_seasonality (bool): Evaluate the seasons of every configuration as one set of harmonic
+                components instead of the fixed daily and weekly seasonality options.
+
+        Returns:
+            dict: The fields of the simulator, its configurations and the options of the generator.
+        """
+        configurations_data = _thaw(self._configurations)
+        for config_data in configurations_data:
+            del config_data['generator_id'], config_data['attribute_id']
+
+        daily_seasonality_options = []
+        weekly_seasonality_options = []
+        seasonality_components = []
+        if harmonic_seasonality:
+            # the seasons go through FourierSeasonality only, one option per configuration having seasons
+            daily_seasonality_options.append("none")
+            weekly_seasonality_options.append("none")
+            seasonality_components = [config_data['seasons'] for config_data in configurations_data
+                                      if config_data['seasons']]
+        else:
+            for config_data in configurations_data:
+                for season_data in config_data['seasons']:
+                    if season_data['frequency_type'] == 'Daily':
+                        daily_seasonality_options.append("exist")
+                        weekly_seasonality_options.append("none")
+                    elif season_data['frequency_type'] == 'Weekly':
+                        daily_seasonality_options.append("none")
+                        weekly_seasonality_options.append("exist")
+
+        simulator_data = _thaw(self._simulator)
+        simulator_data['configurations'] = configurations_data
+        simulator_data['frequencies'] = [config_data['frequency'] for config_data in configurations_data]
+        simulator_data['daily_seasonality_options'] = daily_seasonality_options
+        simulator_data['weekly_seasonality_options'] = weekly_seasonality_options
+        simulator_data['noise_levels'] = [config_data['noise_level'] for config_data in configurations_data]
+        simulator_data['trend_levels'] = [config_data['trend_coefficients'] for config_data in configurations_data]
+        simulator_data['cyclic_periods'] = [config_data['cycle_component_frequency']
+                                            for config_data in configurations_data]
+        simulator_data['percentage_outliers_options'] = [config_data['outlier_percentage']
+                                                         for config_data in configurations_data]
+        simulator_data['seasonality_components'] = seasonality_components
+        return simulator_data
@@ -1,7 +1,43 @@
 from abc import ABC, abstractmethod
-import pandas as pd
+import io
 import os
 
+COMPRESSED_SUFFIXES = ('.gz', '.zst')
+
+
+def open_sink(path, mode='r', compression_level=None):
+    """
+    Open a text file, compressing or decompressing it as a stream when its suffix asks for it.
+
+    Files ending with '.gz' are gzip streams and files ending with '.zst' are zstandard streams,
+    any other file is opened as plain text. Data is compressed as it is written, so a file is never
+    built in memory.
+
+    Parameters:
+        path (str): The path of the file.
+        mode (str): 'r' to read, 'w' to write or 'a' to append.
+        compression_level (int, optional): The compression level, the default of the codec by default
+            (6 for gzip, 3 for zstandard).
+
+    Returns:
+        file object: A text file object reading or writing utf-8 with universal newlines disabled.
+    """
+    if path.endswith('.gz'):
+        import gzip
+
+        level = 6 if compression_level is None else compression_level
+        return gzip.open(path, mode + 't', compresslevel=level, encoding='utf-8', newline='')
+    if path.endswith('.zst'):
+        import zstandard
+
+        if mode == 'r':
+            stream = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        else:
+            level = 3 if compression_level is None else compression_level
+            stream = zstandard.ZstdCompressor(level=level).stream_writer(open(path, mode + 'b'), closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
 
 class DataProducer(ABC):
     """
@@ -24,8 +60,75 @@ class DataProducer(ABC):
     def produce(self, data: dict):
         pass
 
+    @staticmethod
+    def unpack_anomaly(data: dict):
+        """
+        Expand a bit-packed anomaly mask of the data to one bool per value.
+
+        Parameters:
+            data (dict): A dictionary containing 'value' and 'anomaly'.
+
+        Returns:
+            dict: The data with a boolean anomaly mask, the data itself when the mask is not packed.
+        """
+        anomaly = data.get('anomaly')
+        if anomaly is None or str(getattr(anomaly, 'dtype', '')) != 'uint8':
+            return data
+
+        import numpy as np
+
+        return {**data, 'anomaly': np.unpackbits(anomaly, count=len(data['value'])).astype(bool)}
+
+    def flush(self):
+        """
+        Wait until everything produced so far has reached the destination.
+
+        Producers that write synchronously have nothing to wait for. Producers that buffer or send
+        asynchronously override this, and it is called at the end of a run and at checkpoints.
+        """
+
+    def close(self):
+        """
+        Release the destination once everything has been produced.
+
+        Producers writing a file per call have nothing to release. Producers keeping a destination
+        open across calls override this to finish it.
+        """
+
+    def produce_chunks(self, chunks):
+        """
+        Produce a series given as an iterator of time slices.
+
+        By default every slice is produced on its own. Producers that write a single destination
+        per series override this to append the slices to it.
+
+        Parameters:
+            chunks (iterable): The slices of the series, each a dictionary like the data given to produce.
+        """
+        for chunk in chunks:
+            self.produce(chunk)
+
 
 class CsvDataProducer(DataProducer):
+    """
+    A data producer writing CSV files, compressed as a stream when the sink ends with '.gz' or '.zst'.
+
+    Attributes:
+        sink (str): The path of the CSV file.
+        compression_level (int): The compression level of a compressed sink, the codec default if None.
+    """
+
+    def __init__(self, sink: str, compression_level=None):
+        """
+        Initialize a CsvDataProducer instance.
+
+        Parameters:
+            sink (str): The path of the CSV file (e.g., 'series.csv', 'series.csv.gz', 'series.csv.zst').
+            compression_level (int, optional): The compression level of a compressed sink.
+        """
+        super().__init__(sink)
+        self.compression_level = compression_level
+
     def produce(self, data: dict):
         """
         Produce data to the specified destination by saving it as a CSV file.
@@ -37,6 +140,134 @@ class CsvDataProducer(DataProducer):
             data (dict): A dictionary containing the data to be saved to the CSV file.
 
         """
-        data_df = pd.DataFrame(data)
+        import pandas as pd
+
+        data_df = pd.DataFrame(self.unpack_anomaly(data))
+        os.makedirs(os.path.dirname(self.sink), exist_ok=True)
+        with open_sink(self.sink, 'w', self.compression_level) as csv_file:
+            data_df.to_csv(csv_file, index=False)
+
+    def produce_chunks(self, chunks):
+        """
+        Produce a series given as an iterator of time slices to a single CSV file.
+
+        The slices are appended to the file one after the other, so only one slice is held in memory.
+
+        Parameters:
+            chunks (iterable): The slices of the series, each a dictionary like the data given to produce.
+        """
+        import pandas as pd
+
         os.makedirs(os.path.dirname(self.sink), exist_ok=True)
-        data_df.to_csv(self.sink, encoding='utf-8', index=False)
+        with open_sink(self.sink, 'w', self.compression_level) as csv_file:
+            for position, chunk in enumerate(chunks):
+                pd.DataFrame(self.unpack_anomaly(chunk)).to_csv(csv_file, header=position == 0, index=False)
+
+
+class ParquetDataProducer(DataProducer):
+    """
+    A data producer writing typed columnar Parquet files.
+
+    A series is written with int64 timestamps (nanoseconds since the epoch), float32 values and a bool
+    anomaly column. With a simulator and a series id, the series is added to a dataset under the sink
+    directory, in the hive-style partition simulator=<simulator>/series_id=<series id>, so reading the
+    directory with pyarrow.dataset or pandas.read_parquet gives every series with both keys as columns.
+
+    Attributes:
+        sink (str): The Parquet file, or the root directory of the dataset.
+        row_group_size (int): The maximum number of rows of a row group.
+        compression (str): The compression codec of the columns ('zstd', 'snappy', 'gzip', 'none', ...).
+        simulator (str): The simulator partition of the dataset.
+        series_id (str): The series partition of the dataset.
+    """
+
+    def __init__(self, sink: str, row_group_size=1048576, compression='zstd', simulator=None, series_id=None):
+        """
+        Initialize a ParquetDataProducer instance.
+
+        Parameters:
+            sink (str): The Parquet file, or the root directory of the dataset.
+            row_group_size (int): The maximum number of rows of a row group.
+            compression (str): The compression codec of the columns.
+            simulator (str, optional): The simulator partition of the dataset.
+            series_id (str, optional): The series partition of the dataset, required with simulator.
+        """
+        super().__init__(sink)
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.simulator = simulator
+        self.series_id = series_id
+
+    @staticmethod
+    def table(data):
+        """
+        Convert data to an Arrow table with the typed columns of a series.
+
+        Parameters:
+            data (dict or list): A dictionary containing 'timestamp', 'value' and 'anomaly',
+                or a list of records (e.g., the metadata of the series).
+
+        Returns:
+            pyarrow.Table: The table of the data.
+        """
+        import numpy as np
+        import pyarrow as pa
+
+        if isinstance(data, list):
+            return pa.Table.from_pylist(data)
+
+        data = DataProducer.unpack_anomaly(data)
+        columns = {
+            'timestamp': pa.array(np.asarray(data['timestamp'], dtype='datetime64[ns]').view(np.int64)),
+            'value': pa.array(np.asarray(data['value'], dtype=np.float32)),
+            'anomaly': pa.array(np.asarray(data['anomaly'], dtype=bool)),
+        }
+        for name, column in data.items():
+            if name not in columns:
+                columns[name] = pa.array(np.asarray(column))
+        return pa.table(columns)
+
+    def produce(self, data):
+        """
+        Produce data to the specified destination by saving it as a Parquet file.
+
+        Parameters:
+            data (dict or list): A dictionary containing 'timestamp', 'value' and 'anomaly', or a list of records.
+        """
+        import pyarrow.parquet as pq
+
+        if self.simulator is not None:
+            self.produce_chunks([data])
+            return
+
+        os.makedirs(os.path.dirname(self.sink) or '.', exist_ok=True)
+        pq.write_table(self.table(data), self.sink, row_group_size=self.row_group_size, compression=self.compression)
+
+    def produce_chunks(self, chunks):
+        """
+        Produce a series given as an iterator of time slices to a single Parquet file.
+
+        Every slice is written as one or more row groups, so only one slice is held in memory.
+
+        Parameters:
+            chunks (iterable): The slices of the series, each a dictionary like the data given to produce.
+        """
+        import pyarrow.parquet as pq
+
+        if self.simulator is None:
+            path = self.sink
+        else:
+            path = os.path.join(self.sink, f"simulator={self.simulator}", f"series_id={self.series_id}",
+                                "part-0.parquet")
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        writer = None
+        try:
+            for chunk in chunks:
+                table = self.table(chunk)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression=self.compression)
+                writer.write_table(table, row_group_size=self.row_group_size)
+        finally:
+            if writer is not None:
+                writer.close()
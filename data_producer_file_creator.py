@@ -1,27 +1,33 @@
 from kafka.kafka_producer import KafkaProducer
 from data_producer import *
+from dataset_store import DatasetStoreProducer
 
 
 class DataProducerFileCreation:
 
     @classmethod
-    def create(cls, sink: str):
+    def create(cls, sink: str, **options):
         """
         Factory method to create a specific DataProducer instance based on the sink type.
 
         Parameters:
             sink (str): The destination where data will be produced.
+            options: Producer specific options (e.g., linger_ms, batch_size and compression for Kafka).
 
         Returns:
-            DataProducer: An instance of a DataProducer subclass (e.g., CsvDataProducer).
+            DataProducer: An instance of a DataProducer subclass (e.g., CsvDataProducer, ParquetDataProducer).
 
         Raises:
             ValueError: If the sink type is not supported.
         """
-        if sink.endswith("csv"):
-            return CsvDataProducer(sink)
+        if sink.endswith(("csv", "csv.gz", "csv.zst")):
+            return CsvDataProducer(sink, **options)
+        elif sink.endswith("parquet"):
+            return ParquetDataProducer(sink, **options)
+        elif sink.endswith("store"):
+            return DatasetStoreProducer(sink, **options)
         elif sink.endswith("Kafka"):
-            return KafkaProducer(sink)
+            return KafkaProducer(sink, **options)
         else:
             raise ValueError(f"Unsupported sink: {sink}")
 
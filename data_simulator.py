@@ -1,23 +1,30 @@
 import random
-from sklearn.preprocessing import MinMaxScaler
+import numpy as np
 from datetime import timedelta
-import json
-import requests
 
-from itertools import product
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, product
 
 from configuration_manager_reader.configuration_manager_abstract import ConfigurationManager
-from simulator_data_generation import cycles_creation, missing_values_creation, noise_creation, outliers_creation, seasonality_creation, time_series_generation, trend_creation
+from stage_timer import StageTimer
+from simulator_data_generation import calendar_features, component_cache, cycles_creation, min_max_scaling, missing_values_creation, noise_creation, outliers_creation, seasonality_creation, time_series_generation, trend_creation
 
 
 class DataGenerator:
-    def __init__(self, configuration_manager: ConfigurationManager):
+    def __init__(self, configuration_manager: ConfigurationManager, cache_size=128, dtype='float64', pack_masks=False):
         """
         This class initializes its attributes based on the provided ConfigurationManager.
 
         Parameters:
                 configuration_manager (ConfigurationManager): An instance of ConfigurationManager
                 that holds various configuration parameters.
+                cache_size (int): The maximum number of time indexes and deterministic components
+                kept in the component cache.
+                dtype (str): The floating point type of the generated values, e.g. 'float32' to halve
+                the memory and I/O of sweeps that do not need double precision.
+                pack_masks (bool): Yield the anomaly masks packed into one bit per value (uint8)
+                instead of one bool per value.
 
         Attributes:
             start_date (datetime.datetime): The start date for data generation.
@@ -30,6 +37,16 @@ class DataGenerator:
             data_types (List[str]): A list of data types.
             percentage_outliers_options (List[...]): A list of percentage outliers options.
             data_sizes (List[...]): A list of data sizes.
+            seasonality_components (List[...]): A list of harmonic seasonality options, each a list of
+                components evaluated by FourierSeasonality.
+            component_cache (ComponentCache): The cache of time indexes and deterministic components
+                shared by the series of a sweep.
+            seed (int): The master seed of the last seeded generation, None before one was started.
+            dtype (numpy.dtype): The floating point type of the generated values.
+            pack_masks (bool): Whether the anomaly masks are yielded bit-packed.
+            timer (StageTimer): The time spent in every generation stage ('time_index', 'seasonality',
+                'trend', 'cycles', 'combine', 'scaling', 'noise', 'outliers', 'missing_values'), a run
+                of a stage being a series, a block of series or a slice depending on the generation mode.
         """
         self.start_date = configuration_manager.start_date
         self.frequencies = configuration_manager.frequencies
@@ -41,90 +58,610 @@ class DataGenerator:
         self.time_series_type = configuration_manager.time_series_type
         self.percentage_outliers_options = configuration_manager.percentage_outliers_options
         self.data_size = configuration_manager.data_size
+        self.seasonality_components = configuration_manager.seasonality_components
+        self.component_cache = component_cache.ComponentCache(cache_size)
+        self.seed = None
+        self.dtype = np.dtype(dtype)
+        self.pack_masks = pack_masks
+        self.timer = StageTimer()
 
-    def generate(self):
+    def _output_mask(self, anomaly):
+        """
+        Convert an anomaly mask to the format yielded by the generator.
+
+        Parameters:
+            anomaly (numpy.ndarray): The boolean anomaly mask of a series or a (series x time) block.
+
+        Returns:
+            numpy.ndarray: The mask, bit-packed along the time axis when pack_masks is set.
+        """
+        return outliers_creation.Outliers.pack_mask(anomaly) if self.pack_masks else anomaly
+
+    def cache_info(self):
+        """
+        Report the hit and miss counters of the component cache.
+
+        Returns:
+            dict: The hits, misses, current size and maximum size of the cache.
+        """
+        return self.component_cache.cache_info()
+
+    def _time_index(self, freq):
+        """
+        Get the time index of the sweep for the given frequency from the component cache.
+
+        Parameters:
+            freq (str): The frequency of the time index.
+
+        Returns:
+            DatetimeIndex: The time index.
+        """
+        return self.component_cache.get(
+            ('time_index', self.start_date, self.data_size, freq),
+            lambda: time_series_generation.TimeSeriesGenerator.generate_time_series(
+                self.start_date, self.start_date + timedelta(days=self.data_size), freq))
+
+    def _calendar(self, freq):
+        """
+        Get the calendar features of the time index of the sweep for the given frequency from the component cache.
+
+        Parameters:
+            freq (str): The frequency of the time index.
+
+        Returns:
+            CalendarFeatures: The calendar features shared by every component built on this time index.
+        """
+        return self.component_cache.get(
+            ('calendar', self.start_date, self.data_size, freq),
+            lambda: calendar_features.CalendarFeatures.from_range(self.start_date, freq, len(self._time_index(freq))))
+
+    def _seasonal_component(self, seasonality, freq, option):
+        """
+        Get a read-only seasonal component from the component cache.
+
+        Parameters:
+            seasonality (Seasonality): The seasonality to add.
+            freq (str): The frequency of the time index.
+            option (str): The seasonality option.
+
+        Returns:
+            numpy.ndarray: The seasonal component.
+        """
+        return self.component_cache.get(
+            (type(seasonality).__name__, self.start_date, self.data_size, freq, self.time_series_type,
+             self._option_key(option)),
+            lambda: seasonality.add_seasonality(self._calendar(freq), option,
+                                                season_type=self.time_series_type).values)
+
+    @staticmethod
+    def _option_key(option):
+        """
+        Make a configuration option hashable, turning lists of harmonic components into tuples.
+
+        Parameters:
+            option: The configuration option.
+
+        Returns:
+            A hashable equivalent of the option.
+        """
+        if isinstance(option, (list, tuple)):
+            return tuple(tuple(sorted(component.items())) for component in option)
+        return option
+
+    def _cyclic_component(self, freq, cyclic_period):
+        """
+        Get a read-only cyclic component from the component cache.
+
+        Parameters:
+            freq (str): The frequency of the time index.
+            cyclic_period (str): The cyclic period option.
+
+        Returns:
+            numpy.ndarray: The cyclic component.
+        """
+        return self.component_cache.get(
+            ('Cycles', self.start_date, self.data_size, freq, self.time_series_type, cyclic_period),
+            lambda: np.asarray(cycles_creation.Cycles.add_cycles(self._calendar(freq), cyclic_period,
+                                                                 season_type=self.time_series_type), dtype=float))
+
+    def _config_combinations(self):
+        """
+        Build every combination of the configuration parameters.
+
+        Returns:
+            itertools.product: The combinations of (daily_seasonality, weekly_seasonality, noise_level,
+            trend, cyclic_period, percentage_outliers, seasonality_components).
+        """
+        config_params = [
+            self.daily_seasonality_options,
+            self.weekly_seasonality_options,
+            self.noise_levels,
+            self.trend_levels,
+            self.cyclic_periods,
+            self.percentage_outliers_options,
+            self.seasonality_components or [None],
+        ]
+
+        #used the itertools.product to make all the combinations without the need of nested for loops
+        return product(*config_params)
+
+    def _series_configs(self):
+        """
+        Repeat every configuration combination once per generated series.
+
+        Yields:
+            tuple: The configuration combination of each series of the sweep, in sweep order.
+        """
+        for configs in self._config_combinations():
+            for _ in range(16):
+                yield configs
+
+    def _file_name(self, configs, freq):
+        """
+        Build the descriptive file name of a generated series.
+
+        Parameters:
+            configs (tuple): The configuration combination of the series.
+            freq (str): The frequency of the series.
+
+        Returns:
+            str: The file name.
+        """
+        (daily_seasonality, weekly_seasonality, noise_level, trend, cyclic_period, percentage_outliers,
+         seasonality_components) = configs
+        harmonics = ""
+        if seasonality_components:
+            # every component as <frequency_type><frequency_multiplier>x<amplitude>@<phase_shift>
+            harmonics = "_harmonics_" + "-".join(
+                f"{component['frequency_type']}{component['frequency_multiplier']:g}x{component['amplitude']:g}"
+                f"@{component['phase_shift']:g}" for component in seasonality_components)
+        return f"TimeSeries_daily_{daily_seasonality}_weekly_{weekly_seasonality}{harmonics}_noise_{noise_level}_trend_{trend}_cycle_{cyclic_period}_outliers_{int(percentage_outliers * 100)}%_freq_{freq}_size_{self.time_series_type}Days.csv"
+
+    def _metadata(self, counter, configs, freq):
+        """
+        Build the metadata dictionary of a generated series.
+
+        Parameters:
+            counter (int): The position of the series in the sweep.
+            configs (tuple): The configuration combination of the series.
+            freq (str): The frequency of the series.
+
+        Returns:
+            dict: The metadata of the series.
+        """
+        (daily_seasonality, weekly_seasonality, noise_level, trend, cyclic_period, percentage_outliers,
+         seasonality_components) = configs
+        meta_data = {'id': str(counter) + '.csv',
+                     'data_type': self.time_series_type,
+                     'daily_seasonality': daily_seasonality,
+                     'weekly_seasonality': weekly_seasonality,
+                     'noise (high 30% - low 10%)': noise_level,
+                     'trend': trend,
+                     'cyclic_period (3 months)': "exist",
+                     'data_size': self.data_size,
+                     'percentage_outliers': percentage_outliers,
+                     'percentage_missing': 0.05,
+                     'freq': freq}
+        # the metadata of a sweep without harmonic components keeps its columns
+        if self.seasonality_components:
+            meta_data['seasonality_components'] = seasonality_components
+        return meta_data
+
+    def generate(self, batched=False, batch_size=256, workers=None, seed=None):
         """
         Generate time series data with various configurations and yield data points.
         This generator function creates time series data with multiple combinations of
         configuration parameters, including daily and weekly seasonality, noise levels,
         trends, cyclic patterns, data types, and more. It yields data points in the form
         of dictionaries containing 'value', 'timestamp', and 'anomaly' information.
+
+        Parameters:
+            batched (bool): Build all series sharing a frequency as one (series x time) block
+                so that every generation stage runs once per block instead of once per series.
+            batch_size (int): The maximum number of series in a block when batched is set.
+            workers (int, optional): Spread the series over this many worker processes. Every series then
+                gets its own random state derived from seed and its position in the sweep.
+            seed (int, optional): The master seed of the per-series random states. Setting it without
+                workers generates in this process with the same output as any number of workers.
+
         Yields:
             A tuple containing two dictionaries:
             - The first dictionary includes 'value' (time series data), 'timestamp' (time index),
-                and 'anomaly' (outlier information).
+                and 'anomaly' (outlier information, bit-packed when pack_masks is set).
             - The second dictionary includes metadata such as 'id', 'data_type', 'daily_seasonality',
                 'weekly_seasonality', 'noise (high 30% - low 10%)', 'trend', 'cyclic_period (3 months)',
                 'data_size', 'percentage_outliers', 'percentage_missing', and 'freq'.
         """
+        if batched:
+            if workers is not None or seed is not None:
+                raise ValueError("Batched generation does not support workers or per-series seeding.")
+            yield from self._generate_batched(batch_size)
+            return
 
-        config_params = [
-            self.daily_seasonality_options,
-            self.weekly_seasonality_options,
-            self.noise_levels,
-            self.trend_levels,
-            self.cyclic_periods,
-            self.percentage_outliers_options,
-        ]
+        if workers is not None or seed is not None:
+            yield from self._generate_seeded(workers, seed)
+            return
 
-        counter = 0
-        #used the itertools.product to make all the combinations without the need of nested for loops
-        for configs in product(*config_params):
-            daily_seasonality, weekly_seasonality, noise_level, trend, cyclic_period, percentage_outliers= configs
+        for counter, configs in enumerate(self._series_configs(), start=1):
+            freq = random.choice(self.frequencies)
+            file_name = self._file_name(configs, freq)
+            print(f"File '{file_name}' generated.")
 
-            for _ in range(16):
-                freq = random.choice(self.frequencies)
-                counter += 1
-                file_name = f"TimeSeries_daily_{daily_seasonality}_weekly_{weekly_seasonality}_noise_{noise_level}_trend_{trend}_cycle_{cyclic_period}_outliers_{int(percentage_outliers * 100)}%_freq_{freq}_size_{self.time_series_type}Days.csv"
-                print(f"File '{file_name}' generated.")
-
-                date_rng = time_series_generation.TimeSeriesGenerator.generate_time_series(self.start_date,
-                                                                    self.start_date + timedelta(days=self.data_size),
-                                                                    freq)
-
-                daily_seasonality_instance = seasonality_creation.DailySeasonality()
-                daily_seasonal_component = daily_seasonality_instance.add_seasonality(date_rng, daily_seasonality,
-                                                                                      season_type=self.time_series_type)
-
-                weekly_seasonality_instance = seasonality_creation.WeeklySeasonality()
-                weekly_seasonal_component = weekly_seasonality_instance.add_seasonality(date_rng, weekly_seasonality,
-                                                                                        season_type=self.time_series_type)
-
-                trend_component = trend_creation.Trend.add_trend(date_rng, trend, data_size=self.data_size, data_type=self.time_series_type)
-                cyclic_period = "exist"
-                cyclic_component = cycles_creation.Cycles.add_cycles(date_rng, cyclic_period, season_type=self.time_series_type)
-
-                if self.time_series_type == 'multiplicative':
-                    data = daily_seasonal_component * weekly_seasonal_component * trend_component * cyclic_component
-                else:
-                    data = daily_seasonal_component + weekly_seasonal_component + trend_component + cyclic_component
-
-                scaler = MinMaxScaler(feature_range=(-1, 1))
-                data = scaler.fit_transform(data.values.reshape(-1, 1))
-                data = noise_creation.Noise.add_noise(data, noise_level)
+            data, anomaly = self._build_series(configs, freq)
+
+            yield ({'value': data, 'timestamp': self._time_index(freq), 'anomaly': anomaly},
+                   self._metadata(counter, configs, freq))
+
+    def _build_series(self, configs, freq, random_state=None):
+        """
+        Build the values and the anomaly mask of a single series.
+
+        Parameters:
+            configs (tuple): The configuration combination of the series.
+            freq (str): The frequency of the series.
+            random_state (numpy.random.RandomState, optional): The random state of the series,
+                the global random state by default.
+
+        Returns:
+            tuple: The series values (pandas.Series) and its anomaly mask (numpy.ndarray), bit-packed
+            when pack_masks is set.
+        """
+        (daily_seasonality, weekly_seasonality, noise_level, trend, cyclic_period, percentage_outliers,
+         seasonality_components) = configs
+
+        timer = self.timer
+        with timer.stage('time_index'):
+            date_rng = self._time_index(freq)
+
+        with timer.stage('seasonality'):
+            daily_seasonal_component = self._seasonal_component(seasonality_creation.DailySeasonality(), freq,
+                                                                daily_seasonality)
+
+            weekly_seasonal_component = self._seasonal_component(seasonality_creation.WeeklySeasonality(), freq,
+                                                                 weekly_seasonality)
+
+            harmonic_seasonal_component = self._seasonal_component(seasonality_creation.FourierSeasonality(), freq,
+                                                                   seasonality_components)
+
+        with timer.stage('trend'):
+            trend_component = trend_creation.Trend.add_trend(date_rng, trend, data_size=self.data_size,
+                                                             data_type=self.time_series_type,
+                                                             random_state=random_state)
+        cyclic_period = "exist"
+        with timer.stage('cycles'):
+            cyclic_component = self._cyclic_component(freq, cyclic_period)
+
+        with timer.stage('combine'):
+            if self.time_series_type == 'multiplicative':
+                data = (daily_seasonal_component * weekly_seasonal_component * harmonic_seasonal_component *
+                        trend_component * cyclic_component)
+            else:
+                data = (daily_seasonal_component + weekly_seasonal_component + harmonic_seasonal_component +
+                        trend_component + cyclic_component)
+
+        with timer.stage('scaling'):
+            data = min_max_scaling.MinMaxScaling.scale(np.asarray(data), feature_range=(-1, 1),
+                                                       dtype=self.dtype).reshape(-1, 1)
+        with timer.stage('noise'):
+            data = noise_creation.Noise.add_noise(data, noise_level, random_state=random_state)
+        with timer.stage('outliers'):
+            data, anomaly = outliers_creation.Outliers.add_outliers(data, percentage_outliers,
+                                                                    random_state=random_state)
+        with timer.stage('missing_values'):
+            data = missing_values_creation.MissingValues.add_missing_values(data, 0.05, random_state=random_state)
+
+        # try:
+        #     url = "http://Apachi_NIFI:8443"
+        #     data_list = str(data.tolist())
+        #     date_rng_str = str(date_rng.strftime('%Y-%m-%d %H:%M:%S').tolist())
+        #     anomaly_list = str(anomaly.tolist())
+        #     payload = {"value":data_list, "timestamp":date_rng_str, "anomaly":anomaly_list}
+        #     response = requests.post(url, data=json.dumps(payload))
+        #     response.raise_for_status()
+        # except requests.exceptions.RequestException as e:
+        #     print('Error sending data:', e)
+
+        return data, self._output_mask(anomaly)
+
+    def _generate_seeded(self, workers, seed):
+        """
+        Generate the sweep with an independent random state per series, optionally in worker processes.
+
+        The random state of every series is derived from the master seed and the position of the
+        series in the sweep, so the output does not depend on the number of workers.
+
+        Parameters:
+            workers (int, optional): The number of worker processes, generation stays in this process when
+                it is None or 1.
+            seed (int, optional): The master seed, a fresh one is drawn when it is None.
+
+        Yields:
+            The same (data, metadata) tuples as generate, in the same order.
+        """
+        import pandas as pd
+
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        self.seed = seed
+
+        tasks = ((counter, configs, seed) for counter, configs in enumerate(self._series_configs(), start=1))
+
+        if workers is None or workers <= 1:
+            results = map(self._build_seeded_series, tasks)
+        else:
+            results = self._build_in_processes(tasks, workers)
+
+        for counter, configs, freq, data, anomaly in results:
+            print(f"File '{self._file_name(configs, freq)}' generated.")
+            yield ({'value': pd.Series(data, copy=False), 'timestamp': self._time_index(freq), 'anomaly': anomaly},
+                   self._metadata(counter, configs, freq))
+
+    def _build_seeded_series(self, task):
+        """
+        Build a single series with the random state derived from the master seed and its position.
+
+        Parameters:
+            task (tuple): The (counter, configs, seed) of the series.
+
+        Returns:
+            tuple: The counter, configs, frequency, values and anomaly mask of the series.
+        """
+        counter, configs, seed = task
+        random_state = np.random.RandomState(np.random.MT19937(np.random.SeedSequence(seed, spawn_key=(counter,))))
+        freq = self.frequencies[random_state.randint(len(self.frequencies))]
+        data, anomaly = self._build_series(configs, freq, random_state=random_state)
+        return counter, configs, freq, data.values, anomaly
+
+    def _build_in_processes(self, tasks, workers, chunk_size=8):
+        """
+        Build seeded series in a pool of worker processes, keeping the results in sweep order.
+
+        At most a few chunks per worker are in flight, so a slow consumer does not make the
+        finished series pile up in memory. The stages timed in the workers are added to the timer
+        of this generator.
+
+        Parameters:
+            tasks (iterable): The (counter, configs, seed) of every series.
+            workers (int): The number of worker processes.
+            chunk_size (int): The number of series sent to a worker at once.
+
+        Yields:
+            tuple: The counter, configs, frequency, values and anomaly mask of every series.
+        """
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as executor:
+            pending = deque()
+            while True:
+                chunk = list(islice(tasks, chunk_size))
+                if chunk:
+                    pending.append(executor.submit(_build_seeded_chunk, chunk))
+                if pending and (not chunk or len(pending) >= workers * 4):
+                    series, timer = pending.popleft().result()
+                    self.timer.merge(timer)
+                    yield from series
+                elif not chunk:
+                    return
+
+    def generate_chunked(self, chunk_size=65536):
+        """
+        Generate the sweep with every series emitted in fixed-size time slices.
+
+        The minimum and maximum of the deterministic components of a series are found up front
+        with a pass over its slices that keeps nothing but the two bounds, so the series can be
+        scaled, noised and given outliers and missing values slice by slice. Peak memory is
+        bounded by chunk_size instead of the horizon of the series. Outliers and missing values
+        are spread over the slices, each slice getting its share of them.
+
+        Parameters:
+            chunk_size (int): The number of points of every slice.
+
+        Yields:
+            A tuple containing an iterator over the slices of a series, each a dictionary with 'value',
+            'timestamp' and 'anomaly' like the data yielded by generate, and the metadata of the series.
+        """
+        for counter, configs in enumerate(self._series_configs(), start=1):
+            freq = random.choice(self.frequencies)
+            print(f"File '{self._file_name(configs, freq)}' generated.")
+
+            yield self._generate_chunks(configs, freq, chunk_size), self._metadata(counter, configs, freq)
+
+    def _generate_chunks(self, configs, freq, chunk_size):
+        """
+        Generate the slices of a single series.
+
+        Parameters:
+            configs (tuple): The configuration combination of the series.
+            freq (str): The frequency of the series.
+            chunk_size (int): The number of points of every slice.
+
+        Yields:
+            dict: The 'value', 'timestamp' and 'anomaly' of every slice.
+        """
+        (daily_seasonality, weekly_seasonality, noise_level, trend, cyclic_period, percentage_outliers,
+         seasonality_components) = configs
+        slope = trend_creation.Trend.choose_slope() if trend == "exist" else None
+        total_length = time_series_generation.TimeSeriesGenerator.time_series_length(
+            self.start_date, self.start_date + timedelta(days=self.data_size), freq)
+        offsets = range(0, total_length, chunk_size)
+
+        data_min, data_max = np.inf, -np.inf
+        for offset in offsets:
+            _, data = self._deterministic_window(configs, freq, slope, total_length, offset, chunk_size)
+            data_min, data_max = min(data_min, data.min()), max(data_max, data.max())
+
+        timer = self.timer
+        for offset in offsets:
+            date_rng, data = self._deterministic_window(configs, freq, slope, total_length, offset, chunk_size)
+            with timer.stage('scaling'):
+                data = min_max_scaling.MinMaxScaling.scale_with_bounds(data, data_min, data_max,
+                                                                       feature_range=(-1, 1), dtype=self.dtype)
+            with timer.stage('noise'):
+                data = noise_creation.Noise.add_noise_block(data, noise_level)
+            with timer.stage('outliers'):
                 data, anomaly = outliers_creation.Outliers.add_outliers(data, percentage_outliers)
+            with timer.stage('missing_values'):
                 data = missing_values_creation.MissingValues.add_missing_values(data, 0.05)
 
-                # try:
-                #     url = "http://Apachi_NIFI:8443"
-                #     data_list = str(data.tolist())
-                #     date_rng_str = str(date_rng.strftime('%Y-%m-%d %H:%M:%S').tolist())
-                #     anomaly_list = str(anomaly.tolist())
-                #     payload = {"value":data_list, "timestamp":date_rng_str, "anomaly":anomaly_list}
-                #     response = requests.post(url, data=json.dumps(payload))
-                #     response.raise_for_status()
-                # except requests.exceptions.RequestException as e:
-                #     print('Error sending data:', e)
-
-                yield ({'value': data, 'timestamp': date_rng, 'anomaly': anomaly},
-                       {'id': str(counter) + '.csv',
-                        'data_type': self.time_series_type,
-                        'daily_seasonality': daily_seasonality,
-                        'weekly_seasonality': weekly_seasonality,
-                        'noise (high 30% - low 10%)': noise_level,
-                        'trend': trend,
-                        'cyclic_period (3 months)': cyclic_period,
-                        'data_size': self.data_size,
-                        'percentage_outliers': percentage_outliers,
-                        'percentage_missing': 0.05,
-                        'freq': freq})
+            yield {'value': data, 'timestamp': date_rng, 'anomaly': self._output_mask(anomaly)}
+
+    def _deterministic_window(self, configs, freq, slope, total_length, offset, chunk_size):
+        """
+        Build the deterministic components of a slice of a series.
+
+        Parameters:
+            configs (tuple): The configuration combination of the series.
+            freq (str): The frequency of the series.
+            slope (int): The direction of the trend of the series.
+            total_length (int): The number of points of the whole series.
+            offset (int): The position of the first point of the slice.
+            chunk_size (int): The maximum number of points of the slice.
+
+        Returns:
+            tuple: The time index of the slice and its combined deterministic components.
+        """
+        (daily_seasonality, weekly_seasonality, noise_level, trend, cyclic_period, percentage_outliers,
+         seasonality_components) = configs
+        length = min(chunk_size, total_length - offset)
+        timer = self.timer
+        with timer.stage('time_index'):
+            date_rng = time_series_generation.TimeSeriesGenerator.generate_time_series_window(
+                self.start_date, freq, offset, length)
+            calendar = calendar_features.CalendarFeatures.from_range(self.start_date, freq, length, offset)
+
+        with timer.stage('seasonality'):
+            daily_seasonal_component = seasonality_creation.DailySeasonality().add_seasonality(
+                calendar, daily_seasonality, season_type=self.time_series_type).values
+            weekly_seasonal_component = seasonality_creation.WeeklySeasonality().add_seasonality(
+                calendar, weekly_seasonality, season_type=self.time_series_type).values
+            harmonic_seasonal_component = seasonality_creation.FourierSeasonality().add_seasonality(
+                calendar, seasonality_components, season_type=self.time_series_type).values
+        with timer.stage('trend'):
+            trend_component = trend_creation.Trend.add_trend_window(calendar, trend, self.data_size,
+                                                                    self.time_series_type, total_length, offset, slope)
+        with timer.stage('cycles'):
+            cyclic_component = np.asarray(cycles_creation.Cycles.add_cycles(calendar, "exist",
+                                                                            season_type=self.time_series_type),
+                                          dtype=float)
+
+        with timer.stage('combine'):
+            if self.time_series_type == 'multiplicative':
+                data = (daily_seasonal_component * weekly_seasonal_component * harmonic_seasonal_component *
+                        trend_component * cyclic_component)
+            else:
+                data = (daily_seasonal_component + weekly_seasonal_component + harmonic_seasonal_component +
+                        trend_component + cyclic_component)
+
+        return date_rng, data
+
+    def _generate_batched(self, batch_size):
+        """
+        Generate the sweep in (series x time) blocks of series sharing the same frequency.
+
+        The frequency of every series is drawn up front, then the series are grouped by frequency
+        and each group is built as one 2-D array. The yielded values are views into that array.
+
+        Parameters:
+            batch_size (int): The maximum number of series in a block.
+
+        Yields:
+            The same (data, metadata) tuples as generate.
+        """
+        import pandas as pd
+
+        series_by_freq = {}
+        for counter, configs in enumerate(self._series_configs(), start=1):
+            freq = random.choice(self.frequencies)
+            series_by_freq.setdefault(freq, []).append((counter, configs))
+
+        timer = self.timer
+        for freq, series in series_by_freq.items():
+            with timer.stage('time_index'):
+                date_rng = self._time_index(freq)
+            with timer.stage('cycles'):
+                cyclic_component = self._cyclic_component(freq, "exist")
+
+            for batch_start in range(0, len(series), batch_size):
+                batch = series[batch_start:batch_start + batch_size]
+                batch_configs = list(zip(*[configs for _, configs in batch]))
+                (daily_options, weekly_options, noise_levels, trends, _, percentage_outliers,
+                 harmonic_options) = batch_configs
+
+                with timer.stage('seasonality'):
+                    daily_block = self._seasonality_block(seasonality_creation.DailySeasonality(), freq,
+                                                          daily_options)
+                    weekly_block = self._seasonality_block(seasonality_creation.WeeklySeasonality(), freq,
+                                                           weekly_options)
+                    harmonic_block = self._seasonality_block(seasonality_creation.FourierSeasonality(), freq,
+                                                             harmonic_options)
+                with timer.stage('trend'):
+                    trend_block = trend_creation.Trend.add_trend_block(date_rng, trends, data_size=self.data_size,
+                                                                       data_type=self.time_series_type)
+
+                with timer.stage('combine'):
+                    if self.time_series_type == 'multiplicative':
+                        data = daily_block * weekly_block * harmonic_block * trend_block * cyclic_component
+                    else:
+                        data = daily_block + weekly_block + harmonic_block + trend_block + cyclic_component
+
+                with timer.stage('scaling'):
+                    data = min_max_scaling.MinMaxScaling.scale(data, feature_range=(-1, 1), dtype=self.dtype)
+                with timer.stage('noise'):
+                    data = noise_creation.Noise.add_noise_block(data, noise_levels)
+                with timer.stage('outliers'):
+                    data, anomaly = outliers_creation.Outliers.add_outliers_block(data, percentage_outliers)
+                with timer.stage('missing_values'):
+                    data = missing_values_creation.MissingValues.add_missing_values_block(data, 0.05)
+                anomaly = self._output_mask(anomaly)
+
+                for row, (counter, configs) in enumerate(batch):
+                    print(f"File '{self._file_name(configs, freq)}' generated.")
+                    yield ({'value': pd.Series(data[row], copy=False), 'timestamp': date_rng, 'anomaly': anomaly[row]},
+                           self._metadata(counter, configs, freq))
+
+    def _seasonality_block(self, seasonality, freq, options):
+        """
+        Build the (series x time) seasonal components of a block, computing each distinct option once.
+
+        Parameters:
+            seasonality (Seasonality): The seasonality to add.
+            freq (str): The frequency of the time index shared by the series.
+            options (tuple): The seasonality option of each series.
+
+        Returns:
+            numpy.ndarray: The (series x time) seasonal components.
+        """
+        distinct_options = {}
+        for option in options:
+            distinct_options.setdefault(self._option_key(option), option)
+        keys = list(distinct_options)
+        components = np.stack([self._seasonal_component(seasonality, freq, option)
+                               for option in distinct_options.values()])
+        return components[[keys.index(self._option_key(option)) for option in options]]
+
+
+_worker_generator = None
+
+
+def _init_worker(generator):
+    """
+    Keep the data generator of the sweep in a worker process.
+
+    Parameters:
+        generator (DataGenerator): The data generator sent by the parent process.
+    """
+    global _worker_generator
+    _worker_generator = generator
+
+
+def _build_seeded_chunk(tasks):
+    """
+    Build a chunk of seeded series in a worker process.
+
+    Parameters:
+        tasks (list): The (counter, configs, seed) of the series to build.
+
+    Returns:
+        tuple: The counter, configs, frequency, values and anomaly mask of every series, and the
+        StageTimer of the stages of the chunk.
+    """
+    _worker_generator.timer = StageTimer()
+    return [_worker_generator._build_seeded_series(task) for task in tasks], _worker_generator.timer
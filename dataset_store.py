@@ -0,0 +1,240 @@
+import json
+import os
+import shutil
+import struct
+import tempfile
+
+import numpy as np
+
+from data_producer import DataProducer
+
+MAGIC = b'SIMSTORE'
+VERSION = 1
+HEADER = struct.Struct('<8sIQQ')
+ALIGNMENT = 64
+
+
+class DatasetStoreProducer(DataProducer):
+    """
+    A data producer packing every series of a run into a single store file.
+
+    Layout:
+        header: magic, version, offset and length of the index
+        data: for every series, its values, int64 timestamps (nanoseconds since the epoch) and bool
+            anomaly mask, each array contiguous and aligned to 64 bytes
+        index: JSON list of the id, length, value type, array offsets and metadata of every series
+
+    The index is written by close, so a store is only readable once its producer is closed.
+
+    Attributes:
+        sink (str): The path of the store file.
+        series (list): The index entries of the series written so far.
+    """
+
+    def __init__(self, sink: str):
+        """
+        Initialize a DatasetStoreProducer instance.
+
+        Parameters:
+            sink (str): The path of the store file.
+        """
+        super().__init__(sink)
+        self.series = []
+        self._file = None
+
+    def _open(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.sink) or '.', exist_ok=True)
+            self._file = open(self.sink, 'wb')
+            self._file.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+        return self._file
+
+    def _align(self):
+        """
+        Pad the store file to the next aligned offset and return it.
+        """
+        store_file = self._open()
+        offset = store_file.tell()
+        padding = -offset % ALIGNMENT
+        store_file.write(b'\0' * padding)
+        return offset + padding
+
+    def produce(self, data: dict, series_id=None, metadata=None):
+        """
+        Append a series to the store.
+
+        Parameters:
+            data (dict): A dictionary containing 'timestamp', 'value' and 'anomaly'.
+            series_id (str, optional): The id of the series, its position in the store by default.
+            metadata (dict, optional): The metadata of the series, kept in the index.
+        """
+        self.produce_chunks([data], series_id, metadata)
+
+    def produce_chunks(self, chunks, series_id=None, metadata=None):
+        """
+        Append a series given as an iterator of time slices to the store.
+
+        The values are written to the store as they come while the timestamps and masks are spooled
+        to temporary files, so only one slice is held in memory.
+
+        Parameters:
+            chunks (iterable): The slices of the series, each a dictionary like the data given to produce.
+            series_id (str, optional): The id of the series, its position in the store by default.
+            metadata (dict, optional): The metadata of the series, kept in the index.
+        """
+        store_file = self._open()
+        values_offset = self._align()
+        length = 0
+        value_type = None
+        with tempfile.TemporaryFile() as timestamps, tempfile.TemporaryFile() as anomalies:
+            for chunk in chunks:
+                chunk = self.unpack_anomaly(chunk)
+                values = np.asarray(chunk['value'])
+                if not np.issubdtype(values.dtype, np.floating):
+                    values = values.astype(float)
+                if value_type is None:
+                    value_type = values.dtype.newbyteorder('<')
+                store_file.write(values.astype(value_type, copy=False).tobytes())
+                timestamps.write(np.asarray(chunk['timestamp'], dtype='datetime64[ns]').view('<i8').tobytes())
+                anomalies.write(np.asarray(chunk['anomaly'], dtype=bool).tobytes())
+                length += len(values)
+
+            timestamps_offset = self._align()
+            timestamps.seek(0)
+            shutil.copyfileobj(timestamps, store_file)
+            anomaly_offset = self._align()
+            anomalies.seek(0)
+            shutil.copyfileobj(anomalies, store_file)
+
+        self.series.append({
+            'id': str(len(self.series) if series_id is None else series_id),
+            'length': length,
+            'value_type': (value_type or np.dtype('<f8')).str,
+            'values_offset': values_offset,
+            'timestamps_offset': timestamps_offset,
+            'anomaly_offset': anomaly_offset,
+            'metadata': metadata,
+        })
+
+    def close(self):
+        """
+        Write the index and the header, making the store readable.
+        """
+        store_file = self._open()
+        index = json.dumps(self.series, default=str).encode('utf-8')
+        index_offset = self._align()
+        store_file.write(index)
+        store_file.seek(0)
+        store_file.write(HEADER.pack(MAGIC, VERSION, index_offset, len(index)))
+        store_file.flush()
+        os.fsync(store_file.fileno())
+        store_file.close()
+        self._file = None
+
+
+class DatasetStoreReader:
+    """
+    Read the series of a store file through a memory map, without parsing or copying their data.
+
+    Attributes:
+        path (str): The path of the store file.
+        series (list): The index entries of the series.
+    """
+
+    def __init__(self, path):
+        """
+        Open a store file and read its index.
+
+        Parameters:
+            path (str): The path of the store file.
+
+        Raises:
+            ValueError: If the file is not a store or its producer was not closed.
+        """
+        self.path = path
+        self._buffer = np.memmap(path, dtype=np.uint8, mode='r')
+        if len(self._buffer) < HEADER.size:
+            raise ValueError(f"{path} is not a dataset store")
+        magic, version, index_offset, index_length = HEADER.unpack(self._buffer[:HEADER.size].tobytes())
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a dataset store")
+        if index_offset == 0:
+            raise ValueError(f"{path} is incomplete, its producer was not closed")
+
+        self.series = json.loads(self._buffer[index_offset:index_offset + index_length].tobytes())
+        self._positions = {entry['id']: position for position, entry in enumerate(self.series)}
+
+    def __len__(self):
+        return len(self.series)
+
+    @property
+    def ids(self):
+        """
+        The ids of the series in the order they were written.
+
+        return:
+            ids (list)
+        """
+        return [entry['id'] for entry in self.series]
+
+    def metadata(self, series_id):
+        """
+        Get the metadata of a series.
+
+        Parameters:
+            series_id (str): The id of the series.
+
+        Returns:
+            dict: The metadata given when the series was written.
+        """
+        return self._entry(series_id)['metadata']
+
+    def _entry(self, series_id):
+        try:
+            return self.series[self._positions[str(series_id)]]
+        except KeyError:
+            raise KeyError(f"Series {series_id} is not in {self.path}") from None
+
+    def _array(self, offset, dtype, start, stop):
+        dtype = np.dtype(dtype)
+        return self._buffer[offset + start * dtype.itemsize:offset + stop * dtype.itemsize].view(dtype)
+
+    def read(self, series_id, start=0, stop=None):
+        """
+        Get the points of a series between two positions as read-only views of the store.
+
+        Parameters:
+            series_id (str): The id of the series.
+            start (int): The position of the first point.
+            stop (int, optional): The position after the last point, the end of the series by default.
+
+        Returns:
+            dict: The 'timestamp' (datetime64[ns]), 'value' and 'anomaly' arrays of the points.
+        """
+        entry = self._entry(series_id)
+        start, stop, _ = slice(start, stop).indices(entry['length'])
+        stop = max(start, stop)
+        return {
+            'timestamp': self._array(entry['timestamps_offset'], '<M8[ns]', start, stop),
+            'value': self._array(entry['values_offset'], entry['value_type'], start, stop),
+            'anomaly': self._array(entry['anomaly_offset'], np.bool_, start, stop),
+        }
+
+    def read_range(self, series_id, start_time=None, end_time=None):
+        """
+        Get the points of a series within a time range as read-only views of the store.
+
+        The bounds are found by binary search on the memory-mapped timestamps.
+
+        Parameters:
+            series_id (str): The id of the series.
+            start_time (datetime-like, optional): The first timestamp to include.
+            end_time (datetime-like, optional): The first timestamp to exclude.
+
+        Returns:
+            dict: The 'timestamp' (datetime64[ns]), 'value' and 'anomaly' arrays of the points.
+        """
+        timestamps = self.read(series_id)['timestamp']
+        start = 0 if start_time is None else np.searchsorted(timestamps, np.datetime64(start_time, 'ns'))
+        stop = len(timestamps) if end_time is None else np.searchsorted(timestamps, np.datetime64(end_time, 'ns'))
+        return self.read(series_id, int(start), int(stop))
@@ -0,0 +1,79 @@
+import os
+from abc import ABC, abstractmethod
+
+
+class Broker(ABC):
+    """
+    An abstract class creating the clients KafkaProducer and KafkaConsumer talk to.
+
+    The clients follow the interface of the confluent_kafka clients: a producer has produce, poll and
+    flush, a consumer has subscribe, consume, commit and close, and their messages have topic, partition,
+    offset, key, value, headers and error.
+
+    methods:
+        create_producer: Creates a producer client from its configuration.
+        create_consumer: Creates a consumer client from its configuration.
+        topic_partition: Creates the TopicPartition committing an offset.
+    """
+
+    @abstractmethod
+    def create_producer(self, config):
+        pass
+
+    @abstractmethod
+    def create_consumer(self, config):
+        pass
+
+    @abstractmethod
+    def topic_partition(self, topic, partition, offset):
+        pass
+
+
+class ConfluentBroker(Broker):
+    """
+    The Kafka cluster named by the bootstrap.servers of the client configuration, through confluent_kafka.
+    """
+
+    def create_producer(self, config):
+        from confluent_kafka import Producer
+
+        return Producer(config)
+
+    def create_consumer(self, config):
+        from confluent_kafka import Consumer
+
+        return Consumer(config)
+
+    def topic_partition(self, topic, partition, offset):
+        from confluent_kafka import TopicPartition
+
+        return TopicPartition(topic, partition, offset)
+
+
+def create_broker(name=None, directory=None, partitions=None):
+    """
+    Create the broker selected by name, or by the SIMULATOR_BROKER environment variable.
+
+    Parameters:
+        name (str, optional): 'kafka' for a Kafka cluster or 'local' for a log on the local disk (see LocalBroker),
+            SIMULATOR_BROKER or 'kafka' by default.
+        directory (str, optional): The directory of a local broker, SIMULATOR_BROKER_DIRECTORY or './kafka_log'
+            by default.
+        partitions (int, optional): The number of partitions of the topics of a local broker,
+            SIMULATOR_BROKER_PARTITIONS or 4 by default.
+
+    Returns:
+        Broker: The broker.
+
+    Raises:
+        ValueError: If the name is not a known broker.
+    """
+    name = name or os.environ.get('SIMULATOR_BROKER', 'kafka')
+    if name == 'kafka':
+        return ConfluentBroker()
+    if name == 'local':
+        from kafka.local_broker import LocalBroker
+
+        return LocalBroker(directory or os.environ.get('SIMULATOR_BROKER_DIRECTORY', './kafka_log'),
+                           partitions or int(os.environ.get('SIMULATOR_BROKER_PARTITIONS', 4)))
+    raise ValueError(f"Unknown broker '{name}', expected 'kafka' or 'local'")
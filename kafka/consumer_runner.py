@@ -0,0 +1,200 @@
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+from collections import Counter
+
+from kafka.broker import create_broker
+from kafka.dead_letter import DeadLetterWriter
+from kafka.kafka_consumer import KafkaConsumer
+from kafka.rolling_writer import RollingFileWriter
+
+
+def _run_worker(index, topic, options, stop_event, results, consumer_factory):
+    """
+    Consume in one worker of the pool until stop_event is set, then report its statistics.
+
+    Parameters:
+        index (int): The position of the worker in the pool.
+        topic (str): The topic to consume.
+        options (dict): The options of the workers (see ConsumerRunner).
+        stop_event (Event): The event stopping every worker of the pool.
+        results (Queue): The queue receiving the statistics of the worker.
+        consumer_factory (callable, optional): Creates the Kafka client of a worker from its index.
+    """
+    if threading.current_thread() is threading.main_thread():
+        # a worker process drains its buffers on SIGTERM like the whole pool does
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    consumer = None
+    try:
+        directory = options.get('directory', './kafka_datasets')
+        writer = RollingFileWriter(directory, options.get('max_rows', 100000), options.get('max_seconds', 60.0))
+        dead_letter = DeadLetterWriter(os.path.join(directory, f"dead_letter_{index}.jsonl"))
+        consumer = KafkaConsumer(topic, batch_size=options.get('batch_size', 1000),
+                                 timeout=options.get('timeout', 1.0), writer=writer, dead_letter=dead_letter,
+                                 bootstrap_servers=options.get('bootstrap_servers', 'kafka:9092'),
+                                 group_id=options.get('group_id', 'g1'), stop_event=stop_event,
+                                 broker=options.get('broker'))
+        consumer.run(consumer.create_consumer() if consumer_factory is None else consumer_factory(index))
+    finally:
+        # a worker failing to start still reports, so that join does not wait for it
+        if consumer is None:
+            results.put((index, {}, {}, 0.0))
+        else:
+            results.put((index, dict(consumer.counts), dict(consumer.partition_counts), consumer.elapsed or 0.0))
+
+
+class ConsumerRunner:
+    """
+    Run a pool of consumers sharing a consumer group, one per worker process.
+
+    The broker spreads the partitions of the topic over the workers and moves them on rebalances,
+    so consumption scales with the number of partitions. On SIGTERM or SIGINT, or when stop is
+    called, every worker writes its buffered rows, commits their offsets and reports how many
+    messages it consumed from each partition.
+
+    Attributes:
+        topic (str): The topic to consume.
+        workers (int): The number of worker processes.
+        options (dict): The options of the workers: directory, max_rows, max_seconds, batch_size, timeout,
+            bootstrap_servers, group_id and broker.
+        counts (Counter): The number of received, valid, invalid and failed messages of every worker.
+        partition_counts (Counter): The number of messages consumed per (topic, partition).
+        elapsed (float): The longest time a worker spent consuming, in seconds.
+    """
+
+    def __init__(self, topic, workers=None, consumer_factory=None, context=None, **options):
+        """
+        Initialize a ConsumerRunner instance.
+
+        Parameters:
+            topic (str): The topic to consume.
+            workers (int, optional): The number of worker processes, the number of CPUs by default.
+            consumer_factory (callable, optional): Creates the Kafka client of a worker from its index,
+                a confluent_kafka Consumer by default.
+            context (optional): The multiprocessing context starting the workers, the default context by default.
+            options: The options of the workers.
+        """
+        self.topic = topic
+        self.workers = workers or os.cpu_count() or 1
+        self.consumer_factory = consumer_factory
+        self.context = multiprocessing.get_context() if context is None else context
+        self.options = options
+        self.stop_event = self.context.Event()
+        self.results = self.context.Queue()
+        self.processes = []
+        self.counts = Counter()
+        self.partition_counts = Counter()
+        self.elapsed = 0.0
+
+    def start(self):
+        """
+        Start the worker processes.
+        """
+        for index in range(self.workers):
+            process = self.context.Process(target=_run_worker, args=(index, self.topic, self.options, self.stop_event,
+                                                                     self.results, self.consumer_factory))
+            process.start()
+            self.processes.append(process)
+
+    def stop(self):
+        """
+        Ask every worker to write its buffered rows, commit their offsets and exit, then wait for them.
+
+        Returns:
+            dict: The messages per second consumed from every (topic, partition).
+        """
+        self.stop_event.set()
+        return self.join()
+
+    def join(self, poll_interval=1.0):
+        """
+        Wait for every worker to exit and gather their statistics.
+
+        A worker killed before reporting is reported as lost once every worker has exited, instead of
+        being waited for.
+
+        Parameters:
+            poll_interval (float): How often the workers are checked while waiting for their statistics, in seconds.
+
+        Returns:
+            dict: The messages per second consumed from every (topic, partition).
+        """
+        reported = set()
+        while len(reported) < len(self.processes):
+            alive = any(process.is_alive() for process in self.processes)
+            try:
+                index, counts, partition_counts, elapsed = self.results.get(timeout=poll_interval)
+            except queue.Empty:
+                if not alive:
+                    break
+                continue
+            reported.add(index)
+            self.counts.update(counts)
+            self.partition_counts.update(partition_counts)
+            self.elapsed = max(self.elapsed, elapsed)
+        for index, process in enumerate(self.processes):
+            if index not in reported:
+                print(f"consumer worker {index} exited with code {process.exitcode} before reporting", flush=True)
+        for process in self.processes:
+            process.join()
+        self.processes = []
+        return self.throughput()
+
+    def throughput(self):
+        """
+        The number of messages consumed per second from every partition.
+
+        Returns:
+            dict: The messages per second of every (topic, partition).
+        """
+        return {partition: count / self.elapsed if self.elapsed else 0.0
+                for partition, count in sorted(self.partition_counts.items())}
+
+    def report(self):
+        """
+        Print the throughput of every partition.
+        """
+        for (topic, partition), rate in self.throughput().items():
+            print(f"{topic}[{partition}]: {self.partition_counts[(topic, partition)]} messages, {rate:.1f} messages/s")
+        print("messages received: {}, valid: {}, invalid: {}".format(
+            self.counts['received'], self.counts['valid'], self.counts['invalid']), flush=True)
+
+    def run(self):
+        """
+        Start the workers and consume until SIGTERM or SIGINT, then shut the pool down cleanly and report.
+        """
+        previous = {signum: signal.signal(signum, lambda signum, frame: self.stop_event.set())
+                    for signum in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            self.start()
+            self.join()
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        self.report()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Consume the simulated data with a pool of worker processes.")
+    parser.add_argument('--topic', default='kafka_simulated_data')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--bootstrap-servers', default='kafka:9092')
+    parser.add_argument('--group-id', default='g1')
+    parser.add_argument('--directory', default='./kafka_datasets')
+    parser.add_argument('--max-rows', type=int, default=100000)
+    parser.add_argument('--max-seconds', type=float, default=60.0)
+    parser.add_argument('--broker', choices=('kafka', 'local'), default=None,
+                        help="the broker to consume from, SIMULATOR_BROKER or kafka by default")
+    parser.add_argument('--broker-directory', default=None, help="the directory of a local broker")
+    arguments = parser.parse_args()
+
+    ConsumerRunner(arguments.topic, arguments.workers, bootstrap_servers=arguments.bootstrap_servers,
+                   group_id=arguments.group_id, directory=arguments.directory, max_rows=arguments.max_rows,
+                   max_seconds=arguments.max_seconds,
+                   broker=create_broker(arguments.broker, arguments.broker_directory)).run()
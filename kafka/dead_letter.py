@@ -0,0 +1,72 @@
+import base64
+import json
+import os
+from collections import Counter
+
+
+class DeadLetterWriter:
+    """
+    Append the consumed messages that failed decoding or validation to a JSON lines file.
+
+    Every line holds the topic, partition and offset of the message, the reason it was rejected
+    and its payload (text when it is valid utf-8, base64 otherwise).
+
+    Attributes:
+        path (str): The path of the dead-letter file.
+        counts (Counter): The number of rejected messages per reason.
+    """
+
+    def __init__(self, path='./kafka_datasets/dead_letter.jsonl'):
+        """
+        Initialize a DeadLetterWriter instance.
+
+        Parameters:
+            path (str): The path of the dead-letter file.
+        """
+        self.path = path
+        self.counts = Counter()
+        self._file = None
+
+    def write(self, topic, partition, offset, payload, reason, error):
+        """
+        Append a rejected message to the dead-letter file.
+
+        Parameters:
+            topic (str): The topic of the message.
+            partition (int): The partition of the message.
+            offset (int): The offset of the message.
+            payload (bytes): The payload of the message.
+            reason (str): The category of the rejection (e.g., 'decode', 'schema').
+            error (str): The error message.
+        """
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+
+        try:
+            payload = payload.decode('utf-8')
+            encoding = 'utf-8'
+        except (AttributeError, UnicodeDecodeError):
+            payload = base64.b64encode(payload or b'').decode('ascii')
+            encoding = 'base64'
+
+        self._file.write(json.dumps({'topic': topic, 'partition': partition, 'offset': offset, 'reason': reason,
+                                     'error': error, 'encoding': encoding, 'payload': payload}) + '\n')
+        self.counts[reason] += 1
+
+    def flush(self):
+        """
+        Make the rejected messages written so far durable.
+        """
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        """
+        Flush and close the dead-letter file.
+        """
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
@@ -1,16 +1,22 @@
-import dataclasses
-
-import pandas as pd
-import os
-
-from confluent_kafka import Consumer
-import threading
 import json
+import threading
+import time
+from collections import Counter
 
-from jsonschema import validate
+from kafka.broker import create_broker
+from kafka.dead_letter import DeadLetterWriter
+from kafka.message_format import SERIES_CHUNK_FORMAT, SeriesChunkMessage
+from kafka.rolling_writer import RollingFileWriter
 
 
 class Validator:
+    """
+    The schema of the JSON data points and its compiled validator.
+
+    The validator class matching the schema draft is built once and shared by every batch. The fast
+    path checks the types of the known fields in plain Python and only falls back to the compiled
+    validator to explain a record it rejects.
+    """
     schema = {
         "type": "object",
         "properties": {
@@ -20,57 +26,303 @@ class Validator:
             "asset_id": {"type": "string"},
         },
     }
+    field_types = {"attribute_id": str, "value": (int, float), "timestamp": str, "asset_id": str}
+    _compiled = None
+
+    @classmethod
+    def compiled(cls):
+        """
+        The validator of the schema, built on first use.
+
+        return:
+            validator
+        """
+        if cls._compiled is None:
+            from jsonschema.validators import validator_for
+
+            validator_class = validator_for(cls.schema)
+            validator_class.check_schema(cls.schema)
+            cls._compiled = validator_class(cls.schema)
+        return cls._compiled
+
+    @classmethod
+    def fast_check(cls, record):
+        """
+        Check the types of the known fields of a record without jsonschema.
+
+        Parameters:
+            record: The decoded JSON record.
+
+        Returns:
+            bool: True if the record is an object whose known fields have the type of the schema.
+        """
+        if not isinstance(record, dict):
+            return False
+        for field, field_type in cls.field_types.items():
+            value = record.get(field)
+            if field in record and (not isinstance(value, field_type) or isinstance(value, bool)):
+                return False
+        return True
+
+    @classmethod
+    def validate_batch(cls, records, fast_path=True):
+        """
+        Validate a batch of records against the schema.
+
+        Parameters:
+            records (list): The decoded JSON records.
+            fast_path (bool): Whether to accept records passing fast_check without running the compiled validator.
+
+        Returns:
+            tuple: The positions of the valid records and a list of (position, error message) of the invalid ones.
+        """
+        validator = cls.compiled()
+        valid, invalid = [], []
+        for position, record in enumerate(records):
+            if fast_path and cls.fast_check(record):
+                valid.append(position)
+                continue
+            error = next(validator.iter_errors(record), None)
+            if error is None:
+                valid.append(position)
+            else:
+                invalid.append((position, error.message))
+        return valid, invalid
+
+
+def is_series_chunk(msg):
+    """
+    Check whether a message carries a binary series chunk rather than a JSON data point.
+
+    Parameters:
+        msg (kafka object): The consumed message.
+
+    Returns:
+        bool: True if the message has the series chunk format header.
+    """
+    return ('format', SERIES_CHUNK_FORMAT) in (msg.headers() or [])
 
 
 class KafkaConsumer:
+    """
+    This class consumes the simulated data from Kafka in batches and writes it to rolling files.
+
+    Attributes:
+        topic (str): The topic to consume.
+        batch_size (int): The maximum number of messages fetched by one call to the broker.
+        timeout (float): The maximum time in seconds to wait for a batch.
+        writer (RollingFileWriter): The writer buffering the consumed rows.
+        dead_letter (DeadLetterWriter): The writer of the rejected messages.
+        bootstrap_servers (str): The Kafka brokers to connect to.
+        group_id (str): The consumer group the consumer joins.
+        broker (Broker): The broker creating the client, selected by SIMULATOR_BROKER by default.
+        stop_event (Event): Set to stop consuming, the buffered rows are then written and committed.
+        counts (Counter): The number of received, valid, invalid and failed messages.
+        partition_counts (Counter): The number of messages consumed per (topic, partition).
+    """
     consumer_thread = None
+    _consumer_lock = threading.Lock()
 
-    def __init__(self, topic):
+    def __init__(self, topic, batch_size=1000, timeout=1.0, writer=None, dead_letter=None, fast_path=True,
+                 bootstrap_servers='kafka:9092', group_id='g1', stop_event=None, broker=None):
         self.topic = topic
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.writer = RollingFileWriter() if writer is None else writer
+        self.dead_letter = DeadLetterWriter() if dead_letter is None else dead_letter
+        self.fast_path = fast_path
+        self.bootstrap_servers = bootstrap_servers
+        self.group_id = group_id
+        self.broker = create_broker() if broker is None else broker
+        self.stop_event = threading.Event() if stop_event is None else stop_event
+        self.counts = Counter()
+        self.partition_counts = Counter()
+        self.started = None
+        self.elapsed = None
 
-    def consume(self):
+    def handle(self, msg):
         """
-        This method starts the polling thread of the consumer
+        Decode a consumed message and buffer its rows in the writer.
+
+        Parameters:
+            msg (kafka object): The consumed message.
+        """
+        self.handle_batch([msg])
+
+    def handle_batch(self, messages):
+        """
+        Decode and validate a batch of consumed messages and buffer their rows in the writer.
+
+        Messages with an error are skipped before anything is decoded. Binary chunks are decoded
+        directly, JSON points are validated together, and the messages that fail either go to the
+        dead-letter file. If handling the batch fails, the messages not yet handled go to the
+        dead-letter file, so consuming goes on after them.
 
+        Parameters:
+            messages (list): The consumed messages.
         """
-        if KafkaConsumer.consumer_thread is not None:
-            print("Consumer thread is already running.")
+        handled, points, records = set(), [], []
+        try:
+            for index, msg in enumerate(messages):
+                if msg is None:
+                    continue
+                if msg.error():
+                    print("consumer error: {}".format(msg.error()), flush=True)
+                    self.counts['errors'] += 1
+                    continue
+
+                self.counts['received'] += 1
+                self.partition_counts[(msg.topic(), msg.partition())] += 1
+                try:
+                    if is_series_chunk(msg):
+                        message = SeriesChunkMessage.decode(msg.value())
+                        self.writer.add(msg.topic(), msg.partition(), msg.offset(), message.asset_id,
+                                        columns=message.to_records())
+                        self.counts['valid'] += 1
+                        handled.add(index)
+                    else:
+                        records.append(json.loads(msg.value()))
+                        points.append(index)
+                except ValueError as e:
+                    self.reject(msg, 'decode', str(e))
+                    handled.add(index)
+
+            valid, invalid = Validator.validate_batch(records, self.fast_path)
+            for position in valid:
+                msg = messages[points[position]]
+                self.writer.add(msg.topic(), msg.partition(), msg.offset(), records[position].get('asset_id'),
+                                record=records[position])
+                self.counts['valid'] += 1
+                handled.add(points[position])
+            for position, error in invalid:
+                self.reject(messages[points[position]], 'schema', error)
+                handled.add(points[position])
+        except Exception as e:
+            self.counts['failed'] += 1
+            print(str(e))
+            self.reject_batch([msg for index, msg in enumerate(messages) if index not in handled], str(e))
+
+    def reject(self, msg, reason, error):
+        """
+        Send a message to the dead-letter file, advancing the offset of its partition.
+
+        Parameters:
+            msg (kafka object): The rejected message.
+            reason (str): The category of the rejection.
+            error (str): The error message.
+        """
+        self.dead_letter.write(msg.topic(), msg.partition(), msg.offset(), msg.value(), reason, error)
+        self.writer.add(msg.topic(), msg.partition(), msg.offset())
+        self.counts['invalid'] += 1
+
+    def reject_batch(self, messages, error):
+        """
+        Send the messages of a batch that could not be handled to the dead-letter file, advancing the
+        offsets of their partitions so that consuming goes on after them.
+
+        Parameters:
+            messages (list): The consumed messages that were not handled.
+            error (str): The error message.
+        """
+        for msg in messages:
+            if msg is None or msg.error():
+                continue
+            self.reject(msg, 'error', error)
+
+    def commit(self, consumer, offsets):
+        """
+        Commit the offsets of the partitions whose rows have been written to durable files.
+
+        The dead-letter file is made durable first, so a rejected message is never committed before it is recorded.
+
+        Parameters:
+            consumer (Consumer): The Kafka consumer.
+            offsets (dict): The next offset to consume of every (topic, partition).
+        """
+        if not offsets:
             return
+        self.dead_letter.flush()
+        consumer.commit(offsets=[self.broker.topic_partition(topic, partition, offset)
+                                 for (topic, partition), offset in offsets.items()], asynchronous=False)
 
-        c = Consumer({'bootstrap.servers': 'kafka:9092', 'group.id': 'g1', 'auto.offset.reset': 'latest'})
+    def on_revoke(self, consumer, partitions):
+        """
+        Write and commit the buffered rows of the partitions taken away by a rebalance, so that the
+        consumer they are assigned to resumes right after them.
 
-        def poll():
-            """
-            This method polls the data from the broker in background
+        Parameters:
+            consumer (Consumer): The Kafka consumer.
+            partitions (list): The revoked TopicPartitions.
+        """
+        self.commit(consumer, self.writer.flush([(partition.topic, partition.partition) for partition in partitions]))
 
-            """
-            print(f"consuming data from {self.topic}", flush=True)
-            c.subscribe([self.topic])
+    def create_consumer(self):
+        """
+        Create the Kafka client of this consumer, with offsets only committed explicitly.
 
-            while True:
-                msg = c.poll()
-                validator = Validator
-                schema = validator.schema
+        return:
+            consumer
+        """
+        return self.broker.create_consumer({'bootstrap.servers': self.bootstrap_servers, 'group.id': self.group_id,
+                                            'auto.offset.reset': 'latest', 'enable.auto.commit': False})
+
+    def run(self, consumer):
+        """
+        Consume until stop_event is set, then write and commit every buffered row and close the consumer.
 
-                data_str = msg.value().decode('utf-8')
-                data_dict = json.loads(data_str)
+        Messages are fetched in batches and buffered by the writer. Offsets are committed only
+        once the files holding their rows are durable. A batch that cannot be handled goes to the
+        dead-letter file and consuming goes on.
 
-                try:
-                    validate(instance=data_dict, schema=schema)
-                    if msg is None:
-                        print("No messages yet", flush=True)
-                        continue
-                    if msg.error():
-                        print("consumer error: {}".format(msg.error()), flush=True)
-                        continue
-
-                    data_df = pd.DataFrame(data_dict, index=[0])
-                    os.makedirs("./kafka_datasets", exist_ok=True)
-                    data_df.to_csv(f"./kafka_datasets/{msg.timestamp()[1]}.csv", encoding='utf-8', index=False)
+        Parameters:
+            consumer (Consumer): The Kafka consumer.
+        """
+        print(f"consuming data from {self.topic}", flush=True)
+        consumer.subscribe([self.topic], on_revoke=self.on_revoke)
+        self.started = time.monotonic()
+        self.elapsed = None
+        try:
+            while not self.stop_event.is_set():
+                messages = consumer.consume(num_messages=self.batch_size, timeout=self.timeout)
+                self.handle_batch(messages)
 
+                try:
+                    self.commit(consumer, self.writer.flush_due())
                 except Exception as e:
+                    self.counts['failed'] += 1
                     print(str(e))
+        finally:
+            try:
+                self.commit(consumer, self.writer.flush())
+            finally:
+                self.dead_letter.close()
+                consumer.close()
+                self.elapsed = time.monotonic() - self.started
+
+    def throughput(self):
+        """
+        The number of messages consumed per second from every partition.
+
+        Returns:
+            dict: The messages per second of every (topic, partition).
+        """
+        elapsed = self.elapsed
+        if elapsed is None:
+            elapsed = time.monotonic() - self.started if self.started is not None else 0.0
+        return {partition: count / elapsed if elapsed else 0.0 for partition, count in self.partition_counts.items()}
+
+    def consume(self):
+        """
+        This method starts the polling thread of the consumer
+
+        A single polling thread runs per process: the simulators running at once on the workers of the
+        job executor start it under a lock, and a thread that has exited is replaced.
+        """
+        with KafkaConsumer._consumer_lock:
+            if KafkaConsumer.consumer_thread is not None and KafkaConsumer.consumer_thread.is_alive():
+                print("Consumer thread is already running.")
+                return
 
-        KafkaConsumer.consumer_thread = threading.Thread(target=poll)
-        KafkaConsumer.consumer_thread.daemon = True
-        KafkaConsumer.consumer_thread.start()
+            KafkaConsumer.consumer_thread = threading.Thread(target=self.run, args=(self.create_consumer(),))
+            KafkaConsumer.consumer_thread.daemon = True
+            KafkaConsumer.consumer_thread.start()
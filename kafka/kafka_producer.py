@@ -1,17 +1,71 @@
 import json
 
 from data_producer import DataProducer
-from confluent_kafka import Producer
+from kafka.broker import create_broker
+from kafka.message_format import SERIES_CHUNK_FORMAT
 
 
 class KafkaProducer(DataProducer):
     """
     This class implements the abstract class DataProducer to produce data on Kafka
 
-    It contains two methods: delivery_report and the concrete method produce
+    Messages are queued on the client and sent in batches: the client waits up to linger_ms for a batch
+    to fill, compresses it and sends it in a single request. Delivery callbacks are served by a
+    periodic poll, and the queue is only drained by flush, at the end of a run or at a checkpoint.
 
+    Attributes:
+        sink (str): The destination where data will be produced.
+        topic (str): The topic the data is produced to.
+        broker (Broker): The broker creating the client.
+        config (dict): The configuration of the Kafka client.
+        poll_interval (int): The number of messages produced between two polls for delivery reports.
+        delivered (int): The number of messages acknowledged by the broker.
+        failed (int): The number of messages the broker failed to store.
     """
-    producer = Producer({'bootstrap.servers': 'kafka:9092'})
+    def __init__(self, sink: str, topic='kafka_simulated_data', bootstrap_servers='kafka:9092', linger_ms=50,
+                 batch_size=1000000, compression='lz4', poll_interval=1000, broker=None):
+        """
+        Initialize a KafkaProducer instance.
+
+        Parameters:
+            sink (str): The destination where data will be produced.
+            topic (str): The topic the data is produced to.
+            bootstrap_servers (str): The Kafka brokers to connect to.
+            linger_ms (int): How long the client waits for a batch to fill before sending it.
+            batch_size (int): The maximum size in bytes of a batch of messages.
+            compression (str): The compression codec of the batches ('none', 'gzip', 'snappy', 'lz4', 'zstd').
+            poll_interval (int): The number of messages produced between two polls for delivery reports.
+            broker (Broker, optional): The broker creating the client, selected by SIMULATOR_BROKER by default.
+        """
+        super().__init__(sink)
+        self.topic = topic
+        self.broker = create_broker() if broker is None else broker
+        self.config = {
+            'bootstrap.servers': bootstrap_servers,
+            'linger.ms': linger_ms,
+            'batch.size': batch_size,
+            'compression.type': compression,
+        }
+        self.poll_interval = poll_interval
+        self.delivered = 0
+        self.failed = 0
+        self._pending_polls = 0
+        self._producer = None
+
+    @property
+    def producer(self):
+        """
+        The Kafka client of this producer, created on first use so that creating a KafkaProducer
+        neither loads confluent_kafka nor connects to the broker. Every KafkaProducer has its own
+        client, so the runs executed at once by the workers of the job executor neither share the
+        clients that are not thread-safe nor wait for the messages of each other on flush.
+
+        return:
+            producer
+        """
+        if self._producer is None:
+            self._producer = self.broker.create_producer(self.config)
+        return self._producer
 
     def delivery_report(self, err, msg):
         """
@@ -25,20 +79,69 @@ class KafkaProducer(DataProducer):
 
         """
         if err is not None:
+            self.failed += 1
             print('Message delivery failed: {}'.format(err))
         else:
-            print('Message delivered to {} [{}]'.format(msg.topic(), msg.partition()))
+            self.delivered += 1
 
     def produce(self, data: dict):
         """
 
         This method overrides the abstract method to produce the data to Kafka.
 
+        The message is only queued on the client and sent with the next batch.
+
         Parameters:
             data (dict): A dictionary containing the data to be published.
 
         """
         final_data = json.dumps(data)
-        self.producer.produce('kafka_simulated_data', key="key", value=final_data,
-                         callback=self.delivery_report)
-        self.producer.flush()
+        self._send("key", final_data)
+
+    def produce_message(self, message):
+        """
+        Produce a chunk of a series as a single binary message keyed by its asset and attribute.
+
+        Parameters:
+            message (SeriesChunkMessage): The chunk to be published.
+        """
+        self._send(message.key, message.encode(), headers=[('format', SERIES_CHUNK_FORMAT)])
+
+    def _send(self, key, value, headers=None):
+        """
+        Queue a message on the client.
+
+        When the local queue is full the client is polled until a batch has been sent, then the message
+        is queued again.
+
+        Parameters:
+            key (str or bytes): The message key.
+            value (str or bytes): The message payload.
+            headers (list, optional): The (name, value) headers of the message.
+        """
+        while True:
+            try:
+                self.producer.produce(self.topic, key=key, value=value, headers=headers, callback=self.delivery_report)
+                break
+            except BufferError:
+                self.producer.poll(0.1)
+
+        self._pending_polls += 1
+        if self._pending_polls >= self.poll_interval:
+            self.producer.poll(0)
+            self._pending_polls = 0
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued message has been delivered or has failed.
+
+        Parameters:
+            timeout (float, optional): The maximum time to wait in seconds, no limit by default.
+
+        Returns:
+            int: The number of messages still queued.
+        """
+        remaining = self.producer.flush() if timeout is None else self.producer.flush(timeout)
+        self._pending_polls = 0
+        print('Kafka messages delivered: {}, failed: {}, queued: {}'.format(self.delivered, self.failed, remaining))
+        return remaining
@@ -0,0 +1,685 @@
+import fcntl
+import os
+import shutil
+import struct
+import time
+import uuid
+import zlib
+
+from kafka.broker import Broker
+
+FRAME = struct.Struct('<II')
+RECORD = struct.Struct('<qiiH')
+HEADER = struct.Struct('<HI')
+SEGMENT_SUFFIX = '.log'
+
+
+class TopicPartition:
+    """
+    A partition of a topic, and the offset committed for it.
+    """
+
+    def __init__(self, topic, partition, offset=-1001):
+        self.topic = topic
+        self.partition = partition
+        self.offset = offset
+
+    def __repr__(self):
+        return f"TopicPartition({self.topic!r}, {self.partition}, {self.offset})"
+
+
+class LocalMessage:
+    """
+    A message read from or written to a local log, with the accessors of a confluent_kafka Message.
+    """
+    __slots__ = ('_topic', '_partition', '_offset', '_key', '_value', '_headers', '_error')
+
+    def __init__(self, topic, partition, offset, key, value, headers=None, error=None):
+        self._topic = topic
+        self._partition = partition
+        self._offset = offset
+        self._key = key
+        self._value = value
+        self._headers = headers
+        self._error = error
+
+    def topic(self):
+        return self._topic
+
+    def partition(self):
+        return self._partition
+
+    def offset(self):
+        return self._offset
+
+    def key(self):
+        return self._key
+
+    def value(self):
+        return self._value
+
+    def headers(self):
+        return self._headers
+
+    def error(self):
+        return self._error
+
+
+def _encode(value):
+    return value.encode('utf-8') if isinstance(value, str) else value
+
+
+def encode_record(offset, key, value, headers=None):
+    """
+    Encode a record of a log segment.
+
+    Layout:
+        frame: length and crc32 of the body
+        body: offset, key length, value length and number of headers (-1 for no key or value),
+            key, value, then the name length, value length, name and value of every header
+
+    Parameters:
+        offset (int): The offset of the record in its partition.
+        key (bytes): The key of the record, or None.
+        value (bytes): The value of the record, or None.
+        headers (list, optional): The (name, value) headers of the record.
+
+    Returns:
+        bytes: The encoded record.
+    """
+    headers = headers or []
+    parts = [RECORD.pack(offset, -1 if key is None else len(key), -1 if value is None else len(value), len(headers)),
+             key or b'', value or b'']
+    for name, header_value in headers:
+        name, header_value = _encode(name), _encode(header_value) or b''
+        parts += [HEADER.pack(len(name), len(header_value)), name, header_value]
+    body = b''.join(parts)
+    return FRAME.pack(len(body), zlib.crc32(body)) + body
+
+
+def decode_records(buffer, position=0):
+    """
+    Decode the complete records of a buffer.
+
+    Parameters:
+        buffer (bytes): The bytes read from a log segment.
+        position (int): The position of the first record in the buffer.
+
+    Yields:
+        tuple: The position after the record, its offset, key, value and headers, the offset being None
+        when the record is corrupted.
+    """
+    view = memoryview(buffer)
+    while position + FRAME.size <= len(buffer):
+        length, crc = FRAME.unpack_from(buffer, position)
+        end = position + FRAME.size + length
+        if end > len(buffer):
+            return
+        body = view[position + FRAME.size:end]
+        if zlib.crc32(body) != crc or length < RECORD.size:
+            yield end, None, None, None, None
+            position = end
+            continue
+
+        offset, key_length, value_length, header_count = RECORD.unpack_from(body)
+        cursor = RECORD.size
+        key = bytes(body[cursor:cursor + key_length]) if key_length >= 0 else None
+        cursor += max(key_length, 0)
+        value = bytes(body[cursor:cursor + value_length]) if value_length >= 0 else None
+        cursor += max(value_length, 0)
+        headers = []
+        for _ in range(header_count):
+            name_length, header_length = HEADER.unpack_from(body, cursor)
+            cursor += HEADER.size
+            name = bytes(body[cursor:cursor + name_length]).decode('utf-8')
+            cursor += name_length
+            headers.append((name, bytes(body[cursor:cursor + header_length])))
+            cursor += header_length
+        yield end, offset, key, value, headers or None
+        position = end
+
+
+class PartitionLog:
+    """
+    The append-only log of a partition, split into segment files named by the offset of their first record.
+
+    Appends take an exclusive lock on the partition, so several processes can produce to the same log.
+    A record cut short by a writer that crashed is cut off by the next append, which starts a new segment.
+
+    Attributes:
+        directory (str): The directory of the segments.
+        segment_bytes (int): The size from which a new segment is started.
+    """
+
+    def __init__(self, directory, segment_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._segment = None
+        self._size = 0
+        self._next_offset = 0
+
+    def segments(self):
+        """
+        The base offsets of the segments, in order.
+
+        return:
+            segments (list)
+        """
+        return sorted(int(name[:-len(SEGMENT_SUFFIX)]) for name in os.listdir(self.directory)
+                      if name.endswith(SEGMENT_SUFFIX))
+
+    def segment_path(self, base_offset):
+        return os.path.join(self.directory, f"{base_offset:020d}{SEGMENT_SUFFIX}")
+
+    def _recover(self):
+        """
+        Catch up with the records appended by other writers since the last append, holding the lock.
+        """
+        segments = self.segments()
+        if not segments:
+            self._segment, self._size, self._next_offset = 0, 0, 0
+            return
+        if segments[-1] != self._segment:
+            self._segment, self._size, self._next_offset = segments[-1], 0, segments[-1]
+
+        path = self.segment_path(self._segment)
+        if os.path.getsize(path) == self._size:
+            return
+        with open(path, 'rb') as segment:
+            segment.seek(self._size)
+            tail = segment.read()
+        valid = 0
+        for end, offset, _, _, _ in decode_records(tail):
+            if offset is None:
+                break
+            valid = end
+            self._next_offset = offset + 1
+        self._size += valid
+        if valid < len(tail):
+            # a writer crashed in the middle of a record: its segment is cut before the record and never
+            # written to again, so a reader that saw part of the record is not misled by what follows
+            if self._size:
+                os.truncate(path, self._size)
+                self._segment, self._size = self._next_offset, 0
+            else:
+                os.remove(path)
+
+    def _locked(self):
+        lock = open(os.path.join(self.directory, '.lock'), 'a')
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock
+
+    def append(self, records):
+        """
+        Append records to the log.
+
+        Parameters:
+            records (list): The (key, value, headers) of every record, keys and values as bytes.
+
+        Returns:
+            int: The offset of the first record.
+        """
+        with self._locked():
+            self._recover()
+            if self._size >= self.segment_bytes:
+                self._segment, self._size = self._next_offset, 0
+            first = self._next_offset
+            data = b''.join(encode_record(first + position, key, value, headers)
+                            for position, (key, value, headers) in enumerate(records))
+            with open(self.segment_path(self._segment), 'ab') as segment:
+                segment.write(data)
+            self._size += len(data)
+            self._next_offset += len(records)
+            return first
+
+    def sync(self):
+        """
+        Make the records appended so far durable.
+        """
+        if self._segment is not None and os.path.exists(self.segment_path(self._segment)):
+            with open(self.segment_path(self._segment), 'rb') as segment:
+                os.fsync(segment.fileno())
+
+    def end_offset(self):
+        """
+        The offset the next record will get.
+
+        return:
+            end_offset (int)
+        """
+        with self._locked():
+            self._recover()
+            return self._next_offset
+
+
+class PartitionReader:
+    """
+    Read the records of a partition log from an offset on, following the log as it grows.
+
+    Attributes:
+        log (PartitionLog): The log being read.
+        offset (int): The offset of the next record to return.
+    """
+
+    def __init__(self, log, offset):
+        self.log = log
+        self.offset = offset
+        segments = log.segments()
+        self._segment = max((base for base in segments if base <= offset), default=segments[0] if segments else 0)
+        self._file = None
+        self._start = 0
+        self._buffer = b''
+        self._position = 0
+
+    def _next_segment(self):
+        return min((base for base in self.log.segments() if base > self._segment), default=None)
+
+    def read(self, max_messages, topic, partition):
+        """
+        Read the next records of the log.
+
+        Parameters:
+            max_messages (int): The maximum number of records to read.
+            topic (str): The topic of the log.
+            partition (int): The partition of the log.
+
+        Returns:
+            list: The LocalMessages read.
+        """
+        messages = []
+        while len(messages) < max_messages:
+            for end, offset, key, value, headers in decode_records(self._buffer, self._position):
+                self._position = end
+                if offset is None:
+                    messages.append(LocalMessage(topic, partition, self.offset, None, None,
+                                                 error=f"Corrupted record in {self.log.segment_path(self._segment)}"))
+                elif offset >= self.offset:
+                    messages.append(LocalMessage(topic, partition, offset, key, value, headers))
+                    self.offset = offset + 1
+                if len(messages) >= max_messages:
+                    return messages
+
+            if self._file is None:
+                path = self.log.segment_path(self._segment)
+                if not os.path.exists(path):
+                    break
+                self._file = open(path, 'rb', buffering=0)
+            end = self._start + len(self._buffer)
+            chunk = os.pread(self._file.fileno(), 1 << 20, end)
+            if chunk:
+                self._start += self._position
+                self._buffer = self._buffer[self._position:] + chunk
+                self._position = 0
+                continue
+            try:
+                replaced = os.stat(self.log.segment_path(self._segment)).st_ino != os.fstat(self._file.fileno()).st_ino
+            except FileNotFoundError:
+                replaced = False
+            if replaced:
+                # a segment holding nothing but a record cut short by a crashed writer was started again
+                self._file.close()
+                self._file, self._start, self._buffer, self._position = None, 0, b'', 0
+                continue
+
+            # a segment is complete once the next one exists, only then is it left
+            next_segment = self._next_segment()
+            if next_segment is None:
+                break
+            self._file.close()
+            self._file, self._start, self._buffer, self._position = None, 0, b'', 0
+            self._segment = next_segment
+        return messages
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class GroupMembership:
+    """
+    The membership of a consumer in a consumer group of a local broker, kept as files so that consumers
+    in different processes share it.
+
+    Every member touches its file when it consumes, a member silent for session_timeout seconds is dropped,
+    and the partitions of a topic are spread over the live members in the order of their ids. A consumer
+    gaining a partition resumes from the offset committed for it, so, like Kafka, a message may be consumed
+    twice around a rebalance but never skipped.
+
+    Attributes:
+        directory (str): The directory of the group.
+        member_id (str): The id of this member.
+        session_timeout (float): The time in seconds after which a silent member is dropped.
+    """
+
+    def __init__(self, directory, group_id, session_timeout=10.0):
+        self.directory = os.path.join(directory, '__groups', group_id)
+        self.member_id = uuid.uuid4().hex
+        self.session_timeout = session_timeout
+        os.makedirs(os.path.join(self.directory, 'members'), exist_ok=True)
+        os.makedirs(os.path.join(self.directory, 'offsets'), exist_ok=True)
+
+    def _member_path(self, member_id):
+        return os.path.join(self.directory, 'members', member_id)
+
+    def heartbeat(self):
+        with open(self._member_path(self.member_id), 'a'):
+            pass
+        os.utime(self._member_path(self.member_id))
+
+    def members(self):
+        """
+        The ids of the live members, in order.
+
+        return:
+            members (list)
+        """
+        now = time.time()
+        members = []
+        for member_id in os.listdir(os.path.join(self.directory, 'members')):
+            try:
+                if now - os.path.getmtime(self._member_path(member_id)) <= self.session_timeout:
+                    members.append(member_id)
+                else:
+                    os.remove(self._member_path(member_id))
+            except FileNotFoundError:
+                pass
+        return sorted(members)
+
+    def assignment(self, partitions):
+        """
+        The partitions of a topic assigned to this member.
+
+        Parameters:
+            partitions (int): The number of partitions of the topic.
+
+        Returns:
+            list: The assigned partitions.
+        """
+        members = self.members()
+        if self.member_id not in members:
+            return []
+        rank = members.index(self.member_id)
+        return [partition for partition in range(partitions) if partition % len(members) == rank]
+
+    def leave(self):
+        try:
+            os.remove(self._member_path(self.member_id))
+        except FileNotFoundError:
+            pass
+
+    def _offset_path(self, topic, partition):
+        return os.path.join(self.directory, 'offsets', f"{topic}-{partition}")
+
+    def committed(self, topic, partition):
+        """
+        The offset committed for a partition, None if there is none.
+        """
+        try:
+            with open(self._offset_path(topic, partition)) as offset_file:
+                return int(offset_file.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def commit(self, topic, partition, offset):
+        path = self._offset_path(topic, partition)
+        temporary = f"{path}.{self.member_id}.tmp"
+        with open(temporary, 'w') as offset_file:
+            offset_file.write(str(offset))
+        os.replace(temporary, path)
+
+
+class LocalProducer:
+    """
+    A producer appending to the logs of a local broker, with the interface of a confluent_kafka Producer.
+
+    Messages are batched per partition, and a batch is appended once it reaches batch.size bytes, once
+    the oldest queued message is linger.ms old (checked by produce and poll) or on flush. Delivery
+    callbacks are served by poll and flush.
+    """
+
+    def __init__(self, broker, config):
+        self.broker = broker
+        self.linger = config.get('linger.ms', 5) / 1000
+        self.batch_size = config.get('batch.size', 1000000)
+        self._batches = {}
+        self._sizes = {}
+        self._oldest = None
+        self._delivered = []
+        self._next_partition = 0
+
+    def __len__(self):
+        return sum(len(batch) for batch in self._batches.values()) + len(self._delivered)
+
+    def produce(self, topic, value=None, key=None, partition=-1, on_delivery=None, callback=None, headers=None):
+        key, value = _encode(key), _encode(value)
+        partitions = self.broker.partitions_of(topic)
+        if partition is None or partition < 0:
+            if key is not None:
+                partition = zlib.crc32(key) % partitions
+            else:
+                partition, self._next_partition = self._next_partition % partitions, self._next_partition + 1
+
+        batch = self._batches.setdefault((topic, partition), [])
+        batch.append((key, value, headers, callback or on_delivery))
+        size = self._sizes.get((topic, partition), 0) + len(key or b'') + len(value or b'')
+        self._sizes[(topic, partition)] = size
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        if size >= self.batch_size:
+            self._append(topic, partition)
+        elif time.monotonic() - self._oldest >= self.linger:
+            self._append_all()
+
+    def _append(self, topic, partition):
+        batch = self._batches.pop((topic, partition), [])
+        self._sizes.pop((topic, partition), None)
+        if not self._batches:
+            self._oldest = None
+        if not batch:
+            return
+        first = self.broker.log(topic, partition).append([(key, value, headers) for key, value, headers, _ in batch])
+        for position, (key, value, headers, callback) in enumerate(batch):
+            if callback is not None:
+                self._delivered.append((callback, LocalMessage(topic, partition, first + position, key, value,
+                                                               headers)))
+
+    def _append_all(self):
+        for topic, partition in list(self._batches):
+            self._append(topic, partition)
+
+    def _deliver(self):
+        delivered, self._delivered = self._delivered, []
+        for callback, message in delivered:
+            callback(None, message)
+        return len(delivered)
+
+    def poll(self, timeout=None):
+        if self._oldest is not None and time.monotonic() - self._oldest >= self.linger:
+            self._append_all()
+        return self._deliver()
+
+    def flush(self, timeout=None):
+        written = list(self._batches)
+        self._append_all()
+        for topic, partition in written:
+            self.broker.log(topic, partition).sync()
+        self._deliver()
+        return 0
+
+
+class LocalConsumer:
+    """
+    A consumer reading the logs of a local broker, with the interface of a confluent_kafka Consumer.
+
+    The membership of its group is checked every heartbeat interval while consuming, calling on_revoke
+    for the partitions it loses before reading the ones it gains (see GroupMembership).
+    """
+    heartbeat_interval = 0.5
+
+    def __init__(self, broker, config):
+        self.broker = broker
+        self.group = GroupMembership(broker.directory, config.get('group.id', 'default'),
+                                     config.get('session.timeout.ms', 10000) / 1000)
+        self.offset_reset = config.get('auto.offset.reset', 'latest')
+        self.auto_commit = config.get('enable.auto.commit', True)
+        self.topics = []
+        self.on_assign = None
+        self.on_revoke = None
+        self.readers = {}
+        self._checked = None
+        self._turn = 0
+
+    def subscribe(self, topics, on_assign=None, on_revoke=None):
+        self.topics = list(topics)
+        self.on_assign = on_assign
+        self.on_revoke = on_revoke
+        self._rebalance()
+
+    def assignment(self):
+        return [TopicPartition(topic, partition) for topic, partition in sorted(self.readers)]
+
+    def _rebalance(self):
+        self._checked = time.monotonic()
+        self.group.heartbeat()
+        wanted = {(topic, partition) for topic in self.topics
+                  for partition in self.group.assignment(self.broker.partitions_of(topic))}
+
+        revoked = sorted(set(self.readers) - wanted)
+        if revoked:
+            if self.on_revoke is not None:
+                self.on_revoke(self, [TopicPartition(topic, partition) for topic, partition in revoked])
+            for topic_partition in revoked:
+                self.readers.pop(topic_partition).close()
+
+        assigned = sorted(wanted - set(self.readers))
+        for topic, partition in assigned:
+            log = self.broker.log(topic, partition)
+            offset = self.group.committed(topic, partition)
+            if offset is None:
+                offset = 0 if self.offset_reset in ('earliest', 'smallest', 'beginning') else log.end_offset()
+            self.readers[(topic, partition)] = PartitionReader(log, offset)
+        if assigned and self.on_assign is not None:
+            self.on_assign(self, [TopicPartition(topic, partition) for topic, partition in assigned])
+
+    def consume(self, num_messages=1, timeout=-1):
+        deadline = None if timeout is None or timeout < 0 else time.monotonic() + timeout
+        while True:
+            if time.monotonic() - self._checked >= self.heartbeat_interval:
+                self._rebalance()
+
+            messages = []
+            readers = sorted(self.readers.items())
+            if readers:
+                # start from a different partition every time so that none is starved
+                self._turn = (self._turn + 1) % len(readers)
+                for (topic, partition), reader in readers[self._turn:] + readers[:self._turn]:
+                    messages += reader.read(num_messages - len(messages), topic, partition)
+                    if len(messages) >= num_messages:
+                        break
+
+            if messages or (deadline is not None and time.monotonic() >= deadline):
+                if messages and self.auto_commit:
+                    self.commit(asynchronous=False)
+                return messages
+            time.sleep(0.01 if deadline is None else max(0.0, min(0.01, deadline - time.monotonic())))
+
+    def poll(self, timeout=-1):
+        messages = self.consume(1, timeout)
+        return messages[0] if messages else None
+
+    def commit(self, message=None, offsets=None, asynchronous=True):
+        if offsets is None:
+            if message is not None:
+                offsets = [TopicPartition(message.topic(), message.partition(), message.offset() + 1)]
+            else:
+                offsets = [TopicPartition(topic, partition, reader.offset)
+                           for (topic, partition), reader in self.readers.items()]
+        for topic_partition in offsets:
+            self.group.commit(topic_partition.topic, topic_partition.partition, topic_partition.offset)
+
+    def close(self):
+        if self.readers and self.on_revoke is not None:
+            self.on_revoke(self, self.assignment())
+        for reader in self.readers.values():
+            reader.close()
+        self.readers = {}
+        self.group.leave()
+
+
+class LocalBroker(Broker):
+    """
+    A stand-in for Kafka keeping its topics in append-only segmented logs on the local disk, so that the
+    producer and consumer paths can be tested and load-tested on one machine without a cluster.
+
+    Every partition of a topic is a directory of segment files under <directory>/topics/<topic>, and the
+    members and committed offsets of every consumer group are files under <directory>/__groups. Producers
+    and consumers in different processes can share a local broker.
+
+    Attributes:
+        directory (str): The directory of the broker.
+        partitions (int): The number of partitions of a new topic.
+        segment_bytes (int): The size from which a partition starts a new segment.
+    """
+
+    def __init__(self, directory='./kafka_log', partitions=4, segment_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.partitions = partitions
+        self.segment_bytes = segment_bytes
+        self._partitions = {}
+        self._logs = {}
+
+    def __getstate__(self):
+        return {'directory': self.directory, 'partitions': self.partitions, 'segment_bytes': self.segment_bytes,
+                '_partitions': {}, '_logs': {}}
+
+    def partitions_of(self, topic):
+        """
+        The number of partitions of a topic, creating the topic when it does not exist.
+
+        Parameters:
+            topic (str): The topic.
+
+        Returns:
+            int: The number of partitions.
+        """
+        if topic not in self._partitions:
+            topic_directory = os.path.join(self.directory, 'topics', topic)
+            if not os.path.isdir(topic_directory):
+                # the partitions are created aside and moved in place at once, so that a process
+                # creating the same topic never sees part of them
+                temporary = f"{topic_directory}.{uuid.uuid4().hex}.tmp"
+                for partition in range(self.partitions):
+                    os.makedirs(os.path.join(temporary, str(partition)))
+                try:
+                    os.rename(temporary, topic_directory)
+                except OSError:
+                    shutil.rmtree(temporary)
+            self._partitions[topic] = len([name for name in os.listdir(topic_directory) if name.isdigit()])
+        return self._partitions[topic]
+
+    def log(self, topic, partition):
+        """
+        The log of a partition.
+
+        Parameters:
+            topic (str): The topic.
+            partition (int): The partition.
+
+        Returns:
+            PartitionLog: The log.
+        """
+        if (topic, partition) not in self._logs:
+            self._logs[(topic, partition)] = PartitionLog(
+                os.path.join(self.directory, 'topics', topic, str(partition)), self.segment_bytes)
+        return self._logs[(topic, partition)]
+
+    def create_producer(self, config):
+        return LocalProducer(self, config)
+
+    def create_consumer(self, config):
+        return LocalConsumer(self, config)
+
+    def topic_partition(self, topic, partition, offset):
+        return TopicPartition(topic, partition, offset)
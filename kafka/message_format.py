@@ -0,0 +1,180 @@
+import struct
+
+import numpy as np
+
+SERIES_CHUNK_FORMAT = b'series-chunk'
+
+
+class SeriesChunkMessage:
+    """
+    A chunk of a simulated series carried by a single Kafka message.
+
+    The timestamps of a chunk are start + step * i, so only start and step are sent. The values are
+    sent as a packed little-endian array holding only the present points, followed by two bitmaps
+    marking the missing points and the anomalies.
+
+    Binary layout:
+        header: magic, version, value size, attribute id length, asset id length, start, step, length
+        attribute id and asset id (utf-8)
+        missing bitmap and anomaly bitmap (ceil(length / 8) bytes each)
+        present values (float32 or float64)
+
+    Attributes:
+        attribute_id (str): The attribute the series belongs to.
+        asset_id (str): The asset the series belongs to.
+        start (int): The timestamp of the first point in nanoseconds since the epoch.
+        step (int): The distance between two points in nanoseconds.
+        values (numpy.ndarray): The values of the points, NaN where the point is missing.
+        anomaly (numpy.ndarray): A boolean mask of the anomalous points.
+    """
+    MAGIC = b'SCHK'
+    VERSION = 1
+    header = struct.Struct('<4sBBHHqqI')
+    value_types = {4: np.dtype('<f4'), 8: np.dtype('<f8')}
+
+    def __init__(self, attribute_id, asset_id, start, step, values, anomaly=None):
+        self.attribute_id = str(attribute_id)
+        self.asset_id = str(asset_id)
+        self.start = int(start)
+        self.step = int(step)
+        self.values = np.asarray(values)
+        if self.values.dtype.itemsize not in self.value_types or not np.issubdtype(self.values.dtype, np.floating):
+            self.values = self.values.astype(float)
+        self.anomaly = np.zeros(len(self.values), dtype=bool) if anomaly is None else np.asarray(anomaly, dtype=bool)
+
+    @classmethod
+    def from_data(cls, attribute_id, asset_id, data, start=0, stop=None):
+        """
+        Create the message of a slice of a series produced by the data generator.
+
+        Parameters:
+            attribute_id (str): The attribute the series belongs to.
+            asset_id (str): The asset the series belongs to.
+            data (dict): A dictionary containing 'timestamp' (DatetimeIndex), 'value' and 'anomaly'.
+            start (int): The position of the first point of the slice.
+            stop (int, optional): The position after the last point of the slice, the end of the series by default.
+
+        Returns:
+            SeriesChunkMessage: The message of the slice.
+        """
+        timestamps = np.asarray(data['timestamp'], dtype='datetime64[ns]').view(np.int64)
+        values = np.asarray(data['value'])
+        anomaly = np.asarray(data['anomaly'])
+        if anomaly.dtype == np.uint8:
+            anomaly = np.unpackbits(anomaly, count=len(values)).astype(bool)
+
+        stop = len(values) if stop is None else min(stop, len(values))
+        step = timestamps[1] - timestamps[0] if len(timestamps) > 1 else 0
+        return cls(attribute_id, asset_id, timestamps[start], step, values[start:stop], anomaly[start:stop])
+
+    @classmethod
+    def chunks(cls, attribute_id, asset_id, data, chunk_size=4096):
+        """
+        Split a series produced by the data generator into messages of at most chunk_size points.
+
+        Parameters:
+            attribute_id (str): The attribute the series belongs to.
+            asset_id (str): The asset the series belongs to.
+            data (dict): A dictionary containing 'timestamp' (DatetimeIndex), 'value' and 'anomaly'.
+            chunk_size (int): The maximum number of points of a message.
+
+        Yields:
+            SeriesChunkMessage: The messages of the series in time order.
+        """
+        for start in range(0, len(data['value']), chunk_size):
+            yield cls.from_data(attribute_id, asset_id, data, start, start + chunk_size)
+
+    @property
+    def key(self):
+        """
+        The message key, so that every chunk of a series lands on the same partition.
+
+        return:
+            key (bytes)
+        """
+        return f'{self.asset_id}:{self.attribute_id}'.encode('utf-8')
+
+    @property
+    def timestamps(self):
+        """
+        The timestamps of the points.
+
+        return:
+            timestamps (numpy.ndarray of datetime64[ns])
+        """
+        return (self.start + self.step * np.arange(len(self.values), dtype=np.int64)).astype('datetime64[ns]')
+
+    def encode(self):
+        """
+        Serialize the message to its binary layout.
+
+        Returns:
+            bytes: The encoded message.
+        """
+        attribute_id = self.attribute_id.encode('utf-8')
+        asset_id = self.asset_id.encode('utf-8')
+        value_type = self.values.dtype.newbyteorder('<')
+        missing = np.isnan(self.values)
+
+        return b''.join([
+            self.header.pack(self.MAGIC, self.VERSION, value_type.itemsize, len(attribute_id), len(asset_id),
+                             self.start, self.step, len(self.values)),
+            attribute_id,
+            asset_id,
+            np.packbits(missing).tobytes(),
+            np.packbits(self.anomaly).tobytes(),
+            self.values[~missing].astype(value_type, copy=False).tobytes(),
+        ])
+
+    @classmethod
+    def decode(cls, payload):
+        """
+        Deserialize a message from its binary layout.
+
+        Parameters:
+            payload (bytes): The encoded message.
+
+        Returns:
+            SeriesChunkMessage: The decoded message.
+
+        Raises:
+            ValueError: If the payload is not an encoded series chunk.
+        """
+        if len(payload) < cls.header.size:
+            raise ValueError("Payload is too short to be a series chunk")
+        magic, version, value_size, attribute_length, asset_length, start, step, length = \
+            cls.header.unpack_from(payload)
+        if magic != cls.MAGIC or version != cls.VERSION or value_size not in cls.value_types:
+            raise ValueError("Payload is not a series chunk")
+
+        offset = cls.header.size
+        attribute_id = bytes(payload[offset:offset + attribute_length]).decode('utf-8')
+        offset += attribute_length
+        asset_id = bytes(payload[offset:offset + asset_length]).decode('utf-8')
+        offset += asset_length
+
+        bitmap_size = (length + 7) // 8
+        missing = np.unpackbits(np.frombuffer(payload, np.uint8, bitmap_size, offset), count=length).astype(bool)
+        offset += bitmap_size
+        anomaly = np.unpackbits(np.frombuffer(payload, np.uint8, bitmap_size, offset), count=length).astype(bool)
+        offset += bitmap_size
+
+        value_type = cls.value_types[value_size]
+        values = np.full(length, np.nan, dtype=value_type.newbyteorder('='))
+        values[~missing] = np.frombuffer(payload, value_type, length - int(missing.sum()), offset)
+        return cls(attribute_id, asset_id, start, step, values, anomaly)
+
+    def to_records(self):
+        """
+        The points of the message as the columns written by the consumer.
+
+        Returns:
+            dict: The attribute_id, asset_id, timestamp, value and anomaly of every point.
+        """
+        return {
+            'attribute_id': self.attribute_id,
+            'asset_id': self.asset_id,
+            'timestamp': self.timestamps,
+            'value': self.values,
+            'anomaly': self.anomaly,
+        }
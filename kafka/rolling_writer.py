@@ -0,0 +1,154 @@
+import os
+import time
+from collections import defaultdict
+
+import numpy as np
+
+
+class RollingFileWriter:
+    """
+    Buffer consumed rows in memory and write them to rolling CSV files.
+
+    Rows are grouped per topic, partition and asset. Blocks of rows given as columns and single rows
+    are buffered as they are, and only turned into a table when they are written. The buffered rows
+    of a partition are written when one of its assets has buffered max_rows rows, or when its oldest
+    row has been buffered for max_seconds. Each file is written under a temporary name, fsynced and then renamed, so a file
+    is either complete or absent. Only after that is the partition's offset returned for commit.
+
+    Attributes:
+        directory (str): The directory of the output files.
+        max_rows (int): The number of buffered rows of an asset that rolls its partition.
+        max_seconds (float): The age of the oldest buffered row of a partition that rolls it.
+    """
+
+    def __init__(self, directory='./kafka_datasets', max_rows=100000, max_seconds=60.0, clock=time.monotonic):
+        """
+        Initialize a RollingFileWriter instance.
+
+        Parameters:
+            directory (str): The directory of the output files.
+            max_rows (int): The number of buffered rows of an asset that rolls its partition.
+            max_seconds (float): The age of the oldest buffered row of a partition that rolls it.
+            clock (callable): The clock measuring the age of the buffers in seconds.
+        """
+        self.directory = directory
+        self.max_rows = max_rows
+        self.max_seconds = max_seconds
+        self.clock = clock
+        self._blocks = defaultdict(list)
+        self._records = defaultdict(list)
+        self._rows = defaultdict(int)
+        self._first_offsets = {}
+        self._next_offsets = {}
+        self._opened = {}
+
+    def add(self, topic, partition, offset, asset_id=None, columns=None, record=None):
+        """
+        Buffer the rows of a consumed message.
+
+        Messages without rows still advance the offset of their partition.
+
+        Parameters:
+            topic (str): The topic of the message.
+            partition (int): The partition of the message.
+            offset (int): The offset of the message.
+            asset_id (str, optional): The asset the rows belong to.
+            columns (dict, optional): A block of rows as columns, arrays or scalars repeated on every row.
+            record (dict, optional): A single row.
+        """
+        topic_partition = (topic, partition)
+        self._opened.setdefault(topic_partition, self.clock())
+        self._next_offsets[topic_partition] = max(self._next_offsets.get(topic_partition, 0), offset + 1)
+        if columns is None and record is None:
+            return
+
+        group = (topic, partition, str(asset_id))
+        self._first_offsets.setdefault(group, offset)
+        if columns is not None:
+            self._blocks[group].append(columns)
+            self._rows[group] += max((len(column) for column in columns.values() if np.ndim(column) == 1),
+                                     default=1)
+        if record is not None:
+            self._records[group].append(record)
+            self._rows[group] += 1
+
+    def due(self):
+        """
+        Get the partitions whose buffers should be written.
+
+        Returns:
+            list: The (topic, partition) pairs that reached max_rows or max_seconds.
+        """
+        now = self.clock()
+        full = {group[:2] for group, rows in self._rows.items() if rows >= self.max_rows}
+        return [topic_partition for topic_partition, opened in self._opened.items()
+                if topic_partition in full or now - opened >= self.max_seconds]
+
+    def flush(self, partitions=None):
+        """
+        Write the buffered rows of partitions to durable files.
+
+        Parameters:
+            partitions (list, optional): The (topic, partition) pairs to write, every buffered partition by default.
+
+        Returns:
+            dict: The next offset to commit of every written (topic, partition).
+        """
+        import pandas as pd
+
+        partitions = list(self._opened) if partitions is None else partitions
+        offsets = {}
+        for topic_partition in partitions:
+            for group in [group for group in self._rows if group[:2] == topic_partition]:
+                frames = [pd.DataFrame(columns) for columns in self._blocks.pop(group, [])]
+                records = self._records.pop(group, [])
+                if records:
+                    frames.append(pd.DataFrame.from_records(records))
+                del self._rows[group]
+                first_offset = self._first_offsets.pop(group)
+                data_df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+                self._write(group, first_offset, self._next_offsets[topic_partition] - 1, data_df)
+
+            if topic_partition in self._opened:
+                del self._opened[topic_partition]
+                offsets[topic_partition] = self._next_offsets[topic_partition]
+        return offsets
+
+    def flush_due(self):
+        """
+        Write the partitions that reached max_rows or max_seconds.
+
+        Returns:
+            dict: The next offset to commit of every written (topic, partition).
+        """
+        return self.flush(self.due())
+
+    def _write(self, group, first_offset, last_offset, data_df):
+        """
+        Write the rows of an asset to a new file and make it durable.
+
+        Parameters:
+            group (tuple): The (topic, partition, asset_id) of the rows.
+            first_offset (int): The offset of the first message of the rows.
+            last_offset (int): The offset of the last consumed message of the partition.
+            data_df (DataFrame): The rows.
+        """
+        topic, partition, asset_id = group
+        directory = os.path.join(self.directory, f"{topic}-{partition}", asset_id)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{first_offset:020d}-{last_offset:020d}.csv")
+
+        # the temporary name is unique to this writer, so a partition consumed twice around a
+        # rebalance never has two writers renaming the same temporary file
+        temporary_path = f"{path}.{os.getpid()}-{id(self)}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8', newline='') as csv_file:
+            data_df.to_csv(csv_file, index=False)
+            csv_file.flush()
+            os.fsync(csv_file.fileno())
+        os.replace(temporary_path, path)
+
+        directory_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(directory_fd)
+        finally:
+            os.close(directory_fd)
@@ -0,0 +1,106 @@
+import csv
+import json
+import os
+import time
+
+from data_producer import open_sink
+
+
+class MetadataRecorder:
+    """
+    Record the metadata of the generated series in memory and append it to a CSV file.
+
+    Rows are appended to the file in batches, every flush_every rows or flush_seconds seconds,
+    through a file kept open for the whole run, so recording n series costs O(n). The final
+    metadata is built from the rows kept in memory instead of reading the file back.
+
+    Attributes:
+        sink (str): The path of the metadata CSV file, compressed when it ends with '.gz' or '.zst'.
+        rows (list): The metadata of every recorded series.
+        flush_every (int): The number of pending rows that triggers a flush.
+        flush_seconds (float): The age of the oldest pending row that triggers a flush.
+    """
+
+    def __init__(self, sink, flush_every=100, flush_seconds=5.0, compression_level=None):
+        """
+        Initialize a MetadataRecorder instance.
+
+        Parameters:
+            sink (str): The path of the metadata CSV file.
+            flush_every (int): The number of pending rows that triggers a flush.
+            flush_seconds (float): The age of the oldest pending row that triggers a flush.
+            compression_level (int, optional): The compression level of a compressed sink.
+        """
+        self.sink = sink
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.compression_level = compression_level
+        self.rows = []
+        self._flushed = 0
+        self._pending_since = None
+        self._file = None
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def append(self, row):
+        """
+        Record the metadata of a series.
+
+        Parameters:
+            row (dict): The metadata of the series.
+        """
+        self.rows.append(row)
+        if self._pending_since is None:
+            self._pending_since = time.monotonic()
+        if len(self.rows) - self._flushed >= self.flush_every \
+                or time.monotonic() - self._pending_since >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        """
+        Append the pending rows to the metadata file.
+        """
+        if self._flushed == len(self.rows):
+            return
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.sink) or '.', exist_ok=True)
+            self._file = open_sink(self.sink, 'w', self.compression_level)
+            self._writer = csv.DictWriter(self._file, fieldnames=list(self.rows[0]), extrasaction='ignore')
+            self._writer.writeheader()
+        self._writer.writerows(self.rows[self._flushed:])
+        self._file.flush()
+        self._flushed = len(self.rows)
+        self._pending_since = None
+
+    def close(self):
+        """
+        Append the pending rows and close the metadata file.
+        """
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+    def records(self):
+        """
+        The recorded metadata as it reads back from the CSV file, every value as a string.
+
+        Returns:
+            list: The metadata of every recorded series.
+        """
+        return [{key: '' if value is None else str(value) for key, value in row.items()} for row in self.rows]
+
+    def to_json(self):
+        """
+        The recorded metadata serialized for Simulator.metadata.
+
+        Returns:
+            str: The JSON list of the metadata of every recorded series.
+        """
+        return json.dumps(self.records())
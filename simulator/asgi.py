@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'simulator.settings')
 
 application = get_asgi_application()
+
+# the workers of the job executor start with the server, running the jobs a previous server left in the queue
+from simulator_api.views import job_executor  # noqa: E402
+
+job_executor.start()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -157,3 +158,50 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Simulator output
+# Seasons of the configurations evaluated as harmonic components by FourierSeasonality, one sweep option
+# per configuration, instead of the fixed daily and weekly seasonality options. Off by default, as it
+# changes the series, and their number, generated for an existing simulator
+
+SIMULATOR_HARMONIC_SEASONALITY = False
+
+# Number of threads writing generated series while the next ones are generated, and the number
+# of generated series allowed to wait for them before generation blocks
+
+SIMULATOR_WRITER_THREADS = 2
+SIMULATOR_WRITE_QUEUE_SIZE = 16
+
+# Suffix compressing the CSV output of a run as a stream: '' for plain CSV, '.gz' for gzip or '.zst'
+# for zstandard, and the compression level, None for the default level of the codec
+
+SIMULATOR_CSV_COMPRESSION = ''
+SIMULATOR_COMPRESSION_LEVEL = None
+
+# Streaming runs replay the generated series in time windows of this many simulated seconds, every
+# series being generated this many points at a time. Every series is scaled by the minimum and maximum
+# of its whole horizon, found by a first pass over its deterministic components, and the first window
+# needs the first points of every series: a stream starts sending after the deterministic components
+# of the whole sweep have been generated once, whatever these two settings
+
+SIMULATOR_STREAM_WINDOW = 60
+SIMULATOR_STREAM_CHUNK_SIZE = 4096
+
+# Broker of the Kafka runs: 'kafka' for the Kafka cluster or 'local' for append-only logs kept on the
+# local disk in SIMULATOR_BROKER_DIRECTORY, both overridden by the environment variables of the same name
+
+SIMULATOR_BROKER = os.environ.get('SIMULATOR_BROKER', 'kafka')
+SIMULATOR_BROKER_DIRECTORY = os.environ.get('SIMULATOR_BROKER_DIRECTORY', './kafka_log')
+
+# Runs are queued in the database and run by this many worker threads, the jobs of higher priority
+# first; a run is rejected with 503 Service Unavailable, to retry after SIMULATOR_JOB_RETRY_AFTER
+# seconds, while SIMULATOR_JOB_QUEUE_SIZE runs are waiting. Both sizes are overridden by the
+# environment variables of the same name
+
+SIMULATOR_JOB_WORKERS = int(os.environ.get('SIMULATOR_JOB_WORKERS', 2))
+SIMULATOR_JOB_QUEUE_SIZE = int(os.environ.get('SIMULATOR_JOB_QUEUE_SIZE', 16))
+SIMULATOR_JOB_RETRY_AFTER = 30
+
+# Seconds a stop request waits for a running simulator to end before answering that it is stopping
+
+SIMULATOR_JOB_STOP_TIMEOUT = 10
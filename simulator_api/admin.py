@@ -5,3 +5,4 @@ from .models import *
 admin.site.register(Simulator)
 admin.site.register(Configuration)
 admin.site.register(SeasonalityComponentDetails)
+admin.site.register(SimulatorJob)
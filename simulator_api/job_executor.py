@@ -0,0 +1,231 @@
+import threading
+
+from django.db import IntegrityError, close_old_connections, connection, transaction
+
+from .models import Simulator, SimulatorJob
+
+
+class QueueFull(Exception):
+    """
+    Raised when a job is submitted while the queue of the executor holds queue_size jobs.
+    """
+
+
+class AlreadyQueued(Exception):
+    """
+    Raised when a job is submitted for a simulator that is already queued or running.
+    """
+
+
+class JobExecutor:
+    """
+    Run the simulators on a fixed number of worker threads, taking their jobs from a queue kept in the database.
+
+    Submitting a run stores a SimulatorJob and marks the simulator as Queued. Workers take the jobs of the
+    highest priority first, in the order they were submitted, and remove them from the table, so at most
+    workers simulators run at once whatever the number of requests. A job is taken by deleting its row, so
+    several processes can share the queue without running a job twice, and jobs left in the queue by a
+    stopped process are run once the workers of the next one start, which the server does on startup. The queue is bounded: a submission
+    finding queue_size jobs waiting is rejected instead of piling up work the workers cannot keep up with.
+
+    Attributes:
+        run (callable): The function running a simulator, called as run(simulator, options, stop_event).
+        workers (int): The number of worker threads.
+        queue_size (int): The maximum number of jobs waiting in the queue.
+        poll_interval (float): How often idle workers look for jobs queued by other processes, in seconds.
+    """
+
+    def __init__(self, run, workers=2, queue_size=16, poll_interval=1.0):
+        """
+        Initialize a JobExecutor instance. The worker threads start with start or the first submission.
+
+        Parameters:
+            run (callable): The function running a simulator, called as run(simulator, options, stop_event).
+            workers (int): The number of worker threads.
+            queue_size (int): The maximum number of jobs waiting in the queue.
+            poll_interval (float): How often idle workers look for jobs queued by other processes, in seconds.
+        """
+        self.run = run
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._threads = []
+        self._running = {}
+        self._closed = False
+
+    def start(self):
+        """
+        Start the worker threads if they are not running.
+        """
+        with self._lock:
+            if self._threads or self._closed:
+                return
+            self._threads = [threading.Thread(target=self._work, daemon=True, name=f'simulator-worker-{position}')
+                             for position in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, simulator, options=None, priority=0):
+        """
+        Queue a run of a simulator.
+
+        Parameters:
+            simulator (Simulator): The simulator to run.
+            options (dict, optional): The options of the run, passed to run.
+            priority (int): The priority of the job, the jobs of higher priority running first.
+
+        Returns:
+            int: The number of jobs queued before this one.
+
+        Raises:
+            AlreadyQueued: If the simulator is already queued or running.
+            QueueFull: If queue_size jobs are waiting.
+            RuntimeError: If the executor is shut down.
+        """
+        if self._closed:
+            raise RuntimeError("The job executor is shut down")
+        if self._is_running(simulator):
+            raise AlreadyQueued(f"Simulator '{simulator.name}' is already queued or running.")
+        # the unique constraints on the simulator and the slot of a job make the database reject a
+        # second job of a simulator and a job finding every slot taken, whatever the number of
+        # concurrent submissions and of processes
+        taken = set(SimulatorJob.objects.values_list('slot', flat=True))
+        for slot in range(self.queue_size):
+            if slot in taken:
+                continue
+            try:
+                with transaction.atomic():
+                    SimulatorJob.objects.create(simulator=simulator, slot=slot, options=options or {},
+                                                priority=priority)
+                    # a worker registers a run before removing its job, so a run started before the
+                    # job was inserted is seen here
+                    if self._is_running(simulator):
+                        raise AlreadyQueued(f"Simulator '{simulator.name}' is already queued or running.")
+                    Simulator.objects.filter(pk=simulator.pk).update(status="Queued")
+                break
+            except IntegrityError:
+                if SimulatorJob.objects.filter(simulator=simulator).exists():
+                    raise AlreadyQueued(f"Simulator '{simulator.name}' is already queued or running.")
+        else:
+            if SimulatorJob.objects.filter(simulator=simulator).exists():
+                raise AlreadyQueued(f"Simulator '{simulator.name}' is already queued or running.")
+            raise QueueFull(f"The job queue is full ({self.queue_size} jobs waiting), try again later.")
+        simulator.status = "Queued"
+        ahead = SimulatorJob.objects.filter(priority__gte=priority).count() - 1
+        # the workers only see the job once the transaction of the request is committed
+        transaction.on_commit(self._wake)
+        return ahead
+
+    def _is_running(self, simulator):
+        with self._lock:
+            return simulator.process_id in self._running
+
+    def _wake(self):
+        """
+        Start the workers and wake one of them up to take a new job.
+        """
+        self.start()
+        with self._lock:
+            self._wakeup.notify()
+
+    def cancel(self, simulator, timeout=None):
+        """
+        Remove the queued job of a simulator, or stop its run and wait for it to end. The run records
+        the status of the simulator once it has stopped.
+
+        Parameters:
+            simulator (Simulator): The simulator.
+            timeout (float, optional): The maximum time to wait for a run to stop, in seconds.
+
+        Returns:
+            str: 'queued' if a queued job was removed, 'stopped' if a run was stopped, 'stopping' if a run
+            was asked to stop but had not ended after timeout seconds, None if the simulator was neither
+            queued nor running.
+        """
+        if SimulatorJob.objects.filter(simulator=simulator).delete()[0]:
+            return 'queued'
+        with self._lock:
+            running = self._running.get(simulator.process_id)
+        if running is None:
+            return None
+        stop_event, done_event = running
+        stop_event.set()
+        return 'stopped' if done_event.wait(timeout) else 'stopping'
+
+    def shutdown(self, wait=True):
+        """
+        Stop taking jobs, the queued ones staying in the database for the next executor.
+
+        Parameters:
+            wait (bool): Stop the running simulators and wait for the workers to exit.
+        """
+        with self._lock:
+            self._closed = True
+            running = list(self._running.values())
+            self._wakeup.notify_all()
+        if wait:
+            for stop_event, _ in running:
+                stop_event.set()
+            for thread in self._threads:
+                thread.join()
+
+    def _claim(self):
+        """
+        Take the next job from the queue and register its run.
+
+        Returns:
+            tuple: The job and the stop and done events of its run, None if the queue is empty.
+        """
+        for job in SimulatorJob.objects.select_related('simulator')[:self.workers + 1]:
+            process_id = job.simulator.process_id
+            events = (threading.Event(), threading.Event())
+            with self._lock:
+                if process_id in self._running:
+                    continue
+                self._running[process_id] = events
+            # deleting the row takes the job, another worker or process deleting it first wins
+            claimed = False
+            try:
+                claimed = SimulatorJob.objects.filter(pk=job.pk).delete()[0] > 0
+            finally:
+                if not claimed:
+                    with self._lock:
+                        del self._running[process_id]
+            if claimed:
+                return job, events
+        return None
+
+    def _work(self):
+        """
+        Run the queued jobs until the executor is shut down.
+        """
+        try:
+            while True:
+                if self._closed:
+                    return
+                close_old_connections()
+                try:
+                    claimed = self._claim()
+                except Exception as e:
+                    # a worker outlives the database being unavailable for a while
+                    print(f"Could not take a job from the queue: {e}")
+                    claimed = None
+                if claimed is None:
+                    with self._lock:
+                        if not self._closed:
+                            self._wakeup.wait(self.poll_interval)
+                    continue
+                job, (stop_event, done_event) = claimed
+                try:
+                    self.run(job.simulator, job.options, stop_event)
+                except Exception as e:
+                    print(f"Simulator '{job.simulator.name}' failed: {e}")
+                    Simulator.objects.filter(pk=job.simulator.pk).update(status="Failed")
+                finally:
+                    with self._lock:
+                        del self._running[job.simulator.process_id]
+                    done_event.set()
+        finally:
+            connection.close()
@@ -14,16 +14,20 @@ class Simulator(models.Model):
         data_size (int, optional): The size of generated data (optional, default is 0).
         use_case_name (str): The name of the use case associated with the simulator.
         time_series_type (str): The type of time series (Multiplicative or Additive).
-        producer_type (str): The type of data producer (Kafka or CSV file).
+        producer_type (str): The type of data producer (Kafka, CSV file, Parquet dataset or single file store).
         process_id (int): The unique identifier for the simulator.
         metadata (str, optional): Additional metadata (optional, default is None).
-        status (str): The current status of the simulator (Submitted, Running, Succeeded, or Failed).
+        status (str): The current status of the simulator (Submitted, Queued, Running, Succeeded, or Failed).
+        timings (json, optional): The time spent in every stage of the last run, with its percentiles
+            (see StageTimer.summary).
         datasets (ManyToManyField): Related configurations for data generation.
     """
     time_series_type_choices = (("Multiplicative", "multiplicative"), ("Additive", "additive"))
-    producer_type_choices = (("Kafka", "kafka"), ("CSV", "csv file"))
+    producer_type_choices = (("Kafka", "kafka"), ("CSV", "csv file"), ("Parquet", "parquet dataset"),
+                             ("Store", "single file store"))
     status_choices = (
-        ("Submitted", "submitted"), ("Running", "running"), ("Succeeded", "succeeded"), ("Failed", "failed"))
+        ("Submitted", "submitted"), ("Queued", "queued"), ("Running", "running"), ("Succeeded", "succeeded"),
+        ("Failed", "failed"))
     name = models.CharField(max_length=50, default='simulator', unique=True)
     start_date = models.DateTimeField()
     end_date = models.DateTimeField(blank=True, null=True)
@@ -34,6 +38,7 @@ class Simulator(models.Model):
     process_id = models.UUIDField(primary_key=True, default=uuid.uuid4)
     status = models.CharField(max_length=100, choices=status_choices, editable=False, default='Submitted')
     metadata = models.JSONField(null=True, editable=False)
+    timings = models.JSONField(null=True, editable=False)
 
 
 class Configuration(models.Model):
@@ -92,3 +97,29 @@ class SeasonalityComponentDetails(models.Model):
     frequency_multiplier = models.FloatField(max_length=10)
 
     config = models.ForeignKey(Configuration, on_delete=models.CASCADE, related_name='seasons', default=None)
+
+
+class SimulatorJob(models.Model):
+    """
+    This class defines the schema of the job queue table in the database: the runs of simulators waiting
+    for a worker of the JobExecutor. A job is removed from the table when a worker takes it.
+
+    attributes:
+        simulator (ForeignKey): The simulator to run, queued at most once.
+        slot (int): The place of the job in the bounded queue, below the queue size of the executor and
+            unique, so the database rejects the jobs submitted while the queue is full.
+        priority (int): The priority of the job, the jobs of higher priority running first.
+        options (json): The options of the run (mode, rate and speed).
+        submitted_at (datetime): When the job was queued, the jobs of the same priority running in this order.
+    """
+    simulator = models.ForeignKey(Simulator, related_name='jobs', on_delete=models.CASCADE)
+    slot = models.PositiveIntegerField()
+    priority = models.IntegerField(default=0)
+    options = models.JSONField(default=dict)
+    submitted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-priority', 'submitted_at', 'id']
+        indexes = [models.Index(fields=['-priority', 'submitted_at', 'id'], name='simulator_job_queue_order')]
+        constraints = [models.UniqueConstraint(fields=['simulator'], name='simulator_job_unique_simulator'),
+                       models.UniqueConstraint(fields=['slot'], name='simulator_job_unique_slot')]
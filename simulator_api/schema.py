@@ -17,7 +17,8 @@ class SimulatorType(DjangoObjectType):
                   "sink_name",
                   "process_id",
                   "status",
-                  "metadata")
+                  "metadata",
+                  "timings")
 
 
 class SeasonalityType(DjangoObjectType):
@@ -130,5 +130,6 @@ class SimulatorSerializer(serializers.ModelSerializer):
             'process_id',
             'status',
             'metadata',
+            'timings',
             'datasets'
         ]
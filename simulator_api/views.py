@@ -1,6 +1,7 @@
 import datetime
 import os
 
+from django.conf import settings
 from django.http import JsonResponse
 from rest_framework import status
 from rest_framework.generics import ListCreateAPIView
@@ -12,10 +13,18 @@ import threading, time
 import json
 import csv
 from collections import OrderedDict
+from itertools import takewhile
 
 from configuration_manager_creator import ConfigurationManagerCreator
+from configuration_manager_reader.configuration_snapshot import ConfigurationSnapshot
 from data_simulator import DataGenerator
 from data_producer_file_creator import DataProducerFileCreation
+from metadata_recorder import MetadataRecorder
+from stream_pacer import StreamPacer, interleave
+from write_pipeline import WritePipeline
+from kafka.broker import create_broker
+from kafka.message_format import SeriesChunkMessage
+from .job_executor import AlreadyQueued, JobExecutor, QueueFull
 from .serializers import *
 from kafka.kafka_consumer import *
 
@@ -105,26 +114,202 @@ class SimulatorCreation(ListCreateAPIView):
                         status=status.HTTP_201_CREATED)
 
 
-simulator_threads = {}
-stop_simulator_flags = {}
+def stop_run(simulator):
+    """
+    Record that the run of a simulator was stopped before it ended.
+
+    Arguments:
+        simulator (Simulator): The stopped simulator.
+    """
+    simulator.status = "Failed"
+    simulator.save()
+    print(f"{simulator.name} stopped")
+
+
+def run_simulator(simulator, options, stop_event):
+    """
+    Run a simulator: generate its series and write them to its sink. This runs on a worker of the
+    job executor.
+
+    Arguments:
+        simulator (Simulator): The simulator to run.
+        options (dict): The options of the run: its mode ('batch' or 'stream') and the rate and speed of a stream.
+        stop_event (threading.Event): Set to stop the run, which then marks the simulator as Failed.
+    """
+    pacer = None
+    if options.get('mode') == 'stream':
+        # the pacer waits on stop_event, so that stopping the run cuts a wait for the next message short
+        pacer = StreamPacer(rate=options.get('rate'), speed=options.get('speed'), sleep=stop_event.wait)
+
+    simulator.status = "Running"
+    simulator.save()
+
+    try:
+        print(simulator.status)
+        # the configuration is read once and shared by the generator and the produce loop
+        snapshot = ConfigurationSnapshot.load(simulator.name)
+        configuration_manager = ConfigurationManagerCreator.create(
+            "db", simulator.name, snapshot, harmonic_seasonality=settings.SIMULATOR_HARMONIC_SEASONALITY)
+        data_simulator = DataGenerator(configuration_manager)
+        # the generation stages and the writes to the sink are timed in every run
+        timer = data_simulator.timer
+        if simulator.sink_name == "Kafka":
+            broker = create_broker(settings.SIMULATOR_BROKER, settings.SIMULATOR_BROKER_DIRECTORY)
+            consumer1 = KafkaConsumer('kafka_simulated_data', broker=broker)
+            consumer1.consume()
+            sink = simulator.sink_name
+            meta_data_producer = DataProducerFileCreation.create(sink, broker=broker)
+
+            # every simulator has its own metadata file, as several runs may execute at once
+            with MetadataRecorder(f"./kafka_datasets/{simulator.name}_metadata.csv") as meta_data:
+                if pacer is not None:
+                    # the first window waits for the minimum and maximum of every series of the sweep
+                    started = time.monotonic()
+                    first_sent = None
+                    series = []
+                    for (chunks, meta_data_point) in data_simulator.generate_chunked(
+                            settings.SIMULATOR_STREAM_CHUNK_SIZE):
+                        if stop_event.is_set():
+                            break
+                        series.append(chunks)
+                        meta_data.append(meta_data_point)
+
+                    # no more series are started once the run is stopped, each one taking a pass over its horizon
+                    windows = interleave(takewhile(lambda chunks: not stop_event.is_set(), series),
+                                         settings.SIMULATOR_STREAM_WINDOW)
+                    messages = ((window_start, SeriesChunkMessage.from_data(attribute_id, asset_id, data))
+                                for (window_start, points) in windows
+                                for (_, data) in points
+                                for attribute_id, asset_id in snapshot.routes)
+                    for (window_start, message) in messages:
+                        if stop_event.is_set():
+                            break
+                        pacer.wait(len(message.values), window_start)
+                        if stop_event.is_set():
+                            break
+                        with timer.stage('sink'):
+                            meta_data_producer.produce_message(message)
+                        if first_sent is None:
+                            first_sent = time.monotonic() - started
+                            print(f"stream: first message sent after {first_sent:.2f}s")
+
+                    if stop_event.is_set():
+                        meta_data_producer.flush()
+                        stop_run(simulator)
+                        return
+                    print("stream: {points} points in {elapsed:.1f}s, {achieved_rate:.1f} points/s, jitter "
+                          "{jitter:.4f}s, lag mean {mean_lag:.4f}s max {max_lag:.4f}s".format(**pacer.stats()))
+                else:
+                    for (data, meta_data_point) in data_simulator.generate():
+                        if stop_event.is_set():
+                            meta_data_producer.flush()
+                            stop_run(simulator)
+                            return
+                        meta_data.append(meta_data_point)
+
+                        with timer.stage('sink'):
+                            for attribute_id, asset_id in snapshot.routes:
+                                for message in SeriesChunkMessage.chunks(attribute_id, asset_id, data):
+                                    meta_data_producer.produce_message(message)
+
+            with timer.stage('flush'):
+                meta_data_producer.flush()
+
+            simulator.metadata = meta_data.to_json()
+            simulator.timings = timer.summary()
+            simulator.status = "Succeeded"
+            simulator.save()
+            print(simulator.status)
+            print(timer.report())
+
+        elif simulator.sink_name in ("CSV", "Parquet", "Store"):
+            csv_file_name = f"{simulator.name}_data.csv{settings.SIMULATOR_CSV_COMPRESSION}"
+            sink = os.path.join('sample_datasets', csv_file_name)
+
+            meta_data = MetadataRecorder(sink, compression_level=settings.SIMULATOR_COMPRESSION_LEVEL)
+            store_producer = None
+            if simulator.sink_name == "Store":
+                store_producer = DataProducerFileCreation.create(
+                    os.path.join('sample_datasets', f"{simulator.name}.store"))
+
+            # series are written by background threads while the next ones are generated, the
+            # single store file being written by one thread so its series stay in order
+            pipeline = WritePipeline(
+                writers=1 if store_producer is not None else settings.SIMULATOR_WRITER_THREADS,
+                queue_size=settings.SIMULATOR_WRITE_QUEUE_SIZE)
+
+            try:
+                for (data, meta_data_point) in data_simulator.generate():
+                    if stop_event.is_set():
+                        stop_run(simulator)
+                        return
+                    series_id = os.path.splitext(meta_data_point['id'])[0]
+                    if store_producer is not None:
+                        pipeline.submit(timer.timed('sink', store_producer.produce), data, series_id=series_id,
+                                        metadata=meta_data_point)
+                    elif simulator.sink_name == "Parquet":
+                        series_producer = DataProducerFileCreation.create(
+                            os.path.join('sample_datasets', f"{simulator.name}.parquet"),
+                            simulator=simulator.name, series_id=series_id)
+                        pipeline.submit(timer.timed('sink', series_producer.produce), data)
+                    else:
+                        series_producer = DataProducerFileCreation.create(
+                            f"sample_datasets/{meta_data_point['id']}{settings.SIMULATOR_CSV_COMPRESSION}",
+                            compression_level=settings.SIMULATOR_COMPRESSION_LEVEL)
+                        pipeline.submit(timer.timed('sink', series_producer.produce), data)
+                    meta_data.append(meta_data_point)
+            finally:
+                try:
+                    pipeline.close()
+                finally:
+                    meta_data.close()
+                    if store_producer is not None:
+                        store_producer.close()
+                print("write pipeline: {written} series, queue depth mean {mean_queue_depth:.1f} max "
+                      "{max_queue_depth}, generation stalled {stall_seconds:.2f}s".format(**pipeline.stats()))
+
+            simulator.metadata = meta_data.to_json()
+            simulator.timings = timer.summary()
+            simulator.status = "Succeeded"
+            simulator.save()
+            print(simulator.status)
+            print(timer.report())
+
+    except Exception as e:
+        simulator.status = "Failed"
+        simulator.save()
+        print(str(e))
+
+
+job_executor = JobExecutor(run_simulator, workers=settings.SIMULATOR_JOB_WORKERS,
+                           queue_size=settings.SIMULATOR_JOB_QUEUE_SIZE)
 
 
 class SimulatorRunning(APIView):
     @transaction.atomic
     def post(self, request, simulator_name):
         """
-        Start running a simulator in the background.
+        Queue a run of a simulator.
+
+        This method handles the initiation of a simulator's execution. It checks if the provided simulator name
+        exists, then queues its run for the workers of the job executor, which run SIMULATOR_JOB_WORKERS simulators
+        at a time, the jobs of higher "priority" first. The simulator is Queued until a worker starts it, and its
+        status is updated accordingly during execution. If any errors occur, the status is set to "Failed".
+        A run is rejected while the simulator is already queued or running, and while the queue is full.
 
-        This method handles the initiation of a simulator's execution in a separate thread. It checks if the provided
-        simulator name exists, then runs the simulator's data generation process in the background thread.
-        The simulator's status is updated accordingly during execution. If any errors occur, the status is set to "Failed".
+        A Kafka simulator can also run in streaming mode ("mode": "stream"), replaying the generated series in
+        time order at the pace of their timestamps times "speed", and at most "rate" points per second. The
+        stream starts once the bounds scaling every series of the sweep are known, which takes a pass over
+        their deterministic components (see SIMULATOR_STREAM_WINDOW).
 
         Arguments:
-            request (HttpRequest): The HTTP request object containing the simulator's name in the POST data.
+            request (HttpRequest): The HTTP request object containing the simulator's name in the POST data, and
+                                   optionally the priority of the run, its mode, its speed and its rate.
 
         Returns:
-            Response: A response indicating that the simulator is running or an error response if the simulator
-                      is not found or if an error occurs during execution.
+            Response: A response indicating that the simulator is queued or an error response if the simulator
+                      is not found, if the options are invalid, if the simulator is already queued or running
+                      (409 Conflict) or if the queue is full (503 Service Unavailable).
 
         """
         try:
@@ -135,97 +320,39 @@ class SimulatorRunning(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        def run_simulator_in_background(simulator):
-            simulator.status = "Running"
-            simulator.save()
-
-            stop_simulator_flags[simulator.process_id] = threading.Event()
+        mode = request.data.get('mode', 'batch')
+        options = {'mode': mode}
+        if mode == 'stream':
+            if simulator.sink_name != "Kafka":
+                return Response({"error": "Only Kafka simulators can run in streaming mode."},
+                                status=status.HTTP_400_BAD_REQUEST)
+            rate = request.data.get('rate')
+            speed = request.data.get('speed')
             try:
-                print(simulator.status)
-                configuration_manager = ConfigurationManagerCreator.create("db", simulator.name)
-                data_simulator = DataGenerator(configuration_manager)
-                if simulator.sink_name == "Kafka":
-                    consumer1 = KafkaConsumer('kafka_simulated_data')
-                    consumer1.consume()
-                    sink = simulator.sink_name
-                    meta_data_producer = DataProducerFileCreation.create(sink)
-                    meta_data = OrderedDict()
-                    simulator_data = []
-
-                    for (data, meta_data_point) in data_simulator.generate():
-                        if stop_simulator_flags[simulator.process_id].is_set():
-                            del stop_simulator_flags[simulator.process_id]
-                            return
-                        simulator_data.append(meta_data_point)
-                        data_df = pd.DataFrame(simulator_data)
-                        os.makedirs(os.path.dirname("./kafka_datasets"), exist_ok=True)
-
-                        data_df.to_csv(f"./kafka_datasets/metadata.csv", encoding='utf-8', index=False)
-
-                        for configuration in simulator.configurations.all():
-                            meta_data["attribute_id"] = configuration.attribute_id
-                            meta_data["value"] = data["value"].iloc[-1]
-                            meta_data["timestamp"] = str(data["timestamp"][0])
-                            meta_data["asset_id"] = configuration.generator_id
-                            meta_data_producer.produce(meta_data)
-
-                    data = []
-                    with open("./kafka_datasets/metadata.csv", 'r') as csv_file:
-                        csv_reader = csv.DictReader(csv_file)
-                        for row in csv_reader:
-                            data.append(row)
-
-                    data_json = json.dumps(data)
-                    simulator.metadata = data_json
-                    simulator.status = "Succeeded"
-                    simulator.save()
-                    print(simulator.status)
-
-                elif simulator.sink_name == "CSV":
-                    csv_file_name = f"{simulator.name}_data.csv"
-                    sink = os.path.join('sample_datasets', csv_file_name)
-
-                    meta_data_producer = DataProducerFileCreation.create(sink)
-
-                    meta_data = []
-                    for (data, meta_data_point) in data_simulator.generate():
-                        if stop_simulator_flags[simulator.process_id].is_set():
-                            del stop_simulator_flags[simulator.process_id]
-                            return
-                        DataProducerFileCreation.create(f"sample_datasets/{meta_data_point['id']}").produce(data)
-                        meta_data.append(meta_data_point)
-
-                    meta_data_producer.produce(meta_data)
-
-                    data = []
-                    with open(sink, 'r') as csv_file:
-                        csv_reader = csv.DictReader(csv_file)
-                        for row in csv_reader:
-                            data.append(row)
-                    data_json = json.dumps(data)
-                    simulator.metadata = data_json
-                    simulator.status = "Succeeded"
-                    simulator.save()
-                    print(simulator.status)
-
-            except Exception as e:
-                simulator.status = "Failed"
-                simulator.save()
-                print(str(e))
-                return Response({simulator.name: "failed"}, status=status.HTTP_200_OK)
+                options['rate'] = None if rate in (None, '') else float(rate)
+                options['speed'] = None if speed in (None, '') else float(speed)
+                # the options are checked now, the pacer of the run is built by the worker running it
+                StreamPacer(rate=options['rate'], speed=options['speed'])
+            except (TypeError, ValueError) as e:
+                return Response({"error": f"Invalid streaming options: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+        elif mode != 'batch':
+            return Response({"error": f"Unknown mode '{mode}', expected 'batch' or 'stream'."},
+                            status=status.HTTP_400_BAD_REQUEST)
 
-            finally:
-                if simulator.process_id in simulator_threads:
-                    del simulator_threads[simulator.process_id]
-                    del stop_simulator_flags[simulator.process_id]
-            time.sleep(1)
+        try:
+            priority = int(request.data.get('priority', 0))
+        except (TypeError, ValueError):
+            return Response({"error": "The priority must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
 
-        simulator_thread = threading.Thread(target=run_simulator_in_background, args=(simulator,))
-        simulator_threads[simulator.process_id] = simulator_thread
-        simulator_thread.daemon = True
-        simulator_thread.start()
+        try:
+            job_executor.submit(simulator, options, priority)
+        except AlreadyQueued as e:
+            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+        except QueueFull as e:
+            return Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            headers={'Retry-After': str(settings.SIMULATOR_JOB_RETRY_AFTER)})
 
-        return Response({simulator.name: "Running"}, status=status.HTTP_200_OK)
+        return Response({simulator.name: "Queued"}, status=status.HTTP_202_ACCEPTED)
 
 
 class SimulatorStopping(APIView):
@@ -233,9 +360,11 @@ class SimulatorStopping(APIView):
     Stop a running simulator.
 
     This method handles the request to stop a simulator's execution. It checks if the provided simulator name exists
-    and whether the simulator is currently running in a background thread. If found, it signals the thread to stop,
-    waits for the thread to complete, and updates the simulator's status to "Failed". If the simulator is not running,
-    it returns a message indicating that the simulator was not running.
+    and whether the simulator is currently queued or running on a worker of the job executor. A queued run is removed
+    from the queue and the simulator's status is updated to "Failed". A running one is signalled to stop and waited
+    for up to SIMULATOR_JOB_STOP_TIMEOUT seconds, the run recording the "Failed" status itself once it has stopped;
+    a run still stopping after that is reported as stopping (202 Accepted). If the simulator is not running, it
+    returns a message indicating that the simulator was not running.
 
     Arguments:
         request (HttpRequest): The HTTP request object containing the simulator's name in the POST data.
@@ -257,19 +386,19 @@ class SimulatorStopping(APIView):
         else:
             try:
                 simulator = Simulator.objects.get(name=simulator_name)
-                simulator_thread = simulator_threads.get(simulator.process_id)
 
-                if simulator_thread:
-                    stop_simulator_flags[simulator.process_id].set()
-
-                    simulator_thread.join()
-
-                    simulator.status = "Failed"
-                    simulator.save()
+                cancelled = job_executor.cancel(simulator, timeout=settings.SIMULATOR_JOB_STOP_TIMEOUT)
+                if cancelled == 'queued':
+                    Simulator.objects.filter(pk=simulator.pk).update(status="Failed")
 
+                if cancelled in ('queued', 'stopped'):
                     return Response({"message": f"{simulator_name} stopped."},
                                     status=status.HTTP_200_OK)
 
+                elif cancelled == 'stopping':
+                    return Response({"message": f"{simulator_name} is stopping."},
+                                    status=status.HTTP_202_ACCEPTED)
+
                 else:
                     return Response({"message": f"{simulator_name} was not running."},
                                     status=status.HTTP_200_OK)
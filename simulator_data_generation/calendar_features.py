@@ -0,0 +1,244 @@
+from functools import cached_property
+
+import numpy as np
+
+NANOSECONDS_PER_HOUR = 3600 * 10 ** 9
+NANOSECONDS_PER_DAY = 24 * NANOSECONDS_PER_HOUR
+
+
+class CalendarFeatures:
+    """
+    Calendar fields of a regular time index computed with int64 epoch arithmetic.
+
+    The points of the index are start + step * i, so every field is derived from integer
+    divisions of the epoch nanoseconds instead of the DatetimeIndex accessors. The fields use
+    the same names as the DatetimeIndex accessors (hour, dayofweek, dayofyear, quarter, ...),
+    so the seasonality and cycle components accept either. Each field is computed once on
+    first access and then shared by every component using the same features.
+
+    Attributes:
+        start (int): The first point of the index in nanoseconds since the epoch (wall-clock time).
+        step (int): The distance between two points in nanoseconds.
+        length (int): The number of points of the index.
+    """
+
+    def __init__(self, start, step, length):
+        """
+        Initialize the features of the index start + step * i for i in range(length).
+
+        Parameters:
+            start (int): The first point of the index in nanoseconds since the epoch (wall-clock time).
+            step (int): The distance between two points in nanoseconds.
+            length (int): The number of points of the index.
+        """
+        self.start = int(start)
+        self.step = int(step)
+        self.length = int(length)
+
+    @classmethod
+    def from_range(cls, start_date, freq, length, offset=0):
+        """
+        Create the features of a regular time index without building it.
+
+        Parameters:
+            start_date (datetime): The start date of the time index.
+            freq (str): The fixed frequency of the time index (e.g., '10T', '1H', 'D').
+            length (int): The number of points of the features.
+            offset (int): The position of the first point of the features in the time index.
+
+        Returns:
+            CalendarFeatures: The calendar features.
+        """
+        import pandas as pd
+
+        start = pd.Timestamp(start_date)
+        if start.tz is not None:
+            # the fields follow the wall-clock time of the start, like the DatetimeIndex accessors do
+            start = start.tz_localize(None)
+        step = pd.Timedelta(freq).value
+        return cls(start.value + offset * step, step, length)
+
+    @classmethod
+    def from_index(cls, date_rng):
+        """
+        Create the features of an existing regular time index.
+
+        Parameters:
+            date_rng (DatetimeIndex): A time index with a fixed frequency.
+
+        Returns:
+            CalendarFeatures: The calendar features.
+        """
+        return cls.from_range(date_rng[0], date_rng.freq, len(date_rng))
+
+    def __len__(self):
+        return self.length
+
+    @cached_property
+    def epoch_nanoseconds(self):
+        """
+        The points of the index in nanoseconds since the epoch.
+        """
+        return self.start + self.step * np.arange(self.length, dtype=np.int64)
+
+    def _periodic(self, period, field):
+        """
+        Compute a field that only depends on the position of a point within a fixed period.
+
+        On a regular index such a field repeats every period / gcd(step, period) points, so it is
+        computed for a single repetition and then tiled over the index.
+
+        Parameters:
+            period (int): The period of the field in nanoseconds.
+            field (callable): A function computing the field from epoch nanoseconds.
+
+        Returns:
+            numpy.ndarray: The field of every point.
+        """
+        repetition = period // np.gcd(self.step, period)
+        if repetition >= self.length:
+            return field(self.epoch_nanoseconds)
+        pattern = field(self.start + self.step * np.arange(repetition, dtype=np.int64))
+        return np.resize(pattern, self.length)
+
+    def _daily(self, field):
+        """
+        Compute a field that only depends on the date of a point.
+
+        The field is computed once per day covered by the index and gathered for every point.
+
+        Parameters:
+            field (callable): A function computing the field from days since the epoch.
+
+        Returns:
+            numpy.ndarray: The field of every point.
+        """
+        first_day = self.days[0] if self.length else 0
+        return field(np.arange(first_day, self.days[-1] + 1 if self.length else 0))[self.days - first_day]
+
+    @cached_property
+    def days(self):
+        """
+        The number of whole days since the epoch of every point.
+        """
+        return (self.start + self.step * np.arange(self.length, dtype=np.int64)) // NANOSECONDS_PER_DAY
+
+    @cached_property
+    def hour(self):
+        """
+        The hour of the day of every point.
+        """
+        return self._periodic(NANOSECONDS_PER_DAY,
+                              lambda nanoseconds: (nanoseconds % NANOSECONDS_PER_DAY) // NANOSECONDS_PER_HOUR)
+
+    @cached_property
+    def dayofweek(self):
+        """
+        The day of the week of every point, Monday being 0.
+        """
+        # 1970-01-01 was a Thursday, day 3 of a week starting on Monday
+        return self._periodic(7 * NANOSECONDS_PER_DAY,
+                              lambda nanoseconds: (nanoseconds // NANOSECONDS_PER_DAY + 3) % 7)
+
+    @cached_property
+    def day_fraction(self):
+        """
+        The elapsed fraction of the day of every point, in [0, 1).
+        """
+        return self._periodic(NANOSECONDS_PER_DAY,
+                              lambda nanoseconds: (nanoseconds % NANOSECONDS_PER_DAY) / NANOSECONDS_PER_DAY)
+
+    @cached_property
+    def week_fraction(self):
+        """
+        The elapsed fraction of the week of every point, weeks starting on Monday, in [0, 1).
+        """
+        week = 7 * NANOSECONDS_PER_DAY
+        return self._periodic(week, lambda nanoseconds: ((nanoseconds + 3 * NANOSECONDS_PER_DAY) % week) / week)
+
+    @cached_property
+    def month_fraction(self):
+        """
+        The elapsed fraction of the calendar month of every point, in [0, 1).
+        """
+        return (self.day - 1 + self.day_fraction) / self.days_in_month
+
+    @property
+    def year(self):
+        """
+        The year of every point.
+        """
+        return self._daily(lambda days: self._civil_from_days(days)[0])
+
+    @property
+    def month(self):
+        """
+        The month of every point, January being 1.
+        """
+        return self._daily(lambda days: self._civil_from_days(days)[1])
+
+    @property
+    def day(self):
+        """
+        The day of the month of every point.
+        """
+        return self._daily(lambda days: self._civil_from_days(days)[2])
+
+    @cached_property
+    def quarter(self):
+        """
+        The quarter of the year of every point.
+        """
+        return self._daily(lambda days: (self._civil_from_days(days)[1] - 1) // 3 + 1)
+
+    @cached_property
+    def dayofyear(self):
+        """
+        The day of the year of every point, January 1st being 1.
+        """
+        def dayofyear(days):
+            year = self._civil_from_days(days)[0]
+            return days - self._days_from_civil(year, 1, 1) + 1
+
+        return self._daily(dayofyear)
+
+    @cached_property
+    def days_in_month(self):
+        """
+        The number of days of the month of every point.
+        """
+        def days_in_month(days):
+            year, month, _ = self._civil_from_days(days)
+            next_month_year = year + (month == 12)
+            next_month = month % 12 + 1
+            return self._days_from_civil(next_month_year, next_month, 1) - self._days_from_civil(year, month, 1)
+
+        return self._daily(days_in_month)
+
+    @staticmethod
+    def _civil_from_days(days):
+        """
+        The (year, month, day) of days since the epoch, using the days-to-civil algorithm of Howard Hinnant.
+        """
+        shifted = days + 719468
+        era = shifted // 146097
+        day_of_era = shifted - era * 146097
+        year_of_era = (day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096) // 365
+        day_of_year = day_of_era - (365 * year_of_era + year_of_era // 4 - year_of_era // 100)
+        shifted_month = (5 * day_of_year + 2) // 153
+        day = day_of_year - (153 * shifted_month + 2) // 5 + 1
+        month = np.where(shifted_month < 10, shifted_month + 3, shifted_month - 9)
+        year = year_of_era + era * 400 + (month <= 2)
+        return year, month, day
+
+    @staticmethod
+    def _days_from_civil(year, month, day):
+        """
+        The number of days since the epoch of civil dates, the inverse of _civil_from_days.
+        """
+        year = year - (month <= 2)
+        era = year // 400
+        year_of_era = year - era * 400
+        day_of_year = (153 * np.where(month > 2, month - 3, month + 9) + 2) // 5 + day - 1
+        day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+        return era * 146097 + day_of_era - 719468
@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class ComponentCache:
+    """
+    A bounded least-recently-used cache for time indexes and deterministic series components.
+
+    Cached numpy arrays are made read-only so a consumer cannot modify a value shared with
+    the other series of the sweep.
+
+    Attributes:
+        maxsize (int): The maximum number of cached entries.
+        hits (int): The number of lookups served from the cache.
+        misses (int): The number of lookups that had to build their value.
+    """
+
+    def __init__(self, maxsize=128):
+        """
+        Initialize an empty cache.
+
+        Parameters:
+            maxsize (int): The maximum number of cached entries.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        """
+        Pickle the cache as an empty cache with the same size, e.g. when it is sent to a worker process.
+        """
+        return ComponentCache, (self.maxsize,)
+
+    def get(self, key, factory):
+        """
+        Return the cached value of key, building it with factory on a miss.
+
+        Parameters:
+            key (tuple): A hashable key describing every parameter the value depends on.
+            factory (callable): A function without arguments building the value.
+
+        Returns:
+            The cached value.
+        """
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+
+        value = factory()
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return value
+
+    def clear(self):
+        """
+        Remove every cached entry and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def cache_info(self):
+        """
+        Report the cache statistics.
+
+        Returns:
+            dict: The hits, misses, current size and maximum size of the cache.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'maxsize': self.maxsize}
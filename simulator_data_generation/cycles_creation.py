@@ -8,7 +8,7 @@ class Cycles:
         Add cyclic component to the time series data.
 
         Parameters:
-            data (DatetimeIndex): The time index for the data.
+            data (DatetimeIndex or CalendarFeatures): The time index for the data.
             cyclic_periods (str): The type of cyclic periods ('No Cyclic Periods', 'Short Cycles', or 'Long Cycles').
 
         Returns:
@@ -0,0 +1,44 @@
+import numpy as np
+
+
+class MinMaxScaling:
+    @staticmethod
+    def scale(data, feature_range=(-1, 1), dtype=float):
+        """
+        Scale each series to the given feature range using its own minimum and maximum.
+
+        This gives the same result as sklearn's MinMaxScaler fitted on a single series, including
+        the handling of constant series, but works on every row of a (series x time) block at once.
+
+        Parameters:
+            data (numpy.ndarray): The time series data, either 1-D or a 2-D (series x time) block.
+            feature_range (tuple): The desired range of the scaled data.
+            dtype (numpy.dtype): The floating point type of the scaled data.
+
+        Returns:
+            numpy.ndarray: The scaled data with the same shape as data.
+        """
+        data = np.asarray(data, dtype=float)
+        data_min = data.min(axis=-1, keepdims=True)
+        data_max = data.max(axis=-1, keepdims=True)
+        return MinMaxScaling.scale_with_bounds(data, data_min, data_max, feature_range, dtype)
+
+    @staticmethod
+    def scale_with_bounds(data, data_min, data_max, feature_range=(-1, 1), dtype=float):
+        """
+        Scale data to the given feature range using a known minimum and maximum.
+
+        Parameters:
+            data (numpy.ndarray): The time series data.
+            data_min (float or numpy.ndarray): The minimum of the data, broadcastable against it.
+            data_max (float or numpy.ndarray): The maximum of the data, broadcastable against it.
+            feature_range (tuple): The desired range of the scaled data.
+            dtype (numpy.dtype): The floating point type of the scaled data.
+
+        Returns:
+            numpy.ndarray: The scaled data.
+        """
+        data_range = np.asarray(data_max - data_min, dtype=float)
+        data_range = np.where(data_range == 0, 1.0, data_range)
+        scale = (feature_range[1] - feature_range[0]) / data_range
+        return ((data - data_min) * scale + feature_range[0]).astype(dtype, copy=False)
@@ -3,21 +3,50 @@ import numpy as np
 
 class MissingValues:
     @staticmethod
-    def add_missing_values(data, percentage_missing=0.05):
+    def add_missing_values(data, percentage_missing=0.05, random_state=None):
         """
         Add missing values to the time series data within a specified date range.
 
         Parameters:
             data (numpy.ndarray): The time series data.
             percentage_missing (Float): percentage of missing value.
+            random_state (numpy.random.RandomState, optional): The random state to draw from,
+                the global numpy random state by default.
 
         Returns:
             numpy.ndarray: The time series data with missing values.
         """
+        random_state = np.random if random_state is None else random_state
         num_missing = int(len(data) * percentage_missing)
-        missing_indices = np.random.choice(len(data), size=num_missing, replace=False)
+        missing_indices = random_state.choice(len(data), size=num_missing, replace=False)
 
         data_with_missing = data.copy()
         data_with_missing[missing_indices] = np.nan
 
-        return data_with_missing
\ No newline at end of file
+        return data_with_missing
+
+    @staticmethod
+    def add_missing_values_block(data, percentage_missing=0.05):
+        """
+        Add missing values to every series of a (series x time) block.
+
+        The missing positions of each series are drawn without replacement by keeping the
+        smallest keys of one random (series x time) draw.
+
+        Parameters:
+            data (numpy.ndarray): The (series x time) block of time series data.
+            percentage_missing (Float): percentage of missing value.
+
+        Returns:
+            numpy.ndarray: The block with missing values.
+        """
+        num_missing = int(data.shape[1] * percentage_missing)
+        data_with_missing = data.copy()
+        if num_missing <= 0:
+            return data_with_missing
+
+        keys = np.random.random(data.shape)
+        missing_indices = np.argpartition(keys, num_missing - 1, axis=1)[:, :num_missing]
+        data_with_missing[np.arange(data.shape[0])[:, np.newaxis], missing_indices] = np.nan
+
+        return data_with_missing
@@ -1,30 +1,72 @@
 import numpy as np
-import pandas as pd
 
 
 class Noise:
     @staticmethod
-    def add_noise(data, noise_level):
+    def noise_scale(noise_level):
         """
-        Add noise component to the time series data.
+        Map a noise level option to the relative standard deviation of the noise.
 
         Parameters:
-            data (DatetimeIndex): The time index for the data.
-            noise_level (str): The magnitude of noise ('No Noise', 'Small Noise', 'Intermediate Noise', 'Large Noise').
+            noise_level (str): The magnitude of noise ('small', 'large' or anything else for no noise).
 
         Returns:
-            numpy.ndarray: The noise component of the time series.
+            float: The noise standard deviation as a fraction of abs(data).
         """
         if noise_level == "small":
-            noise_level = 0.1
-            # noise = np.random.normal(0, 0.05, len(data))
+            return 0.1
         elif noise_level == "large":
-            noise_level = 0.3
-            # noise = np.random.normal(0, 0.1, len(data))
+            return 0.3
         else:  # No Noise
-            noise_level = 0
+            return 0
+
+    @staticmethod
+    def add_noise_block(data, noise_level, random_state=None):
+        """
+        Add heteroscedastic noise to a block of time series in a single draw.
+
+        Every sample gets gaussian noise with a standard deviation of abs(sample) * noise scale,
+        so a whole (series x time) block is handled by one call to np.random.normal.
+
+        Parameters:
+            data (numpy.ndarray): The time series data, either 1-D or a 2-D (series x time) block.
+            noise_level (str or list): The noise level option, either one for the whole block
+                or one per series of a 2-D block.
+            random_state (numpy.random.RandomState, optional): The random state to draw from,
+                the global numpy random state by default.
+
+        Returns:
+            numpy.ndarray: A new array with the same shape and floating point type as data with the noise added.
+        """
+        data = np.asarray(data)
+        if not np.issubdtype(data.dtype, np.floating):
+            data = data.astype(float)
+
+        if isinstance(noise_level, (list, tuple, np.ndarray)):
+            noise_level = np.array([Noise.noise_scale(level) for level in noise_level])[:, np.newaxis]
+        else:
+            noise_level = Noise.noise_scale(noise_level)
+
+        if np.all(np.asarray(noise_level) <= 0):
+            return data.copy()
+
+        random_state = np.random if random_state is None else random_state
+        return data + random_state.normal(0, np.abs(data) * noise_level).astype(data.dtype, copy=False)
+
+    @staticmethod
+    def add_noise(data, noise_level, random_state=None):
+        """
+        Add noise component to the time series data.
+
+        Parameters:
+            data (numpy.ndarray): The scaled time series data as a single (n x 1) column.
+            noise_level (str): The magnitude of noise ('No Noise', 'Small Noise', 'Intermediate Noise', 'Large Noise').
+            random_state (numpy.random.RandomState, optional): The random state to draw from,
+                the global numpy random state by default.
+
+        Returns:
+            pandas.Series: The time series with the noise component added.
+        """
+        import pandas as pd
 
-        noise = np.zeros_like(data)
-        for i in range(len(data)):
-            noise[i] = np.random.normal(0, abs(data[i]) * noise_level) if noise_level > 0 else 0
-        return pd.Series((data + noise)[:, 0])
\ No newline at end of file
+        return pd.Series(Noise.add_noise_block(data, noise_level, random_state)[:, 0])
@@ -3,26 +3,87 @@ import numpy as np
 
 class Outliers:
     @staticmethod
-    def add_outliers(data, percentage_outliers=0.05):
+    def add_outliers(data, percentage_outliers=0.05, random_state=None):
         """
         Add outliers to the time series data.
 
         Parameters:
             data (numpy.ndarray): The time series data.
             percentage_outliers (float): The percentage of outliers to add (e.g., 0.2 for 20%).
+            random_state (numpy.random.RandomState, optional): The random state to draw from,
+                the global numpy random state by default.
 
         Returns:
             numpy.ndarray: The time series data with outliers.
         """
+        random_state = np.random if random_state is None else random_state
         # data = pd.Series(data)
         num_outliers = int(len(data) * percentage_outliers)
-        outlier_indices = np.random.choice(len(data), num_outliers)
+        outlier_indices = random_state.choice(len(data), num_outliers)
         # data_with_outliers = pd.Series(data.copy())
         data_with_outliers = data.copy()
-        outliers = np.random.uniform(-1, 1, num_outliers)
+        outliers = random_state.uniform(-1, 1, num_outliers).astype(data.dtype, copy=False)
         anomaly_mask = np.zeros(len(data_with_outliers), dtype=bool)
         if len(outliers) > 0:
             data_with_outliers[outlier_indices] = outliers
             anomaly_mask[outlier_indices] = True
 
-        return data_with_outliers, anomaly_mask
\ No newline at end of file
+        return data_with_outliers, anomaly_mask
+
+    @staticmethod
+    def add_outliers_block(data, percentage_outliers):
+        """
+        Add outliers to every series of a (series x time) block.
+
+        Series that share the same percentage of outliers get their positions and values
+        drawn together, so the number of random draws does not grow with the number of series.
+
+        Parameters:
+            data (numpy.ndarray): The (series x time) block of time series data.
+            percentage_outliers (list): The percentage of outliers for each series.
+
+        Returns:
+            tuple: The block with outliers and the (series x time) anomaly mask.
+        """
+        data_with_outliers = data.copy()
+        anomaly_mask = np.zeros(data.shape, dtype=bool)
+        percentage_outliers = np.asarray(percentage_outliers, dtype=float)
+
+        for percentage in np.unique(percentage_outliers):
+            num_outliers = int(data.shape[1] * percentage)
+            if num_outliers <= 0:
+                continue
+            rows = np.flatnonzero(percentage_outliers == percentage)[:, np.newaxis]
+            outlier_indices = np.random.randint(0, data.shape[1], (len(rows), num_outliers))
+            data_with_outliers[rows, outlier_indices] = np.random.uniform(-1, 1, (len(rows), num_outliers)).astype(
+                data.dtype, copy=False)
+            anomaly_mask[rows, outlier_indices] = True
+
+        return data_with_outliers, anomaly_mask
+
+    @staticmethod
+    def pack_mask(anomaly_mask):
+        """
+        Pack an anomaly mask into one bit per value.
+
+        Parameters:
+            anomaly_mask (numpy.ndarray): The boolean anomaly mask of a series or a (series x time) block.
+
+        Returns:
+            numpy.ndarray: The uint8 packed mask, packed along the time axis.
+        """
+        return np.packbits(anomaly_mask, axis=-1)
+
+    @staticmethod
+    def unpack_mask(packed_mask, length):
+        """
+        Expand a packed anomaly mask back to one bool per value.
+
+        Parameters:
+            packed_mask (numpy.ndarray): The uint8 mask returned by pack_mask.
+            length (int): The number of values of the series.
+
+        Returns:
+            numpy.ndarray: The boolean anomaly mask.
+        """
+        return np.unpackbits(packed_mask, axis=-1, count=length).astype(bool)
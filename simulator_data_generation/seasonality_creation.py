@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 import numpy as np
-import pandas as pd
+
+from .calendar_features import CalendarFeatures
 
 class Seasonality(ABC):
     """
@@ -22,7 +23,7 @@ class WeeklySeasonality(Seasonality):
         Add weekly seasonality component to the time series data.
 
         Parameters:
-            data (DatetimeIndex): The time index for the data.
+            data (DatetimeIndex or CalendarFeatures): The time index for the data.
             seasonality (str): The type of seasonality ('Long', 'Short', or 'Intermediate').
             season_type
 
@@ -30,6 +31,8 @@ class WeeklySeasonality(Seasonality):
             numpy.ndarray: The seasonal component of the time series.
 
         """
+        import pandas as pd
+
         if seasonality == "exist":  # Weekly Seasonality
             seasonal_component = np.sin(2 * np.pi * data.dayofweek / 7)
             seasonal_component += 1 if season_type == 'multiplicative' else 0
@@ -45,15 +48,64 @@ class DailySeasonality(Seasonality):
         Add daily seasonality component to the time series data.
 
         Parameters:
-            data (DatetimeIndex): The time index for the data.
+            data (DatetimeIndex or CalendarFeatures): The time index for the data.
             seasonality (str): The type of seasonality ('Long', 'Short', or 'Intermediate').
 
         Returns:
             numpy.ndarray: The seasonal component of the time series.
         """
+        import pandas as pd
+
         if seasonality == "exist":  # Daily Seasonality
             seasonal_component = np.sin(2 * np.pi * data.hour / 24)
             seasonal_component += 1 if season_type == 'multiplicative' else 0
         else:
             seasonal_component = np.zeros(len(data)) if season_type == 'additive' else np.ones(len(data))
         return pd.Series(seasonal_component)
+
+
+class FourierSeasonality(Seasonality):
+    """
+    Seasonality made of any number of harmonic components evaluated in one vectorized pass.
+
+    Every component follows SeasonalityComponentDetails: amplitude * sin(2 * pi * frequency_multiplier * position
+    + phase_shift), where position is the elapsed fraction of the day, the week or the calendar month of
+    frequency_type. The positions of all components form a (time x harmonics) matrix whose sines are
+    multiplied by the vector of amplitudes.
+    """
+    positions = {'Daily': 'day_fraction', 'Weekly': 'week_fraction', 'Monthly': 'month_fraction'}
+
+    def add_seasonality(cls, data, seasonality, season_type):
+        """
+        Add the harmonic seasonality components to the time series data.
+
+        Parameters:
+            data (DatetimeIndex or CalendarFeatures): The time index for the data.
+            seasonality (list): The seasonality components, dictionaries with 'amplitude', 'phase_shift'
+                (radians), 'frequency_type' ('Daily', 'Weekly' or 'Monthly') and 'frequency_multiplier'.
+            season_type
+
+        Returns:
+            pandas.Series: The seasonal component of the time series.
+        """
+        import pandas as pd
+
+        seasonal_component = np.full(len(data), 1.0 if season_type == 'multiplicative' else 0.0)
+        if not seasonality:
+            return pd.Series(seasonal_component)
+
+        if not isinstance(data, CalendarFeatures):
+            data = CalendarFeatures.from_index(data)
+
+        for component in seasonality:
+            if component['frequency_type'] not in cls.positions:
+                raise ValueError(f"Unsupported seasonality frequency type: {component['frequency_type']}")
+
+        amplitudes = np.array([component['amplitude'] for component in seasonality], dtype=float)
+        phase_shifts = np.array([component['phase_shift'] for component in seasonality], dtype=float)
+        multipliers = np.array([component['frequency_multiplier'] for component in seasonality], dtype=float)
+        positions = np.stack([getattr(data, cls.positions[component['frequency_type']])
+                              for component in seasonality], axis=1)
+
+        seasonal_component += np.sin(2 * np.pi * positions * multipliers + phase_shifts) @ amplitudes
+        return pd.Series(seasonal_component)
@@ -1,6 +1,3 @@
-import pandas as pd
-
-
 class TimeSeriesGenerator:
     @staticmethod
     def generate_time_series(start_date, end_date, freq):
@@ -15,5 +12,42 @@ class TimeSeriesGenerator:
         Returns:
             DatetimeIndex: The generated time index.
         """
+        import pandas as pd
+
         date_rng = pd.date_range(start=start_date, end=end_date, freq=freq)
         return date_rng
+
+    @staticmethod
+    def time_series_length(start_date, end_date, freq):
+        """
+        Compute the number of points of a time index without building it.
+
+        Parameters:
+            start_date (datetime): The start date of the time index.
+            end_date (datetime): The end date of the time index.
+            freq (str): The fixed frequency of the time index (e.g., '10T', '1H', 'D').
+
+        Returns:
+            int: The number of points of the time index.
+        """
+        import pandas as pd
+
+        return (pd.Timestamp(end_date) - pd.Timestamp(start_date)) // pd.Timedelta(freq) + 1
+
+    @staticmethod
+    def generate_time_series_window(start_date, freq, offset, length):
+        """
+        Generate a window of a time index, starting at its point number offset.
+
+        Parameters:
+            start_date (datetime): The start date of the whole time index.
+            freq (str): The fixed frequency of the time index (e.g., '10T', '1H', 'D').
+            offset (int): The position of the first point of the window.
+            length (int): The number of points of the window.
+
+        Returns:
+            DatetimeIndex: The window of the time index.
+        """
+        import pandas as pd
+
+        return pd.date_range(start=pd.Timestamp(start_date) + offset * pd.Timedelta(freq), periods=length, freq=freq)
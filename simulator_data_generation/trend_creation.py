@@ -1,26 +1,96 @@
 import numpy as np
 import random
-import pandas as pd
 
 
 class Trend:
     @staticmethod
-    def add_trend(data, trend, data_size, data_type):
+    def choose_slope(random_state=None):
+        """
+        Choose the direction of a trend.
+
+        Parameters:
+            random_state (numpy.random.RandomState, optional): The random state to draw the slope from,
+                the global random module by default.
+
+        Returns:
+            int: 1 for an upward trend, -1 for a downward trend.
+        """
+        return random.choice([1, -1]) if random_state is None else random_state.choice([1, -1])
+
+    @staticmethod
+    def add_trend(data, trend, data_size, data_type, random_state=None):
         """
         Add trend component to the time series data.
 
         Parameters:
             data (DatetimeIndex): The time index for the data.
             trend (str): The magnitude of the trend ('No Trend', 'exist').
+            random_state (numpy.random.RandomState, optional): The random state to draw the slope from,
+                the global random module by default.
 
         Returns:
             numpy.ndarray: The trend component of the time series.
         """
+        import pandas as pd
+
         if trend == "exist":
-            slope = random.choice([1, -1])
+            slope = Trend.choose_slope(random_state)
             trend_component = np.linspace(0, data_size / 30 * slope, len(data)) if slope == 1 else np.linspace(
                 -1 * data_size / 30, 0, len(data))
         else:  # No Trend
             trend_component = np.zeros(len(data)) if data_type == 'additive' else np.ones(len(data))
 
         return pd.Series(trend_component)
+
+    @staticmethod
+    def add_trend_block(data, trends, data_size, data_type):
+        """
+        Add trend components for a block of series sharing the same time index.
+
+        Parameters:
+            data (DatetimeIndex): The time index shared by the series.
+            trends (list): The trend option of each series ('No Trend', 'exist').
+
+        Returns:
+            numpy.ndarray: The (series x time) trend components.
+        """
+        trend_block = np.full((len(trends), len(data)), 0.0 if data_type == 'additive' else 1.0)
+        upward = np.linspace(0, data_size / 30, len(data))
+
+        for row, trend in enumerate(trends):
+            if trend == "exist":
+                slope = random.choice([1, -1])
+                trend_block[row] = upward if slope == 1 else upward - data_size / 30
+
+        return trend_block
+
+    @staticmethod
+    def add_trend_window(data, trend, data_size, data_type, total_length, offset, slope):
+        """
+        Add the trend component of a window of a longer time series.
+
+        The values are the ones add_trend gives for the whole series at the same positions,
+        without building the whole series.
+
+        Parameters:
+            data (DatetimeIndex): The time index of the window.
+            trend (str): The magnitude of the trend ('No Trend', 'exist').
+            total_length (int): The number of points of the whole series.
+            offset (int): The position of the first point of the window in the whole series.
+            slope (int): The direction of the trend, as returned by choose_slope.
+
+        Returns:
+            numpy.ndarray: The trend component of the window.
+        """
+        if trend != "exist":  # No Trend
+            return np.zeros(len(data)) if data_type == 'additive' else np.ones(len(data))
+
+        start, stop = (0, data_size / 30) if slope == 1 else (-1 * data_size / 30, 0)
+        if total_length == 1:
+            return np.full(len(data), float(start))
+
+        positions = np.arange(offset, offset + len(data))
+        trend_component = start + positions * ((stop - start) / (total_length - 1))
+        if offset + len(data) == total_length:
+            trend_component[-1] = stop
+        return trend_component
@@ -0,0 +1,214 @@
+import math
+import threading
+import time
+
+# every power of two of nanoseconds is split in 2 ** SUB_BUCKET_BITS buckets, so a percentile read
+# from the histogram is within 1 / 2 ** (SUB_BUCKET_BITS + 1) of the true duration
+SUB_BUCKET_BITS = 3
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+
+def _bucket(nanoseconds):
+    """
+    Get the histogram bucket of a duration.
+
+    Parameters:
+        nanoseconds (int): The duration.
+
+    Returns:
+        int: The bucket, durations below SUB_BUCKETS nanoseconds having a bucket each.
+    """
+    if nanoseconds < SUB_BUCKETS:
+        return max(0, nanoseconds)
+    shift = nanoseconds.bit_length() - SUB_BUCKET_BITS - 1
+    return SUB_BUCKETS * (shift + 1) + ((nanoseconds >> shift) & (SUB_BUCKETS - 1))
+
+
+def _bucket_midpoint(bucket):
+    """
+    Get the duration standing for the durations of a histogram bucket.
+
+    Parameters:
+        bucket (int): The bucket.
+
+    Returns:
+        float: The middle of the bucket in nanoseconds.
+    """
+    if bucket < SUB_BUCKETS:
+        return float(bucket)
+    shift = bucket // SUB_BUCKETS - 1
+    low = (SUB_BUCKETS + bucket % SUB_BUCKETS) << shift
+    return low + ((1 << shift) - 1) / 2
+
+
+class _Stage:
+    """
+    The context manager timing one run of a stage.
+    """
+    __slots__ = ('timer', 'name', 'started')
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.timer.add(self.name, time.perf_counter_ns() - self.started)
+
+
+class StageTimer:
+    """
+    Time the stages of a run, e.g. the generation stages of a series and the writes to the sink.
+
+    Every stage keeps its number of runs, its total and maximum duration and a histogram of its durations
+    in logarithmic buckets, from which percentiles are read. Timing a stage costs two reads of
+    perf_counter_ns and a few integer operations, and the memory of a stage is bounded by the number of
+    buckets, so the timer is left on for every run. Stages may be timed from several threads.
+
+    Attributes:
+        stages (list): The names of the timed stages, in the order they were first timed.
+    """
+
+    def __init__(self):
+        """
+        Initialize a StageTimer instance with no stage timed.
+        """
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        with self._lock:
+            return {name: [count, total, maximum, dict(histogram)]
+                    for name, (count, total, maximum, histogram) in self._stages.items()}
+
+    def __setstate__(self, state):
+        self._stages = state
+        self._lock = threading.Lock()
+
+    @property
+    def stages(self):
+        return list(self._stages)
+
+    def stage(self, name):
+        """
+        Time the block of a with statement as a run of a stage.
+
+        Parameters:
+            name (str): The name of the stage.
+
+        Returns:
+            context manager: The context manager timing the block.
+        """
+        return _Stage(self, name)
+
+    def timed(self, name, function):
+        """
+        Wrap a function so that every call to it is timed as a run of a stage.
+
+        Parameters:
+            name (str): The name of the stage.
+            function (callable): The function to time.
+
+        Returns:
+            callable: The wrapped function.
+        """
+        def timed_function(*args, **kwargs):
+            started = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter_ns() - started)
+
+        return timed_function
+
+    def add(self, name, nanoseconds):
+        """
+        Record a run of a stage.
+
+        Parameters:
+            name (str): The name of the stage.
+            nanoseconds (int): The duration of the run.
+        """
+        bucket = _bucket(nanoseconds)
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = [0, 0, 0, {}]
+            stage[0] += 1
+            stage[1] += nanoseconds
+            if nanoseconds > stage[2]:
+                stage[2] = nanoseconds
+            histogram = stage[3]
+            histogram[bucket] = histogram.get(bucket, 0) + 1
+
+    def merge(self, other):
+        """
+        Add the runs timed by another timer, e.g. in a worker process, to this one.
+
+        Parameters:
+            other (StageTimer): The other timer.
+        """
+        for name, (count, total, maximum, histogram) in other.__getstate__().items():
+            with self._lock:
+                stage = self._stages.get(name)
+                if stage is None:
+                    stage = self._stages[name] = [0, 0, 0, {}]
+                stage[0] += count
+                stage[1] += total
+                stage[2] = max(stage[2], maximum)
+                for bucket, bucket_count in histogram.items():
+                    stage[3][bucket] = stage[3].get(bucket, 0) + bucket_count
+
+    @staticmethod
+    def _percentile(histogram, count, maximum, percentile):
+        rank = max(1, math.ceil(count * percentile / 100))
+        seen = 0
+        for bucket in sorted(histogram):
+            seen += histogram[bucket]
+            if seen >= rank:
+                return min(_bucket_midpoint(bucket), maximum)
+        return maximum
+
+    def summary(self, percentiles=(50, 90, 99)):
+        """
+        Get the totals and percentiles of every stage.
+
+        Parameters:
+            percentiles (tuple): The percentiles of the durations to report.
+
+        Returns:
+            dict: Per stage, in the order the stages were first timed: the number of runs ('count'), the
+            total time ('total_seconds') and its share of the time of all stages ('share'), and the mean,
+            percentiles ('p50_ms', ...) and maximum ('max_ms') of the durations in milliseconds.
+        """
+        stages = self.__getstate__()
+        grand_total = sum(total for _, total, _, _ in stages.values())
+        summary = {}
+        for name, (count, total, maximum, histogram) in stages.items():
+            summary[name] = {
+                'count': count,
+                'total_seconds': total / 1e9,
+                'share': total / grand_total if grand_total else 0.0,
+                'mean_ms': total / count / 1e6,
+            }
+            for percentile in percentiles:
+                summary[name][f'p{percentile:g}_ms'] = self._percentile(histogram, count, maximum, percentile) / 1e6
+            summary[name]['max_ms'] = maximum / 1e6
+        return summary
+
+    def report(self):
+        """
+        Format the summary as one line per stage, the stages taking the most time first.
+
+        Returns:
+            str: The report.
+        """
+        lines = []
+        for name, stage in sorted(self.summary().items(), key=lambda item: -item[1]['total_seconds']):
+            lines.append(f"{name:<15} {stage['total_seconds']:>9.3f}s {stage['share']:>6.1%} {stage['count']:>8} runs  "
+                         f"p50 {stage['p50_ms']:.3f}ms p90 {stage['p90_ms']:.3f}ms p99 {stage['p99_ms']:.3f}ms "
+                         f"max {stage['max_ms']:.3f}ms")
+        return "\n".join(lines)
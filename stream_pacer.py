@@ -0,0 +1,244 @@
+import heapq
+import math
+import time
+
+import numpy as np
+
+
+class StreamPacer:
+    """
+    Pace a stream of points at a target rate and replay their timestamps at a multiple of wall-clock speed.
+
+    Every batch of points gets a deadline and is released once the clock reaches it. With a speed, the
+    deadline of a batch is the time elapsed in its timestamps since the first batch divided by the speed.
+    With a rate, deadlines are spaced by the number of points over the rate (a token bucket holding
+    burst points), so the target rate holds on average: a batch released late is followed by batches
+    released early until the stream has caught up, at most burst points at a time. With both, the
+    later deadline wins.
+
+    Attributes:
+        rate (float): The target rate in points per second, None for no rate limit.
+        speed (float): The number of simulated seconds replayed per second, None to ignore the timestamps.
+        burst (float): The number of points a stream behind its schedule may send at once to catch up.
+        points (int): The number of points released.
+        lag (float): How late the last batch was released after its deadline, in seconds.
+        max_lag (float): The largest lag seen.
+    """
+
+    def __init__(self, rate=None, speed=None, burst=None, clock=time.monotonic, sleep=time.sleep):
+        """
+        Initialize a StreamPacer instance.
+
+        Parameters:
+            rate (float, optional): The target rate in points per second.
+            speed (float, optional): The number of simulated seconds replayed per second, 1 for real time.
+            burst (float, optional): The size of the token bucket in points, a tenth of a second of points by default.
+            clock (callable): The clock measuring the pace, in seconds.
+            sleep (callable): The function waiting for a number of seconds, e.g. the wait method of a
+                threading.Event so that setting the event cuts the waits short.
+
+        Raises:
+            ValueError: If the rate or the speed is not positive.
+        """
+        if rate is not None and rate <= 0:
+            raise ValueError("The rate must be positive")
+        if speed is not None and speed <= 0:
+            raise ValueError("The speed must be positive")
+        self.rate = rate
+        self.speed = speed
+        self.burst = burst if burst is not None else (max(1.0, rate / 10) if rate else 0.0)
+        self.clock = clock
+        self.sleep = sleep
+        self.points = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self._started = None
+        self._origin = None
+        self._next = None
+        self._batches = 0
+        self._lag_mean = 0.0
+        self._lag_squares = 0.0
+
+    def start(self):
+        """
+        Start the schedule now. The first call to wait starts it otherwise.
+        """
+        self._started = self.clock()
+        self._next = self._started
+
+    def deadline(self, points, timestamp=None):
+        """
+        Get the time a batch of points is due, reserving its place in the schedule.
+
+        Parameters:
+            points (int): The number of points of the batch.
+            timestamp (float, optional): The simulated time of the batch in seconds.
+
+        Returns:
+            float: The clock time the batch is due.
+        """
+        if self._started is None:
+            self.start()
+        now = self.clock()
+        due = None
+        if self.speed is not None and timestamp is not None:
+            if self._origin is None:
+                self._origin = timestamp
+            due = self._started + (timestamp - self._origin) / self.speed
+        if self.rate is not None:
+            # a stream that fell behind keeps at most burst points of credit
+            self._next = max(self._next, now - self.burst / self.rate)
+            if due is not None:
+                self._next = max(self._next, due)
+            due = self._next
+            self._next += points / self.rate
+        return now if due is None else due
+
+    def wait(self, points, timestamp=None):
+        """
+        Wait until a batch of points is due.
+
+        Parameters:
+            points (int): The number of points of the batch.
+            timestamp (float, optional): The simulated time of the batch in seconds.
+
+        Returns:
+            float: How late the batch was released after its deadline, in seconds.
+        """
+        due = self.deadline(points, timestamp)
+        remaining = due - self.clock()
+        if remaining > 0:
+            self.sleep(remaining)
+        self.lag = max(0.0, self.clock() - due)
+        self.max_lag = max(self.max_lag, self.lag)
+        self.points += points
+
+        self._batches += 1
+        delta = self.lag - self._lag_mean
+        self._lag_mean += delta / self._batches
+        self._lag_squares += delta * (self.lag - self._lag_mean)
+        return self.lag
+
+    @property
+    def elapsed(self):
+        """
+        The time since the schedule started, in seconds.
+
+        return:
+            elapsed (float)
+        """
+        return 0.0 if self._started is None else self.clock() - self._started
+
+    def stats(self):
+        """
+        Get the statistics of the stream.
+
+        Returns:
+            dict: The number of points, the elapsed time, the achieved rate in points per second, the jitter
+            (standard deviation of the lag) and the mean, maximum and last lag, all in seconds.
+        """
+        elapsed = self.elapsed
+        return {
+            'points': self.points,
+            'elapsed': elapsed,
+            'achieved_rate': self.points / elapsed if elapsed > 0 else 0.0,
+            'jitter': math.sqrt(self._lag_squares / self._batches) if self._batches else 0.0,
+            'mean_lag': self._lag_mean,
+            'max_lag': self.max_lag,
+            'lag': self.lag,
+        }
+
+
+class _SeriesCursor:
+    """
+    The position reached in the slices of a series being interleaved.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.timestamps = None
+        self.offset = 0
+
+    def advance(self):
+        """
+        Move to the next slice when the current one is used up.
+
+        Returns:
+            bool: Whether there are points left.
+        """
+        while self.timestamps is None or self.offset >= len(self.timestamps):
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return False
+            values = np.asarray(chunk['value'])
+            anomaly = np.asarray(chunk['anomaly'])
+            if anomaly.dtype == np.uint8:
+                anomaly = np.unpackbits(anomaly, count=len(values)).astype(bool)
+            self.timestamps = np.asarray(chunk['timestamp'], dtype='datetime64[ns]').view(np.int64)
+            self.values = values
+            self.anomaly = anomaly
+            self.offset = 0
+        return True
+
+    @property
+    def next_timestamp(self):
+        return int(self.timestamps[self.offset])
+
+    def take(self, end):
+        """
+        Take the points of the current slice before a timestamp.
+
+        Parameters:
+            end (int): The timestamp in nanoseconds of the first point not to take.
+
+        Returns:
+            dict: The 'timestamp', 'value' and 'anomaly' of the points taken.
+        """
+        stop = self.offset + int(np.searchsorted(self.timestamps[self.offset:], end))
+        points = {
+            'timestamp': self.timestamps[self.offset:stop].view('datetime64[ns]'),
+            'value': self.values[self.offset:stop],
+            'anomaly': self.anomaly[self.offset:stop],
+        }
+        self.offset = stop
+        return points
+
+
+def interleave(series, window):
+    """
+    Merge series given as slices into time windows, so they can be replayed together in time order.
+
+    Only one slice of every series is held at a time, so thousands of series generated by
+    DataGenerator.generate_chunked can be interleaved. Windows holding no point are skipped.
+
+    Parameters:
+        series (iterable): The slices of every series, each slice a dictionary with 'timestamp', 'value' and 'anomaly'.
+        window (float): The length of a window in simulated seconds.
+
+    Yields:
+        tuple: The start of a window in seconds since the epoch and the list of (position of the series,
+        points of the series in the window) of the series with points in the window.
+    """
+    window = max(1, int(window * 1e9))
+    heap = []
+    for position, chunks in enumerate(series):
+        cursor = _SeriesCursor(chunks)
+        if cursor.advance():
+            heap.append((cursor.next_timestamp, position, cursor))
+    heapq.heapify(heap)
+
+    while heap:
+        start = heap[0][0] // window * window
+        end = start + window
+        points = []
+        while heap and heap[0][0] < end:
+            _, position, cursor = heapq.heappop(heap)
+            pieces = [cursor.take(end)]
+            # a window may run over the end of a slice into the next ones
+            while cursor.offset >= len(cursor.timestamps) and cursor.advance() and cursor.next_timestamp < end:
+                pieces.append(cursor.take(end))
+            if cursor.offset < len(cursor.timestamps):
+                heapq.heappush(heap, (cursor.next_timestamp, position, cursor))
+            points.append((position, pieces[0] if len(pieces) == 1 else
+                           {key: np.concatenate([piece[key] for piece in pieces]) for key in pieces[0]}))
+        yield start / 1e9, points
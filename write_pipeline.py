@@ -0,0 +1,137 @@
+import queue
+import threading
+import time
+
+
+class WritePipeline:
+    """
+    Overlap generation and I/O by handing writes to a pool of writer threads through a bounded queue.
+
+    The generating thread submits writes and goes on generating while the writers drain the queue.
+    When the writers fall behind the queue fills up and submit blocks, so no more than queue_size
+    series are ever held in memory. The time submit spends blocked is reported as stall time.
+
+    Attributes:
+        writers (int): The number of writer threads.
+        queue_size (int): The maximum number of writes waiting in the queue.
+        written (int): The number of writes done.
+        stall_seconds (float): The total time submit was blocked by a full queue.
+        max_queue_depth (int): The largest number of writes found waiting in the queue by submit.
+    """
+    _stop = object()
+
+    def __init__(self, writers=2, queue_size=16):
+        """
+        Initialize a WritePipeline instance and start its writer threads.
+
+        Parameters:
+            writers (int): The number of writer threads.
+            queue_size (int): The maximum number of writes waiting in the queue.
+        """
+        self.writers = max(1, writers)
+        self.queue_size = max(1, queue_size)
+        self.written = 0
+        self.stall_seconds = 0.0
+        self.max_queue_depth = 0
+        self._depth_total = 0
+        self._submitted = 0
+        self._error = None
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._threads = [threading.Thread(target=self._write, daemon=True) for _ in range(self.writers)]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _write(self):
+        """
+        Run the writes of the queue until the pipeline is closed.
+        """
+        while True:
+            task = self._queue.get()
+            try:
+                if task is self._stop:
+                    return
+                if self._error is None:
+                    function, args, kwargs = task
+                    function(*args, **kwargs)
+                    with self._lock:
+                        self.written += 1
+            except Exception as e:
+                with self._lock:
+                    if self._error is None:
+                        self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, function, *args, **kwargs):
+        """
+        Queue a write, blocking while the queue is full.
+
+        Parameters:
+            function (callable): The write, e.g. the produce method of a DataProducer.
+            args: The positional arguments of the write.
+            kwargs: The keyword arguments of the write.
+
+        Raises:
+            Exception: The first error raised by a write, so a failing run stops generating.
+        """
+        self._raise_error()
+        depth = self._queue.qsize()
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        self._depth_total += depth
+        self._submitted += 1
+
+        task = (function, args, kwargs)
+        try:
+            self._queue.put_nowait(task)
+            return
+        except queue.Full:
+            pass
+
+        started = time.perf_counter()
+        while True:
+            try:
+                self._queue.put(task, timeout=0.1)
+                break
+            except queue.Full:
+                self._raise_error()
+        self.stall_seconds += time.perf_counter() - started
+
+    def close(self):
+        """
+        Wait for every queued write and stop the writer threads.
+
+        Raises:
+            Exception: The first error raised by a write.
+        """
+        if self._threads:
+            for _ in self._threads:
+                self._queue.put(self._stop)
+            for thread in self._threads:
+                thread.join()
+            self._threads = []
+        self._raise_error()
+
+    def stats(self):
+        """
+        Get the statistics of the pipeline.
+
+        Returns:
+            dict: The number of writes, the mean and maximum queue depth seen by submit and the stall time.
+        """
+        return {
+            'written': self.written,
+            'mean_queue_depth': self._depth_total / self._submitted if self._submitted else 0.0,
+            'max_queue_depth': self.max_queue_depth,
+            'stall_seconds': self.stall_seconds,
+        }